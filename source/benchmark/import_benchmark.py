@@ -0,0 +1,98 @@
+"""
+Measure the start-up imports of the command line, in the format of `python -X importtime`.
+
+Run from the `source` folder:
+    python -m benchmark.import_benchmark
+    python -m benchmark.import_benchmark --json benchmark/import_baseline.json     # record a new baseline
+    python -m benchmark.import_benchmark --baseline benchmark/import_baseline.json # compare with it
+
+Every scenario runs in a fresh interpreter with `-X importtime`, and the report gives the number of modules it
+imports, their total import time and the slowest of them. Timings depend on the machine, but the set of
+imported modules does not: comparing with the checked-in baseline lists the modules that a change added to a
+scenario, and the command exits with status 1 when there are some, so a start-up regression is visible.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SOURCE_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The code run by each scenario. The modules of `main` are loaded lazily, so a scenario touches an attribute of
+# each module a command needs to load it, without running the command against a real vault.
+SCENARIOS = {
+    "start-up": "import main",
+    "search": "import main, modules.Search\n"
+              "main.Export.search_file, main.DataProcess.get_banned_words, modules.Search.query_index",
+    "all modules": "import main, colorama, json, modules.Search, modules.RunningStat, modules.Catalog, modules.Database, modules.Output, modules.Render\n"
+                   "main.Export.updateData, main.DataProcess.get_book_records, modules.Search.build_index, modules.RunningStat.RunningStat,"
+                   "modules.Catalog.write_catalog, modules.Database.connect, modules.Output.write_document, modules.Render.iter_chunks, colorama.init, json.dumps",
+}
+
+def parse_importtime(report: str) -> dict[str, int]:
+    """
+    Parse the report written to stderr by `python -X importtime`.
+
+    Parameters:
+        report (str): The report.
+
+    Returns:
+        dict[str, int]: The time spent importing each module itself, in microseconds, keyed by module name.
+    """
+    self_times = {}
+    for line in report.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        self_times[name.strip()] = int(self_time)
+    return self_times
+
+def run_scenario(code: str, repeat: int) -> dict[str, int]:
+    """Run a scenario `repeat` times and return the import times of the fastest run."""
+    best = None
+    for _ in range(repeat):
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=SOURCE_FOLDER,
+                                   capture_output=True, text=True, check=True)
+        self_times = parse_importtime(completed.stderr)
+        if best is None or sum(self_times.values()) < sum(best.values()):
+            best = self_times
+    return best
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure the start-up imports of the command line.")
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs per scenario, the fastest is reported")
+    parser.add_argument("--top", type=int, default=8, help="number of slowest modules listed per scenario")
+    parser.add_argument("--json", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare with a report written by --json")
+    args = parser.parse_args()
+
+    report = {}
+    for name, code in SCENARIOS.items():
+        self_times = run_scenario(code, args.repeat)
+        report[name] = {"Total (us)": sum(self_times.values()), "Modules": sorted(self_times)}
+        print(f"\n{name}: {len(self_times)} modules, {sum(self_times.values()) / 1000:.1f} ms")
+        for module, self_time in sorted(self_times.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {self_time / 1000:>7.2f} ms  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as outputFile:
+            json.dump(report, outputFile, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as inputFile:
+            baseline = json.load(inputFile)
+        regressed = False
+        print()
+        for name, result in report.items():
+            if name not in baseline:
+                continue
+            added = sorted(set(result["Modules"]) - set(baseline[name]["Modules"]))
+            ratio = result["Total (us)"] / baseline[name]["Total (us)"]
+            print(f"{name}: {ratio:.2f}x the baseline time, {len(added)} new modules" + (f": {', '.join(added)}" if added else ""))
+            regressed = regressed or bool(added)
+        if regressed:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
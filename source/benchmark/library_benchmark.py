@@ -0,0 +1,230 @@
+"""
+Measure how the commands of the application scale with the size of the library.
+
+Run from the `source` folder:
+    python -m benchmark.library_benchmark                                   # 1k, 10k and 100k books
+    python -m benchmark.library_benchmark --books 1000 10000 --json benchmark/library_report.json
+    python -m benchmark.library_benchmark --books 1000 --baseline benchmark/library_report.json
+
+For every size, a synthetic vault is generated in a temporary folder: a BOOKS folder of sparse `.pdf` files, or
+empty ones with `--empty`, whose titles are drawn from the words of the titles in `data/PDF_info.csv`, with
+the same distribution of title lengths, word frequencies and file sizes, and the list of banned words of
+`data/ban.txt`. A configuration file pointing to the vault is passed to the application through the
+STUDYAPP_CONFIG environment variable, so the real vault and data files are never touched.
+
+Each command then runs in a fresh interpreter, as it does from the command line: the report gives its wall
+time, the fastest of `--repeat` runs, and the peak resident memory of the process. With `--tracemalloc`, one
+more run per command measures the peak memory allocated by Python itself, which does not depend on the
+allocator of the platform but slows the command down, so it is never timed. The report can be written as JSON
+and compared with an earlier one: the command exits with status 1 when a command got slower than
+`--tolerance` times its baseline.
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+from collections import Counter
+
+SOURCE_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FOLDER = os.path.join(os.path.dirname(SOURCE_FOLDER), "data")
+
+# The commands timed, in the order they run: the full update writes every file the other commands read, so it
+# also runs, untimed, when it is not one of the commands measured.
+OPERATIONS = {
+    "update (full)": ["update", "--rebuild"],
+    "update (unchanged)": ["update"],
+    "tags": ["tags"],
+    "info": ["info"],
+    "index": ["index"],
+    "stat": ["stat"],
+    "search": ["search", "learning OR data*"],
+}
+
+# Run in the fresh interpreter of each command, with the result file, whether to trace the allocations and the
+# arguments of the command as arguments.
+CHILD = "import benchmark.library_benchmark as benchmark; benchmark.run_operation()"
+
+def read_sample_library(data_folder: str) -> tuple[list[str], list[int], list[int], list[str]]:
+    """
+    Read what the synthetic libraries are drawn from.
+
+    Parameters:
+        data_folder (str): The folder holding `PDF_info.csv` and `ban.txt`.
+
+    Returns:
+        tuple[list[str], list[int], list[int], list[str]]: The words of the titles, once per occurrence, the
+        number of words of each title, the file size of each book in kilobytes and the banned words.
+
+    Only the words starting with an ASCII letter or digit are kept, the first characters the tag catalog sorts
+    tags under.
+    """
+    with open(os.path.join(data_folder, "PDF_info.csv"), "r", encoding="utf-8") as csv_file:
+        header, *rows = csv.reader(csv_file, delimiter=";")
+    file_size = header.index("File Size (Kb)")
+    words = [word for row in rows for word in row[0].split() if word[0].isascii() and word[0].isalnum()]
+    with open(os.path.join(data_folder, "ban.txt"), "r", encoding="utf-8") as inputFile:
+        banned_words = [line.strip() for line in inputFile]
+    return words, [len(row[0].split()) for row in rows], [int(row[file_size]) for row in rows], banned_words
+
+def make_library(root: str, book_count: int, sample: tuple, empty: bool = False, seed: int = 0) -> str:
+    """
+    Generate a synthetic vault and the configuration file pointing to it.
+
+    Parameters:
+        root (str): The folder to generate the vault and its data folder in.
+        book_count (int): The number of books.
+        sample (tuple): The sample library returned by `read_sample_library`.
+        empty (bool): Whether to create empty files instead of sparse files of realistic sizes.
+        seed (int): The seed of the random number generator.
+
+    Returns:
+        str: The path to the configuration file.
+
+    Titles are drawn word by word, with the word frequencies of the sample, so common words such as "data"
+    come up as often as in a real library. A title drawn twice gets a volume number. The sparse files take no
+    room on disk but report the drawn size to `os.stat`, and their modification times are spread over the
+    last five years.
+    """
+    words, title_lengths, file_sizes, banned_words = sample
+    rng = random.Random(seed)
+    vocabulary = Counter(words)
+    choices, weights = list(vocabulary), list(vocabulary.values())
+
+    books_folder = os.path.join(root, "vault", "BOOKS")
+    data_folder = os.path.join(root, "data")
+    os.makedirs(books_folder)
+    os.makedirs(data_folder)
+    with open(os.path.join(data_folder, "ban.txt"), "w", encoding="utf-8") as outputFile:
+        outputFile.write("\n".join(banned_words))
+
+    titles = set()
+    now = 1_700_000_000
+    for _ in range(book_count):
+        title = base = " ".join(rng.choices(choices, weights, k=rng.choice(title_lengths)))
+        volume = 2
+        while title in titles:
+            title = f"{base} volume {volume}"
+            volume += 1
+        titles.add(title)
+        book_path = os.path.join(books_folder, title + ".pdf")
+        with open(book_path, "wb") as outputFile:
+            if not empty:
+                outputFile.truncate(rng.choice(file_sizes) * 1024)
+        mtime = now - rng.randrange(5 * 365 * 86400)
+        os.utime(book_path, (mtime, mtime))
+
+    config_path = os.path.join(root, "config.json")
+    with open(config_path, "w", encoding="utf-8") as outputFile:
+        json.dump({"Data Root": "data", "Vaults": [{"Name": "Benchmark", "Root": "vault"}]}, outputFile)
+    return config_path
+
+def run_operation() -> None:
+    """
+    Run one command of the application and write its wall time and peak memory to a JSON file.
+
+    Called in the fresh interpreter of each command, see `CHILD`. The command runs through `main.app`, with its
+    printed output discarded. The time starts once `main` is imported, so it covers the modules the command
+    loads lazily but not the start-up of the interpreter.
+    """
+    import contextlib
+    import io
+    import time
+    import tracemalloc
+    import main
+
+    result_file, trace, *argv = sys.argv[1:]
+    if trace == "1":
+        tracemalloc.start()
+    sys.argv = ["main.py", *argv]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main.app()
+    result = {"Seconds": time.perf_counter() - start}
+    if trace == "1":
+        result["Peak Python Memory (KB)"] = tracemalloc.get_traced_memory()[1] // 1024
+    try:
+        import resource
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        result["Peak RSS (KB)"] = max_rss // 1024 if sys.platform == "darwin" else max_rss
+    except ImportError:
+        pass
+    with open(result_file, "w", encoding="utf-8") as outputFile:
+        json.dump(result, outputFile)
+
+def measure(argv: list[str], config_path: str, repeat: int, trace: bool) -> dict:
+    """Run a command `repeat` times, plus once with tracemalloc when `trace` is set, and merge the results."""
+    environment = dict(os.environ, STUDYAPP_CONFIG=config_path)
+    result_file = os.path.join(os.path.dirname(config_path), "result.json")
+    runs = []
+    for trace_run in [False] * repeat + [True] * trace:
+        subprocess.run([sys.executable, "-c", CHILD, result_file, "1" if trace_run else "0", *argv],
+                       cwd=SOURCE_FOLDER, env=environment, check=True)
+        with open(result_file, "r", encoding="utf-8") as inputFile:
+            runs.append(json.load(inputFile))
+    timed = runs[:repeat]
+    result = {"Seconds": round(min(run["Seconds"] for run in timed), 4)}
+    if "Peak RSS (KB)" in timed[0]:
+        result["Peak RSS (KB)"] = max(run["Peak RSS (KB)"] for run in timed)
+    if trace:
+        result["Peak Python Memory (KB)"] = runs[-1]["Peak Python Memory (KB)"]
+    return result
+
+def compare(report: dict, baseline: dict, tolerance: float | None) -> bool:
+    """Print the ratio of every measure to the baseline, and tell whether a command is slower than `tolerance`."""
+    regressed = False
+    print()
+    for book_count, results in report["Results"].items():
+        for name, result in results.items():
+            before = baseline.get("Results", {}).get(book_count, {}).get(name)
+            if before is None:
+                continue
+            ratios = {measure: result[measure] / before[measure] for measure in result if before.get(measure)}
+            print(f"{book_count:>7} books  {name:<20}" + "  ".join(f"{measure}: {ratio:.2f}x" for measure, ratio in ratios.items()))
+            regressed = regressed or (tolerance is not None and ratios.get("Seconds", 0) > tolerance)
+    return regressed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure how the commands scale with the size of the library.")
+    parser.add_argument("--books", type=int, nargs="+", default=[1000, 10000, 100000], help="sizes of the synthetic libraries")
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS), default=list(OPERATIONS), help="commands to measure")
+    parser.add_argument("--repeat", type=int, default=1, help="number of timed runs per command, the fastest is reported")
+    parser.add_argument("--tracemalloc", action="store_true", help="measure the peak memory allocated by Python in one more run")
+    parser.add_argument("--empty", action="store_true", help="create empty PDF files instead of sparse files of realistic sizes")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the synthetic libraries")
+    parser.add_argument("--json", help="write the report to this JSON file")
+    parser.add_argument("--baseline", help="compare with a report written by --json")
+    parser.add_argument("--tolerance", type=float, default=None, help="exit with status 1 when a command is this many times slower than the baseline")
+    args = parser.parse_args()
+
+    sample = read_sample_library(DATA_FOLDER)
+    report = {"Environment": {"Python": platform.python_version(), "Platform": platform.platform(), "Processors": os.cpu_count(),
+                              "Files": "empty" if args.empty else "sparse"},
+              "Results": {}}
+    for book_count in args.books:
+        with tempfile.TemporaryDirectory() as root:
+            config_path = make_library(root, book_count, sample, args.empty, args.seed)
+            results = report["Results"][str(book_count)] = {}
+            print(f"\n{book_count} books")
+            if "update (full)" not in args.operations:
+                measure(OPERATIONS["update (full)"], config_path, 1, False)
+            for name in [name for name in OPERATIONS if name in args.operations]:
+                results[name] = measure(OPERATIONS[name], config_path, args.repeat, args.tracemalloc)
+                print(f"    {name:<20}" + "  ".join(f"{measure}: {value}" for measure, value in results[name].items()))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as outputFile:
+            json.dump(report, outputFile, indent=4)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as inputFile:
+            baseline = json.load(inputFile)
+        if compare(report, baseline, args.tolerance):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
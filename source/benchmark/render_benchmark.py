@@ -0,0 +1,142 @@
+"""
+Compare the write calls and wall time of the PDF index, PDF info and tag catalog exports before and after
+`modules.Render`.
+
+Run from the `source` folder:
+    python -m benchmark.render_benchmark --books 20000
+
+"Before" replays the exporters as they used to be, with one `write` call per tag, separator and field.
+"After" renders the same documents with `Render` and streams them with `Output.write_chunks`. Both write to a
+temporary folder, and the documents they produce are checked to be identical.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from collections.abc import Iterator
+
+import modules.DataProcess as DataProcess
+import modules.Output as Output
+import modules.Render as Render
+from modules.Record import BookRecord
+from modules.Export import PDF_info_header, get_PDF_info_rows
+
+WORDS = ["python", "data", "science", "engineering", "philosophy", "history", "algorithms", "networks",
+         "statistics", "design", "systems", "learning", "machine", "calculus", "physics", "chemistry"]
+
+class CountingWriter:
+    """Wrap a text file and count the calls to its `write` method."""
+
+    def __init__(self, outputFile) -> None:
+        self.outputFile = outputFile
+        self.calls = 0
+
+    def write(self, text: str) -> None:
+        self.calls += 1
+        self.outputFile.write(text)
+
+def make_records(book_count: int, seed: int = 0) -> list[BookRecord]:
+    """
+    Build synthetic book records with 3 to 8 distinct tags each. Tags are kept distinct because the legacy
+    exporters drop the separator after a tag equal to the last one, so they only agree with `Render` then.
+    """
+    rng = random.Random(seed)
+    records = []
+    for i in range(book_count):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(3, 8))) + f" volume {i}"
+        records.append(BookRecord(title, sorted(rng.sample(WORDS, k=rng.randint(3, 8))), rng.randint(100, 200000), 1704067200))
+    return records
+
+def legacy_pdf_index(outputFile: CountingWriter, records: list[BookRecord]) -> None:
+    outputFile.write("\n# PDF index (Total: " + str(len(records)) + ")\n\n")
+    for index, record in enumerate(records, start= 1):
+        filename = record.title
+        outputFile.write(f"{index}. [[BOOKS/{filename}.pdf|{filename}]]\n")
+        outputFile.write("\nKeywords: ")
+        keyword_list = record.tags
+        for keyword in keyword_list:
+            outputFile.write(f"#{keyword}")
+            if keyword != keyword_list[-1]:
+                outputFile.write(" ")
+        outputFile.write("\n\n")
+
+def legacy_pdf_info(outputFile: CountingWriter, records: list[BookRecord]) -> None:
+    outputFile.write(";".join(PDF_info_header) + "\n")
+    for record in records:
+        filename = record.title
+        outputFile.write(f"{filename};")
+        outputFile.write(f"{len(filename)};")
+        outputFile.write(f"{len(filename.strip().split())};")
+        word_list = record.tags
+        for word in word_list:
+            outputFile.write(f"#{word}")
+            if word != word_list[-1]:
+                outputFile.write(" ")
+        outputFile.write(f";{len(word_list)};")
+        outputFile.write(f"{record.pages};")
+        outputFile.write(f"{record.file_size};")
+        outputFile.write(f"{record.get_updated_time_text()}\n")
+
+def legacy_tag_catalog(outputFile: CountingWriter, records: list[BookRecord]) -> None:
+    word_set = sorted(set().union(*(record.tags for record in records)))
+    tag_set_display = DataProcess.break_tag_set_to_list(word_set)
+    outputFile.write("\n# Tags (Total: " + str(len(word_set)) + ")\n")
+    for char in tag_set_display:
+        outputFile.write(f"\n## {char.upper()} ({len(tag_set_display[char])})\n\n")
+        if tag_set_display[char] == []:
+            outputFile.write("There is no tag in this category.")
+        for tag in tag_set_display[char]:
+            outputFile.write(f"#{tag} ")
+        outputFile.write("\n")
+
+def count_chunks(chunks: Iterator[str], counter: list[int]) -> Iterator[str]:
+    """Pass the chunks through, counting them: `Output.write_chunks` makes one write call per chunk."""
+    for chunk in chunks:
+        counter[0] += 1
+        yield chunk
+
+def get_documents(records: list[BookRecord]) -> dict[str, tuple]:
+    """Return, per document, its legacy exporter and a function returning its fragments."""
+    word_set = sorted(set().union(*(record.tags for record in records)))
+    return {"PDF index": (legacy_pdf_index, lambda: Render.render_pdf_index(records)),
+            "PDF info": (legacy_pdf_info, lambda: Render.render_csv(PDF_info_header, get_PDF_info_rows(records))),
+            "Tag Catalog": (legacy_tag_catalog,
+                            lambda: Render.render_tag_catalog(DataProcess.break_tag_set_to_list(word_set), len(word_set)))}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the rendering of the catalog documents.")
+    parser.add_argument("--books", type=int, default=20000, help="number of synthetic books")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs, the fastest is reported")
+    args = parser.parse_args()
+
+    records = make_records(args.books)
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"{args.books} books, best of {args.repeat} runs")
+        print(f"{'Document':<12} {'Before (writes)':>16} {'After (writes)':>15} {'Before (s)':>11} {'After (s)':>10}")
+        for name, (legacy, render) in get_documents(records).items():
+            before_path = os.path.join(folder, name + ".before")
+            after_path = os.path.join(folder, name + ".after")
+            before_time = after_time = float("inf")
+            for _ in range(args.repeat):
+                for file_path in (before_path, after_path):
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
+                start = time.perf_counter()
+                with open(before_path, "w", encoding="utf-8", newline="") as outputFile:
+                    writer = CountingWriter(outputFile)
+                    legacy(writer, records)
+                before_time = min(before_time, time.perf_counter() - start)
+
+                counter = [0]
+                start = time.perf_counter()
+                Output.write_chunks(count_chunks(Render.iter_chunks(render()), counter), after_path)
+                after_time = min(after_time, time.perf_counter() - start)
+
+            with open(before_path, "rb") as before, open(after_path, "rb") as after:
+                if before.read() != after.read():
+                    raise SystemExit(f"{name}: the rendered document differs from the legacy one")
+            print(f"{name:<12} {writer.calls:>16} {counter[0]:>15} {before_time:>11.4f} {after_time:>10.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,71 @@
 import argparse
-from modules.DataProcess import get_banned_words
-import modules.Export as Export
+import os
+import sys
 import modules.path as path
+from modules import Profiler
+from modules.Lazy import lazy_import
+
+# Loaded on first use, so that a quick search from a shell hook does not import the exporters it does not run.
+Export = lazy_import("modules.Export")
+DataProcess = lazy_import("modules.DataProcess")
+Server = lazy_import("modules.Server")
+
+def parse_date(text: str) -> "datetime":
+    """Parse a date given on the command line in ISO format, e.g. 2024-05-17."""
+    from datetime import datetime
+    return datetime.fromisoformat(text)
+
+def add_subcommands(parser: argparse.ArgumentParser) -> None:
+    """
+    Add one subcommand per action of the application, next to the legacy flags.
+
+    Parameters:
+        parser (argparse.ArgumentParser): The parser of the application.
+
+    Returns:
+        None
+
+    Each subcommand sets the same attribute as its legacy flag, e.g. `main.py search "data*"` sets `searchFile`
+    like `main.py --searchFile "data*"`, so both spellings run the same code. The options of the subcommands
+    default to `argparse.SUPPRESS` so that they do not overwrite the legacy flags given before the subcommand.
+    """
+    subparsers = parser.add_subparsers(title="commands", metavar="COMMAND")
+    for name, flag, help in (("tags", "exportTagSet", "same as --exportTagSet"),
+                             ("info", "exportPDF_info", "same as --exportPDF_info"),
+                             ("index", "exportPDF_index", "same as --exportPDF_index"),
+                             ("stat", "updateStat", "same as --updateStat"),
+                             ("tokens", "exportPDF_tokens", "same as --exportPDF_tokens"),
+                             ("update", "updateData", "same as --updateData"),
+                             ("update-all", "updateAllVaults", "same as --updateAllVaults"),
+                             ("watch", "watch", "same as --watch"),
+                             ("tasks", "getTaskList", "same as --getTaskList"),
+                             ("duplicates", "findDuplicates", "same as --findDuplicates"),
+                             ("serve", "serve", "same as --serve")):
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.set_defaults(**{flag: True})
+        if name in ("info", "update", "update-all", "watch", "duplicates", "serve"):
+            subparser.add_argument("--workers", type=int, default=argparse.SUPPRESS, help="Number of threads used to read the metadata of PDF files")
+        if name == "update-all":
+            subparser.add_argument("--processes", type=int, default=argparse.SUPPRESS, help="Number of worker processes, one per vault by default")
+        if name == "tasks":
+            subparser.add_argument("--count", dest="taskCount", type=int, default=argparse.SUPPRESS, help="Number of books to pick")
+        if name == "duplicates":
+            subparser.add_argument("--similarity", type=float, default=argparse.SUPPRESS, help="Lowest Jaccard similarity of the tags of two titles reported as similar")
+        if name == "serve":
+            subparser.add_argument("--server", type=str, default=argparse.SUPPRESS, help="Address to listen on, HOST:PORT or unix:PATH")
+        if name in ("info", "update", "update-all", "watch", "serve"):
+            subparser.add_argument("--keywords", dest="pdfKeywords", action="store_true", default=argparse.SUPPRESS, help="Add the words of the metadata and the first page of each PDF file to its tags")
+        if name in ("update", "update-all"):
+            subparser.add_argument("--rebuild", action="store_true", default=argparse.SUPPRESS, help="Ignore the manifest and process every PDF file again")
+
+    subparsers.add_parser("search", help="same as --searchFile").add_argument("searchFile", metavar="QUERY", help="Tags to search for, e.g. \"machine learning OR data*\"")
+    subparsers.add_parser("fuzzy", help="same as --fuzzySearchFile").add_argument("fuzzySearchFile", metavar="QUERY", help="Title to search for, tolerating typos")
+    tagged = subparsers.add_parser("tagged", help="same as --booksTagged")
+    tagged.add_argument("booksTagged", metavar="TAG", help="The tag the books must carry")
+    tagged.add_argument("--since", dest="modifiedSince", type=parse_date, default=argparse.SUPPRESS, help="Only list the books modified since the given date (YYYY-MM-DD)")
+    subparsers.add_parser("related", help="same as --relatedTags").add_argument("relatedTags", metavar="TAG", help="The tag to find related tags for")
+    subparsers.add_parser("similar", help="same as --similarBooks").add_argument("similarBooks", metavar="TITLE", help="The title of the book to find similar books for")
+    subparsers.add_parser("largest", help="same as --largestUnread").add_argument("largestUnread", metavar="N", type=int, help="Number of books to list")
 
 def app(): 
     
@@ -16,19 +80,81 @@ def app():
     parser.add_argument("--updateStat", action= 'store_true', help="Update the statistics of PDF files")
     parser.add_argument("--exportPDF_tokens", action= 'store_true', help="Export a CSV file with the tokens of the files in the specified folder path")
     parser.add_argument("--updateData", action= 'store_true', help="Update all statistics of PDF files")
+    parser.add_argument("--rebuild", action= 'store_true', help="Ignore the manifest and process every PDF file again when used with --updateData or --updateAllVaults")
+    parser.add_argument("--updateAllVaults", action= 'store_true', help="Update every vault of the configuration file in parallel, then merge their tag catalogs, PDF indexes and statistics")
+    parser.add_argument("--processes", type=int, default=None, help="Number of worker processes used by --updateAllVaults, one per vault by default")
+    parser.add_argument("--watch", action= 'store_true', help="Keep the catalog up to date with the BOOKS folder until interrupted")
+    parser.add_argument("--serve", action= 'store_true', help="Answer the queries of local clients from a catalog kept in memory and up to date with the BOOKS folder until interrupted")
+    parser.add_argument("--server", type=str, default=None, help="Address of the query server, HOST:PORT or unix:PATH: send the searches, queries and task picks to it, or listen on it with --serve")
+    parser.add_argument("--workers", type=int, default=None, help="Number of threads used to read the metadata of PDF files")
+    parser.add_argument("--pdfKeywords", action= 'store_true', help="Add the words of the title and subject metadata and of the first page of each PDF file to its tags")
     parser.add_argument("--getTaskList", action= 'store_true', help="Export a list of tasks in .md format")
-    parser.add_argument("--searchFile", type=str, help="Search for files in the specified folder path")
+    parser.add_argument("--taskCount", type=int, default=3, help="Number of books picked by --getTaskList")
+    parser.add_argument("--findDuplicates", action= 'store_true', help="Export a report of the identical PDF files and of the books with nearly the same title")
+    parser.add_argument("--similarity", type=float, default=0.5, help="Lowest Jaccard similarity of the tags of two titles reported by --findDuplicates")
+    parser.add_argument("--searchFile", type=str, help="Search for files in the specified folder path by tags, e.g. \"machine learning OR data*\"")
+    parser.add_argument("--fuzzySearchFile", type=str, help="Search for files in the specified folder path by title, tolerating typos")
+
+    parser.add_argument("--booksTagged", type=str, help="List the books of the catalog database carrying the given tag")
+    parser.add_argument("--modifiedSince", type=parse_date, default=None, help="Only list the books modified since the given date (YYYY-MM-DD) when used with --booksTagged")
+    parser.add_argument("--relatedTags", type=str, help="List the tags that most often appear on the same books as the given tag")
+    parser.add_argument("--similarBooks", type=str, help="List the books whose tags are the most similar to those of the given title")
+    parser.add_argument("--largestUnread", type=int, help="List the given number of largest books that were never given as a reading task")
+    parser.add_argument("--vault", type=str, default=None, help="Name of the vault of the configuration file to work on, the first one by default")
+    parser.add_argument("--profile", action= 'store_true', help="Print the time, calls, items and bytes of each stage of the commands")
+    parser.add_argument("--profileDump", type=str, default=None, help="Profile the commands with cProfile and write the statistics to the given file, implies --profile")
+    parser.add_argument("--profileTrace", type=str, default=None, help="Write the stages of the commands to the given JSON trace file, for chrome://tracing or Perfetto, implies --profile")
+
+    add_subcommands(parser)
 
     args = parser.parse_args()
 
+    if args.vault is not None:
+        try:
+            path.use_vault(path.get_vault(args.vault))
+        except KeyError as error:
+            parser.error(error.args[0])
+
+    if args.profile or args.profileDump or args.profileTrace:
+        Profiler.enable(trace=args.profileTrace is not None)
+    profiler = None
+    if args.profileDump:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    try:
+        run_commands(args)
+    except Server.ServerError as error:
+        parser.error(error.args[0])
+    except BrokenPipeError:
+        # The reader of the output, such as `head`, exited: stop quietly instead of failing again on flush.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        sys.exit(1)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profileDump)
+        if args.profileTrace:
+            Profiler.write_trace(args.profileTrace)
+    if Profiler.enabled:
+        Export.AnnounceProfile()
+
+def run_commands(args: argparse.Namespace) -> None:
+    """
+    Run the commands selected by the flags and subcommands parsed by `app`.
+
+    With --server and without --serve, the searches, queries and task picks the query server answers are sent
+    to it by `query_server`, and the other commands still run here.
+    """
+    remote = args.server is not None and not args.serve
     if args.exportTagSet:
-        banned_word = get_banned_words(path.ban_path)
+        banned_word = DataProcess.get_banned_words(path.ban_path)
         Export.exportTagSet(path.BOOKS_folder_path, banned_word)
         Export.AnnounceFinish()
 
     if args.exportPDF_info:
-        banned_word = get_banned_words(path.ban_path)
-        Export.exportPDF_info(path.BOOKS_folder_path, banned_word)
+        banned_word = DataProcess.get_banned_words(path.ban_path)
+        Export.exportPDF_info(path.BOOKS_folder_path, banned_word, workers=args.workers, content_tags=args.pdfKeywords)
         Export.AnnounceFinish()
 
     if args.exportPDF_index:
@@ -44,24 +170,81 @@ def app():
         Export.AnnounceFinish()
 
     if args.updateData:
-        banned_word = get_banned_words(path.ban_path)
-        Export.exportTagSet(path.BOOKS_folder_path, banned_word)
-        Export.exportPDF_index(path.BOOKS_folder_path)
-
-        Export.exportPDF_info(path.BOOKS_folder_path, banned_word)
-        Export.updateStat(path.PDF_info_path)
-        Export.exportPDF_tokens(path.PDF_info_path)
+        banned_word = DataProcess.get_banned_words(path.ban_path)
+        Export.updateData(path.BOOKS_folder_path, banned_word, args.rebuild, args.workers, args.pdfKeywords)
 
         Export.rewrite_ban_file(banned_word)
         
         Export.AnnounceFinish()
 
+    if args.updateAllVaults:
+        banned_word = DataProcess.get_banned_words(path.ban_path)
+        Export.updateVaults(banned_word, args.rebuild, args.workers, args.processes, args.pdfKeywords)
+
+        Export.rewrite_ban_file(banned_word)
+
+        Export.AnnounceFinish()
+
+    if args.watch:
+        Export.watch(path.BOOKS_folder_path, args.workers, content_tags=args.pdfKeywords)
+        Export.AnnounceFinish()
+
+    if args.serve:
+        Export.serve(path.BOOKS_folder_path, args.server, args.workers, args.pdfKeywords)
+        Export.AnnounceFinish()
+    elif remote:
+        query_server(args)
+
+    if args.getTaskList and not remote:
+        Export.pick_number_random_book_to_read(args.taskCount)
+        Export.AnnounceFinish()
+
+    if args.findDuplicates:
+        banned_word = DataProcess.get_banned_words(path.ban_path)
+        Export.exportDuplicates(path.BOOKS_folder_path, banned_word, args.similarity, args.workers)
+        Export.AnnounceFinish()
+
+    if args.searchFile and not remote:
+        Export.search_file(args.searchFile)
+
+    if args.fuzzySearchFile and not remote:
+        Export.fuzzy_search_file(args.fuzzySearchFile)
+
+    if args.booksTagged and not remote:
+        Export.query_books_tagged(args.booksTagged, args.modifiedSince)
+
+    if args.relatedTags and not remote:
+        Export.related_tags(args.relatedTags)
+
+    if args.similarBooks and not remote:
+        Export.similar_books(args.similarBooks)
+
+    if args.largestUnread:
+        Export.query_largest_unread(args.largestUnread)
+
+def query_server(args: argparse.Namespace) -> None:
+    """Send the searches, queries and task picks selected by the flags and subcommands to the query server."""
     if args.getTaskList:
-        Export.pick_number_random_book_to_read()
+        Export.query_server(args.server, "/tasks", {"count": args.taskCount})
         Export.AnnounceFinish()
 
     if args.searchFile:
-        Export.search_file(args.searchFile)
+        Export.query_server(args.server, "/search", {"q": args.searchFile})
+
+    if args.fuzzySearchFile:
+        Export.query_server(args.server, "/fuzzy", {"q": args.fuzzySearchFile})
+
+    if args.booksTagged:
+        parameters = {"tag": args.booksTagged}
+        if args.modifiedSince is not None:
+            parameters["since"] = args.modifiedSince.isoformat()
+        Export.query_server(args.server, "/tagged", parameters)
+
+    if args.relatedTags:
+        Export.query_server(args.server, "/related", {"tag": args.relatedTags})
+
+    if args.similarBooks:
+        Export.query_server(args.server, "/similar", {"title": args.similarBooks})
 
 if __name__ == '__main__':
     app()
@@ -0,0 +1,168 @@
+import mmap
+import struct
+import sys
+from array import array
+from modules.Lazy import lazy_import
+from modules.Record import BookRecord, TIME_FORMAT
+
+Output = lazy_import("modules.Output")
+
+MAGIC = b"STUDYCAT"
+VERSION = 2
+READABLE_VERSIONS = (1, 2)
+HEADER = struct.Struct("<8sIIQc7x")
+DIRECTORY_ENTRY = struct.Struct("<32scxxxxxxxQQ")
+NUMERIC_COLUMNS = ("Title Length (char)", "Title Length (word)", "Tag Number", "Pages", "File Size (Kb)", "Updated Time")
+BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+
+def encode_strings(strings: list[str]) -> tuple[array, array]:
+    """
+    Pack strings into a string table.
+
+    Parameters:
+        strings (list[str]): The strings to pack.
+
+    Returns:
+        tuple[array, array]: The offsets of the strings, one more than there are strings, and their UTF-8 bytes
+        laid end to end. The i-th string is the bytes between the i-th and the (i+1)-th offsets.
+    """
+    offsets = array("I", [0])
+    data = bytearray()
+    for string in strings:
+        data += string.encode("utf-8")
+        offsets.append(len(data))
+    return offsets, array("B", data)
+
+def decode_strings(offsets: array, data: bytes) -> list[str]:
+    """Unpack the strings of a string table written by `encode_strings`."""
+    return [bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8") for i in range(len(offsets) - 1)]
+
+def write_catalog(catalog_file: str, records: list[BookRecord]) -> None:
+    """
+    Write the book records to a columnar binary catalog.
+
+    Parameters:
+        catalog_file (str): The path to the catalog file.
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        None
+
+    The file is written in version `VERSION` of the layout. It starts with a header and a directory giving the
+    type, offset and length of every column, followed by the columns themselves, each aligned on 8 bytes:
+        - one fixed-width integer column per entry of `NUMERIC_COLUMNS`, as narrow as its values allow, with the
+          updated time as seconds since EPOCH,
+        - the titles as a string table,
+        - the distinct tags as a string table, with the tag ids of each book as offsets into a flat id column.
+    A reader maps the file in memory and only touches the pages of the columns it asks for. The file is written
+    by `Output.write_document`, so a reader never maps a half-written catalog.
+    """
+    tag_ids = {}
+    book_tag_offsets = array("I", [0])
+    book_tag_ids = array("I")
+    for record in records:
+        for tag in record.tags:
+            book_tag_ids.append(tag_ids.setdefault(tag, len(tag_ids)))
+        book_tag_offsets.append(len(book_tag_ids))
+    title_offsets, title_data = encode_strings([record.title for record in records])
+    tag_offsets, tag_data = encode_strings(list(tag_ids))
+
+    columns = {"Title Length (char)": array("I", (record.title_length_char for record in records)),
+               "Title Length (word)": array("H", (record.title_length_word for record in records)),
+               "Tag Number": array("H", (record.tag_number for record in records)),
+               "Pages": array("I", (record.pages for record in records)),
+               "File Size (Kb)": array("q", (record.file_size for record in records)),
+               "Updated Time": array("q", (record.updated_time for record in records)),
+               "Title.offsets": title_offsets,
+               "Title.data": title_data,
+               "Multi-Tags.offsets": book_tag_offsets,
+               "Multi-Tags.ids": book_tag_ids,
+               "Tag Table.offsets": tag_offsets,
+               "Tag Table.data": tag_data}
+
+    offset = HEADER.size + DIRECTORY_ENTRY.size * len(columns)
+    directory = []
+    for name, column in columns.items():
+        offset += -offset % 8
+        length = len(column) * column.itemsize
+        directory.append(DIRECTORY_ENTRY.pack(name.encode("utf-8"), column.typecode.encode("ascii"), offset, length))
+        offset += length
+
+    data = bytearray(HEADER.pack(MAGIC, VERSION, len(columns), len(records), BYTE_ORDER))
+    data += b"".join(directory)
+    for column in columns.values():
+        data += b"\0" * (-len(data) % 8)
+        data += column.tobytes()
+    Output.write_document(bytes(data), catalog_file)
+
+def is_readable(catalog_file: str) -> bool:
+    """Tell whether a catalog exists and was written in one of the `READABLE_VERSIONS` `read_catalog_columns` reads."""
+    try:
+        with open(catalog_file, "rb") as inputFile:
+            magic, version, *_ = HEADER.unpack(inputFile.read(HEADER.size))
+    except (OSError, struct.error):
+        return False
+    return magic == MAGIC and version in READABLE_VERSIONS
+
+def read_catalog_columns(catalog_file: str, names: list[str]) -> dict[str, array | list]:
+    """
+    Read some columns of a catalog written by `write_catalog`.
+
+    Parameters:
+        catalog_file (str): The path to the catalog file.
+        names (list[str]): The columns to read: any of `NUMERIC_COLUMNS`, "Title" and "Multi-Tags".
+
+    Returns:
+        dict[str, array | list]: The numeric columns as integer arrays, the titles as a list of strings and the
+        tags as a list of lists of strings, in the order of the records.
+
+    Raises:
+        ValueError: If the file is not a catalog of a supported version.
+
+    A numeric column missing from a catalog of an older version, such as the "Pages" of version 1, is read as
+    zeros, its values being unknown.
+    """
+    with open(catalog_file, "rb") as inputFile, mmap.mmap(inputFile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        magic, version, column_count, record_count, byte_order = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version not in READABLE_VERSIONS:
+            raise ValueError(f"{catalog_file} is not a catalog of a version among {READABLE_VERSIONS}")
+        directory = {}
+        for i in range(column_count):
+            name, typecode, offset, length = DIRECTORY_ENTRY.unpack_from(mapped, HEADER.size + DIRECTORY_ENTRY.size * i)
+            directory[name.rstrip(b"\0").decode("utf-8")] = (typecode.decode("ascii"), offset, length)
+
+        def read(name: str) -> array:
+            if name not in directory and name in NUMERIC_COLUMNS:
+                return array("I", bytes(4 * record_count))
+            typecode, offset, length = directory[name]
+            column = array(typecode, mapped[offset:offset + length])
+            if byte_order != BYTE_ORDER:
+                column.byteswap()
+            return column
+
+        columns = {}
+        for name in names:
+            if name == "Title":
+                columns[name] = decode_strings(read("Title.offsets"), read("Title.data"))
+            elif name == "Multi-Tags":
+                tag_table = decode_strings(read("Tag Table.offsets"), read("Tag Table.data"))
+                offsets, ids = read("Multi-Tags.offsets"), read("Multi-Tags.ids")
+                columns[name] = [[tag_table[tag_id] for tag_id in ids[offsets[i]:offsets[i + 1]]] for i in range(len(offsets) - 1)]
+            else:
+                columns[name] = read(name)
+    return columns
+
+def read_catalog_records(catalog_file: str) -> list[BookRecord]:
+    """
+    Read every book record back from a catalog written by `write_catalog`.
+
+    Parameters:
+        catalog_file (str): The path to the catalog file.
+
+    Returns:
+        list[BookRecord]: The records, like the ones returned by `DataProcess.get_book_records`.
+    """
+    columns = read_catalog_columns(catalog_file, ["Title", "Multi-Tags", "File Size (Kb)", "Updated Time", "Pages"])
+    return [BookRecord(title, tags, file_size, updated_time, pages)
+            for title, tags, file_size, updated_time, pages
+            in zip(columns["Title"], columns["Multi-Tags"], columns["File Size (Kb)"], columns["Updated Time"], columns["Pages"])]
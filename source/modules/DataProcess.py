@@ -1,31 +1,64 @@
 import os
+import pickle
+import sys
 from os.path import getmtime
 from time import ctime
 from datetime import datetime
-import statistics
-from math import ceil
-import random
-
-def get_banned_words(filepath: str) -> set[str]:
+from math import ceil, floor, fsum, sqrt
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from collections.abc import Iterable
+from operator import mul
+from modules.Lazy import lazy_import
+from modules import Profiler
+from modules.Record import BookRecord, parse_updated_time
+
+json = lazy_import("json")
+hashlib = lazy_import("hashlib")
+futures = lazy_import("concurrent.futures")
+csv = lazy_import("csv")
+random = lazy_import("random")
+re = lazy_import("re")
+Output = lazy_import("modules.Output")
+PDFScan = lazy_import("modules.PDFScan")
+
+@Profiler.timed("ban list")
+def get_banned_words(filepath: str, cache_path: str = None) -> frozenset[str]:
     """
-    Reads a file at the given `filepath` and returns a sorted set of banned words.
+    Reads a file at the given `filepath` and returns a frozen set of banned words.
 
     Parameters:
         filepath (str): The path to the file containing the banned words.
+        cache_path (str, optional): The path to a binary cache of the banned words. Defaults to `filepath` with
+            the ".cache" suffix.
 
     Returns:
-        set[str]: A sorted set of banned words.
+        frozenset[str]: A frozen set of banned words.
 
     This function reads a file at the given `filepath` and adds each line to a set of banned words.
     The lines are stripped of any leading or trailing whitespace before being added to the set.
-    The set is then sorted and returned.
+    The set is kept in a pickled cache along with the size and modification time of the file, so later calls
+    load the set directly from the cache and only read the file again once it has changed.
     """
-    banned_words = set()
-    with open(filepath, 'r') as file:
-        for line in file:
-            banned_words.add(line.strip())
-    return sorted(banned_words)
-
+    if cache_path is None:
+        cache_path = os.path.splitext(filepath)[0] + ".cache"
+    file_stat = os.stat(filepath)
+    try:
+        with open(cache_path, 'rb') as cache:
+            cached = pickle.load(cache)
+        if cached["Size"] == file_stat.st_size and cached["Mtime"] == file_stat.st_mtime_ns:
+            return cached["Words"]
+    except (OSError, pickle.UnpicklingError, EOFError, KeyError, TypeError):
+        pass
+
+    with open(filepath, 'r', encoding="utf-8") as file:
+        banned_words = frozenset(line.strip() for line in file)
+    Output.write_document(pickle.dumps({"Size": file_stat.st_size, "Mtime": file_stat.st_mtime_ns, "Words": banned_words},
+                                       protocol=pickle.HIGHEST_PROTOCOL), cache_path)
+    return banned_words
+
+@Profiler.timed("listdir")
 def get_pdf_name(folderPath: str) -> list[str]:
     """
     Get the names of PDF files in the specified folder path.
@@ -41,8 +74,39 @@ def get_pdf_name(folderPath: str) -> list[str]:
     for file in fileList:
         if file.endswith(".pdf"):
             pdfNameList.append(file.removesuffix(".pdf"))
+    Profiler.count(items=len(pdfNameList))
     return sorted(pdfNameList)
 
+def scan_pdf_files(folderPath: str, workers: int = None) -> list[tuple[str, os.stat_result]]:
+    """
+    List the PDF files in the specified folder path together with their stat results.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        workers (int, optional): The number of threads used to stat the files. Defaults to the default of
+            `concurrent.futures.ThreadPoolExecutor`. With 1, the files are stat-ed serially.
+
+    Returns:
+        list[tuple[str, os.stat_result]]: The PDF file names without the ".pdf" suffix, sorted alphabetically as in
+        `get_pdf_name`, each with the stat result of its file.
+
+    The folder is read with `os.scandir`, whose directory entries carry the path of each file and, on Windows,
+    its stat data, so no path is built by hand. The remaining stat calls, which are round trips on a network
+    share, are spread over a bounded thread pool. Results keep the order of the sorted names, so the output
+    does not depend on the number of workers.
+    """
+    with Profiler.stage("listdir"), os.scandir(folderPath) as entries:
+        pdf_entries = sorted(((entry.name.removesuffix(".pdf"), entry) for entry in entries if entry.name.endswith(".pdf")),
+                             key=lambda item: item[0])
+        Profiler.count(items=len(pdf_entries))
+    with Profiler.stage("stat"):
+        Profiler.count(items=len(pdf_entries))
+        if workers == 1 or len(pdf_entries) < 2:
+            return [(filename, entry.stat()) for filename, entry in pdf_entries]
+        with futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            file_stats = executor.map(lambda item: item[1].stat(), pdf_entries)
+            return [(filename, file_stat) for (filename, _), file_stat in zip(pdf_entries, file_stats)]
+
 def get_double_word_list_from_file(word_list: list[str]) -> set[str]:
     two_word_tags = set()
     for i in range(len(word_list) - 1):
@@ -57,6 +121,95 @@ def get_triple_word_list_from_file(word_list: list[str]) -> set[str]:
         three_word_tags.add(tag)
     return three_word_tags
 
+NORMALIZATION_RULES = (("C++", "C_pp"), ("C#", "C_sharp"))
+
+class Tokenizer:
+    """
+    Turn titles into tags, remembering the tags of the titles it has seen.
+
+    Parameters:
+        capacity (int): The number of titles whose tags are kept. The least recently used ones are dropped first.
+
+    The tags of a title are kept under the title and the version of the banned words they were computed with,
+    see `get_banned_words_version`, so a change of the banned words never returns stale tags. Tokenizing a
+    library that did not change, as the tag catalog, the PDF info and the PDF index of the same run do, costs one
+    dictionary lookup per title. The number of lookups answered from the cache and of titles tokenized are
+    counted in `hits` and `misses`.
+
+    The normalization rules, such as "C++" becoming "C_pp", are compiled into a single pattern, and applied once
+    per distinct word instead of once per tag: the bigrams and trigrams are joined from the normalized words.
+    """
+
+    def __init__(self, capacity: int = 1 << 18) -> None:
+        self.capacity = capacity
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.versions = {}
+        self.word_forms = {}
+        self.replacements = dict(NORMALIZATION_RULES)
+        self.pattern = re.compile("|".join(re.escape(old) for old, _ in NORMALIZATION_RULES))
+
+    def get_version(self, banned_words: set[str]) -> str:
+        """Fingerprint the banned words like `get_banned_words_version`, once per distinct set."""
+        key = banned_words if isinstance(banned_words, frozenset) else frozenset(banned_words)
+        if key not in self.versions:
+            self.versions[key] = get_banned_words_version(key)
+        return self.versions[key]
+
+    def normalize(self, word: str) -> str:
+        """
+        Apply the normalization rules to a word of a title.
+
+        The form is returned from a local variable rather than read back from `word_forms`, which another thread
+        normalizing words at the same time, such as the query server answering a query during a refresh, may
+        have cleared in between.
+        """
+        form = self.word_forms.get(word)
+        if form is None:
+            form = sys.intern(self.pattern.sub(lambda match: self.replacements[match.group()], word))
+            if len(self.word_forms) >= self.capacity:
+                self.word_forms.clear()
+            self.word_forms[word] = form
+        return form
+
+    def tokenize(self, title: str, banned_words: set[str]) -> tuple[str, ...]:
+        """
+        Find the tags of a title: its words, bigrams and trigrams, normalized, without the banned words.
+
+        Parameters:
+            title (str): The title of a book.
+            banned_words (set[str]): A set of words to be excluded from the tags.
+
+        Returns:
+            tuple[str, ...]: The sorted tags, each interned.
+        """
+        key = (title, self.get_version(banned_words))
+        tags = self.cache.get(key)
+        if tags is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            return tags
+
+        self.misses += 1
+        word_forms = self.word_forms
+        words = [word_forms.get(word) or self.normalize(word) for word in title.split()]
+        tag_set = set(words)
+        tag_set.update(map("_".join, zip(words, words[1:])))
+        tag_set.update(map("_".join, zip(words, words[1:], words[2:])))
+        tag_set.difference_update(banned_words)
+        tags = tuple(map(sys.intern, sorted(tag_set)))
+        self.cache[key] = tags
+        if len(self.cache) > self.capacity:
+            self.cache.popitem(last=False)
+        return tags
+
+    def get_stats(self) -> dict[str, int]:
+        """Report the "Hits", "Misses" and "Size" of the cache."""
+        return {"Hits": self.hits, "Misses": self.misses, "Size": len(self.cache)}
+
+tokenizer = Tokenizer()
+
 def get_word_list_from_file(filename: str, banned_words: set[str]) -> set[str]:
     """
     Generate a set of words from a given filename, excluding banned words and double words.
@@ -71,17 +224,11 @@ def get_word_list_from_file(filename: str, banned_words: set[str]) -> set[str]:
     This function splits the filename into words, creates a set of tuned words by removing duplicates, and then
     adds double and triple word tags to the set. It replaces "C++" with "C_pp" and "C#" with "C_sharp" in the
     tuned words. Finally, it removes the banned words from the set and returns the sorted set of tuned words.
+    Pass `banned_words` as a set, such as the one returned by `get_banned_words`, so that each word is checked
+    against it by a single hash lookup. The words are found by the shared `tokenizer`, which remembers the
+    words of the titles it has already seen.
     """
-    words = filename.strip().split()
-    tuned_words = set(words)
-    double_words = get_double_word_list_from_file(words)
-    triple_words = get_triple_word_list_from_file(words)
-
-    tuned_words = tuned_words.union(double_words)
-    tuned_words = tuned_words.union(triple_words)
-    tuned_words = {word.replace("C++", "C_pp").replace("C#", "C_sharp") for word in tuned_words}
-    tuned_words = tuned_words.difference(banned_words)
-    return sorted(tuned_words)
+    return list(tokenizer.tokenize(filename, banned_words))
 
 def get_tuned_word_list_from_folder(folderPath: str, banned_words: set[str]) -> set[str]:
     """
@@ -96,16 +243,217 @@ def get_tuned_word_list_from_folder(folderPath: str, banned_words: set[str]) ->
 
     This function retrieves the filenames of PDF files in the specified folder path using the `get_pdf_name` function.
     It then iterates over each filename and calls the `get_word_list_from_file` function to extract the words from the PDF file.
-    The extracted words are added to the `word_set` set using the `union` method. Finally, the `word_set` is sorted and returned.
+    The extracted words are added to the `word_set` set in place using the `update` method. Finally, the `word_set` is sorted and returned.
 
     Note: The `get_pdf_name` and `get_word_list_from_file` functions must be imported for this function to work properly.
     """
     word_set = set()
     filename_list = get_pdf_name(folderPath)
     for filename in filename_list:
-        word_set = word_set.union(get_word_list_from_file(filename, banned_words))
+        word_set.update(get_word_list_from_file(filename, banned_words))
     return sorted(word_set)
 
+def get_book_records(folderPath: str, banned_words: set[str], include_file_stat: bool = True, workers: int = None,
+                     content_cache: str = None, content_tags: bool = False) -> list[BookRecord]:
+    """
+    Scan the folder once and build an in-memory record for every PDF file in it.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        include_file_stat (bool): Whether to stat each file for its size and updated time.
+        workers (int, optional): The number of threads used to stat the files, as in `scan_pdf_files`.
+        content_cache (str, optional): The path to the cache of `PDFScan.scan_files`. When given along with
+            `include_file_stat`, the files are scanned for their page count.
+        content_tags (bool): Whether to also add the words of the metadata and the first page of each file to its
+            tags, see `PDFScan.get_keywords`.
+
+    Returns:
+        list[BookRecord]: A list of records sorted by title. Each record holds the title and tags of a book and,
+        when `include_file_stat` is set, its file size and updated time, and its page count when `content_cache`
+        is given.
+
+    The folder is listed a single time and each title is tokenized a single time, so every exporter can be fed
+    from the same records instead of scanning the folder and tokenizing the titles again. Each file is stat-ed
+    once for both its size and its modification time, through `scan_pdf_files`.
+    """
+    if not include_file_stat:
+        filenames = get_pdf_name(folderPath)
+        with Profiler.stage("tokenize"):
+            Profiler.count(items=len(filenames))
+            return [make_book_record(filename, banned_words) for filename in filenames]
+    file_stats = scan_pdf_files(folderPath, workers)
+    contents = {} if content_cache is None else PDFScan.scan_files(folderPath, file_stats, content_cache, content_tags)
+    with Profiler.stage("tokenize"):
+        Profiler.count(items=len(file_stats))
+        return [make_book_record(filename, banned_words, file_stat, contents.get(filename)) for filename, file_stat in file_stats]
+
+def make_book_record(filename: str, banned_words: set[str], file_stat: os.stat_result = None, content: dict = None) -> BookRecord:
+    """
+    Build the record of a single book from its title and, optionally, the result of `os.stat` on its file.
+
+    Parameters:
+        filename (str): The title of the book, i.e. the PDF file name without the ".pdf" suffix.
+        banned_words (set[str]): A set of words to be excluded from the tags of the book.
+        file_stat (os.stat_result, optional): The stat result of the PDF file.
+        content (dict, optional): The scan of the PDF file, as returned by `PDFScan.scan_files`.
+
+    Returns:
+        BookRecord: The record with the title and tags of the book, plus its file size and updated time when
+        `file_stat` is given, and its page count and the tags found in the file when `content` is given.
+    """
+    tags = tokenizer.tokenize(filename, banned_words)
+    if file_stat is None:
+        return BookRecord(filename, tags)
+    if content is None:
+        return BookRecord(filename, tags, int(ceil(file_stat.st_size/1024)), int(file_stat.st_mtime))
+    keywords = PDFScan.get_keywords(content, banned_words)
+    if keywords:
+        tags = sorted(set(tags).union(keywords))
+    return BookRecord(filename, tags, int(ceil(file_stat.st_size/1024)), int(file_stat.st_mtime), content["Pages"])
+
+def get_banned_words_version(banned_words: set[str]) -> str:
+    """
+    Compute a short fingerprint of a set of banned words, used to tell whether cached tags are still valid.
+
+    Parameters:
+        banned_words (set[str]): The set of banned words.
+
+    Returns:
+        str: A hexadecimal digest that changes whenever the set of banned words changes.
+    """
+    return hashlib.md5("\n".join(sorted(banned_words)).encode("utf-8")).hexdigest()
+
+MANIFEST_FORMAT = 3
+
+@Profiler.timed("manifest")
+def load_manifest(manifest_file: str) -> dict:
+    """
+    Load the manifest of the previous scan, or an empty manifest when there is none yet.
+
+    Parameters:
+        manifest_file (str): The path to the manifest JSON file.
+
+    Returns:
+        dict: The manifest, with the fingerprint of the banned words and of the scan options under "Banned Words"
+        and, under "Files",
+        an entry per file name holding its "Size" in bytes, its "Mtime" in nanoseconds and its `BookRecord`
+        under "Record". A manifest written in an older format is treated as missing.
+    """
+    if not os.path.exists(manifest_file):
+        return {"Banned Words": "", "Files": {}}
+    with open(manifest_file, "r") as inputFile:
+        manifest = json.load(inputFile)
+    Profiler.count(bytes_read=os.path.getsize(manifest_file))
+    if manifest.get("Format") != MANIFEST_FORMAT:
+        return {"Banned Words": "", "Files": {}}
+    for entry in manifest["Files"].values():
+        entry["Record"] = BookRecord.from_list(entry["Record"])
+    return manifest
+
+@Profiler.timed("manifest")
+def save_manifest(manifest_file: str, manifest: dict) -> None:
+    """
+    Write the manifest to disk so the next scan can skip unchanged files.
+
+    Parameters:
+        manifest_file (str): The path to the manifest JSON file.
+        manifest (dict): The manifest returned by `load_manifest` and updated by `get_book_records_incremental`.
+
+    Returns:
+        None
+
+    Each record is written as the list of its fields, see `BookRecord.to_list`.
+    """
+    manifest["Format"] = MANIFEST_FORMAT
+    Output.write_document(json.dumps(manifest, default=BookRecord.to_list), manifest_file)
+
+def get_book_records_incremental(folderPath: str, banned_words: set[str], manifest: dict, workers: int = None,
+                                 content_cache: str = None, content_tags: bool = False,
+                                 processes: int = None) -> tuple[list[BookRecord], dict[str, list[str]]]:
+    """
+    Scan the folder and build the book records, reusing the records of the manifest for unchanged files.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        manifest (dict): The manifest of the previous scan, as returned by `load_manifest`. It is updated in place.
+        workers (int, optional): The number of threads used to stat the files, as in `scan_pdf_files`.
+        content_cache (str, optional): The path to the cache of `PDFScan.scan_files`, as in `get_book_records`.
+        content_tags (bool): Whether to add the words found in the files to their tags, as in `get_book_records`.
+        processes (int, optional): The number of worker processes reading the changed files, as in
+            `PDFScan.scan_files`.
+
+    Returns:
+        tuple[list[BookRecord], dict[str, list[str]]]: The book records sorted by title, and the delta against the
+        manifest with the titles that were "Added", "Modified" and "Removed".
+
+    A file is unchanged when its size and modification time match the manifest and the banned words and the scan
+    options have the same fingerprint as when its record was built. Only the added and modified files are
+    scanned and tokenized again, so the cost of a rebuild follows the number of changed files rather than the
+    size of the library.
+    """
+    version = tokenizer.get_version(banned_words) + (":pages" if content_cache else "") + (":keywords" if content_cache and content_tags else "")
+    reusable = manifest.get("Banned Words") == version
+    old_files = manifest.get("Files", {})
+    new_files = {}
+    delta = {"Added": [], "Modified": [], "Removed": []}
+
+    file_stats = scan_pdf_files(folderPath, workers)
+    changed = []
+    for filename, file_stat in file_stats:
+        entry = old_files.get(filename)
+        if reusable and entry is not None and entry["Size"] == file_stat.st_size and entry["Mtime"] == file_stat.st_mtime_ns:
+            new_files[filename] = entry
+        else:
+            new_files[filename] = None
+            changed.append((filename, file_stat))
+            delta["Added" if entry is None else "Modified"].append(filename)
+    contents = {}
+    if content_cache and changed:
+        contents = PDFScan.scan_files(folderPath, changed, content_cache, content_tags, processes, new_files)
+    with Profiler.stage("tokenize"):
+        for filename, file_stat in changed:
+            new_files[filename] = {"Size": file_stat.st_size,
+                                   "Mtime": file_stat.st_mtime_ns,
+                                   "Record": make_book_record(filename, banned_words, file_stat, contents.get(filename))}
+        Profiler.count(items=len(changed))
+    delta["Removed"] = sorted(set(old_files).difference(new_files))
+
+    manifest["Banned Words"] = version
+    manifest["Files"] = new_files
+    return [entry["Record"] for entry in new_files.values()], delta
+
+@Profiler.timed("read PDF info")
+def read_book_records(PDF_info_file: str) -> list[BookRecord]:
+    """
+    Rebuild the book records from a CSV file written by `Export.exportPDF_info`.
+
+    Parameters:
+        PDF_info_file (str): The path to the CSV file containing the information about the PDFs.
+
+    Returns:
+        list[BookRecord]: A list of records like the ones returned by `get_book_records`. The files written before
+        the "Pages" column was added give records of 0 pages.
+    """
+    records = []
+    with open(PDF_info_file, "r", encoding="utf-8") as csv_file:
+        csvreader = csv.reader(csv_file, delimiter = ';')
+        next(csvreader, None)
+        for row in csvreader:
+            if len(row) == 7:
+                title, _, _, multi_tag, _, file_size, updated_time = row
+                pages = 0
+            else:
+                title, _, _, multi_tag, _, pages, file_size, updated_time = row
+            records.append(BookRecord(title,
+                                      [tag.removeprefix("#") for tag in multi_tag.split()],
+                                      int(file_size),
+                                      parse_updated_time(updated_time),
+                                      int(pages)))
+    Profiler.count(items=len(records), bytes_read=os.path.getsize(PDF_info_file))
+    return records
+
 def get_file_size(file_path: str) -> int:
     """
     Calculate the file size in kilobytes for a given file path.
@@ -162,6 +510,110 @@ def break_tag_set_to_list(tag_set: set[str]) -> dict[str, list[str]]:
             tag_set_display[tag[0].lower()].append(tag)
     return tag_set_display
 
+def get_property_columns(records: list[BookRecord]) -> dict[str, array]:
+    """
+    Extract the numeric properties of the book records into one integer column per property.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `get_book_records`.
+
+    Returns:
+        dict[str, array]: The "Title Length (char)", "Title Length (word)", "Tag Number", "Pages" and
+        "File Size (Kb)" columns, each an array of 64-bit integers in the order of the records.
+    """
+    return {"Title Length (char)": array("q", (record.title_length_char for record in records)),
+            "Title Length (word)": array("q", (record.title_length_word for record in records)),
+            "Tag Number": array("q", (record.tag_number for record in records)),
+            "Pages": array("q", (record.pages for record in records)),
+            "File Size (Kb)": array("q", (record.file_size for record in records))}
+
+def get_percentile(ordered_values: list[int], percent: float) -> float:
+    """
+    Compute a percentile of sorted values, interpolating linearly between the two closest ranks.
+
+    Parameters:
+        ordered_values (list[int]): The values, sorted in ascending order.
+        percent (float): The percentile to compute, between 0 and 100.
+
+    Returns:
+        float: The percentile, rounded to 3 decimal places.
+    """
+    position = (len(ordered_values) - 1) * percent / 100
+    lower = floor(position)
+    upper = min(lower + 1, len(ordered_values) - 1)
+    return round(ordered_values[lower] + (ordered_values[upper] - ordered_values[lower]) * (position - lower), 3)
+
+def analyze_column(name: str, values: array) -> dict[str, int]:
+    """
+    Analyzes the characteristic of a column of integer values.
+
+    Args:
+        name (str): The name of the property.
+        values (array): The values of the property, such as a column returned by `get_property_columns`.
+
+    Returns:
+        dict[str, int]: The characteristics listed in `analyze_characteristic_of_property`, with the 25th, 75th
+        and 90th percentiles following the median. Every characteristic is 0 for an empty column.
+
+    The column is sorted once, and every characteristic is then read from the sorted values or from a few
+    reductions over them done by built-in functions: the exact integer sum and sum of squares give the mean and
+    both variances, and the minimum, maximum, median and percentiles are read by position. The harmonic mean is
+    taken over the positive values only, since a single zero would otherwise turn it into 0. The mode is the
+    smallest of the most frequent values.
+    """
+    keys = ["Property", "Minimum", "Maximum", "Total", "Avarage", "Harmonic Mean", "Median",
+            "25th Percentile", "75th Percentile", "90th Percentile", "Mode",
+            "Population Standard Deviation", "Standard Deviation", "Population Variance", "Variance"]
+    count = len(values)
+    if count == 0:
+        return dict.fromkeys(keys, 0) | {"Property": name}
+
+    ordered_values = sorted(values)
+    total = sum(ordered_values)
+    square_deviation = count * sum(map(mul, ordered_values, ordered_values)) - total * total
+    positive_values = ordered_values[bisect_left(ordered_values, 1):]
+    middle = count // 2
+    median = ordered_values[middle] if count % 2 else (ordered_values[middle - 1] + ordered_values[middle]) / 2
+    pvariance = square_deviation / (count * count)
+    variance = square_deviation / (count * (count - 1)) if count > 1 else 0.0
+
+    return {"Property": name,
+            "Minimum": ordered_values[0],
+            "Maximum": ordered_values[-1],
+            "Total": total,
+            "Avarage": round(total / count, 3),
+            "Harmonic Mean": round(len(positive_values) / fsum(1 / value for value in positive_values), 3) if positive_values else 0,
+            "Median": median,
+            "25th Percentile": get_percentile(ordered_values, 25),
+            "75th Percentile": get_percentile(ordered_values, 75),
+            "90th Percentile": get_percentile(ordered_values, 90),
+            "Mode": Counter(ordered_values).most_common(1)[0][0],
+            "Population Standard Deviation": round(sqrt(pvariance), 3),
+            "Standard Deviation": round(sqrt(variance), 3),
+            "Population Variance": round(pvariance, 3),
+            "Variance": round(variance, 3)}
+
+def get_histogram(values: array, bins: int = 10) -> list[tuple[int, int, int]]:
+    """
+    Count the values falling into equal-width ranges between the minimum and the maximum.
+
+    Parameters:
+        values (array): The integer values.
+        bins (int): The number of ranges. Fewer are returned when the values span fewer integers.
+
+    Returns:
+        list[tuple[int, int, int]]: The ranges as (lowest value, highest value, count), both bounds included.
+
+    The values are sorted once and each range is counted by bisecting the sorted values at its bounds.
+    """
+    if len(values) == 0:
+        return []
+    ordered_values = sorted(values)
+    span = ordered_values[-1] - ordered_values[0] + 1
+    edges = sorted({ordered_values[0] + span * i // bins for i in range(bins + 1)})
+    positions = [bisect_left(ordered_values, edge) for edge in edges]
+    return [(edges[i], edges[i + 1] - 1, positions[i + 1] - positions[i]) for i in range(len(edges) - 1)]
+
 def analyze_characteristic_of_property(property: list[str]) -> dict[str,int]:
     """
     Analyzes the characteristic of a given property.
@@ -176,58 +628,33 @@ def analyze_characteristic_of_property(property: list[str]) -> dict[str,int]:
             - "Maximum" (int): The maximum value of the property.
             - "Total" (int): The sum of all the property values.
             - "Avarage" (float): The average value of the property rounded to 3 decimal places.
-            - "Harmonic Mean" (float): The harmonic mean of the property rounded to 3 decimal places.
+            - "Harmonic Mean" (float): The harmonic mean of the positive property values rounded to 3 decimal places.
             - "Median" (int): The median value of the property.
+            - "25th Percentile", "75th Percentile", "90th Percentile" (float): The percentiles of the property rounded to 3 decimal places.
             - "Mode" (int): The mode value of the property.
             - "Population Standard Deviation" (float): The population standard deviation of the property rounded to 3 decimal places.
             - "Standard Deviation" (float): The standard deviation of the property rounded to 3 decimal places.
             - "Population Variance" (float): The population variance of the property rounded to 3 decimal places.
             - "Variance" (float): The variance of the property rounded to 3 decimal places.
+
+    The values are converted into an integer array and analyzed by `analyze_column`.
+    """
+    return analyze_column(property[0], array("q", map(int, property[1:])))
+
+def get_ordered_timestamps(timestamps: Iterable[int]) -> list[datetime]:
     """
-    int_property = list(map(int, property[1:]))
-    sorted(int_property)
-    min_property = min(int_property)
-    max_property = max(int_property)
-    total_property = sum(int_property)
-    avg_property = statistics.mean(int_property)
-    harmean_property = statistics.harmonic_mean(int_property)
-    median_property = statistics.median(int_property)
-    mode_property = statistics.mode(int_property)
-    population_stdev_property = statistics.pstdev(int_property)
-    standard_deviation_property = statistics.stdev(int_property)
-    pvariance_property = statistics.pvariance(int_property)
-    variance_property = statistics.variance(int_property)
-
-    return {"Property": property[0],
-            "Minimum": min_property,
-            "Maximum": max_property,
-            "Total": total_property,
-            "Avarage": round(avg_property,3),
-            "Harmonic Mean": round(harmean_property,3),
-            "Median": median_property,
-            "Mode": mode_property,
-            "Population Standard Deviation": round(population_stdev_property,3),
-            "Standard Deviation": round(standard_deviation_property,3),
-            "Population Variance": round(pvariance_property,3),
-            "Variance": round(variance_property,3)}
-
-def get_ordered_timestamps(timestamps: list[str]) -> list[datetime]:
-    """
-    Given a list of timestamps, this function returns a list of datetime objects sorted in ascending order.
+    Given timestamps in seconds since EPOCH, this function returns a list of datetime objects sorted in ascending order.
     
     Parameters:
-        timestamps (list[str]): A list of timestamps in the format '%a, %b %d, %Y, %H:%M:%S'.
+        timestamps (Iterable[int]): The timestamps, such as the updated times of the book records or the
+            "Updated Time" column of the catalog.
         
     Returns:
         list[datetime]: A list of datetime objects sorted in ascending order.
+
+    The integers are sorted before being converted, so no date is parsed and no datetime is compared.
     """
-    ordered_dates = sorted(
-        map(
-            datetime.strptime, timestamps[1:],
-            ['%a, %b %d, %Y, %H:%M:%S'] * (len(timestamps) - 1)
-        )
-    )
-    return ordered_dates
+    return [datetime.fromtimestamp(timestamp) for timestamp in sorted(timestamps)]
 
 def pick_random_number_items(input_list: list[str], number_of_items: int) -> list[str]:
     """
@@ -241,4 +668,121 @@ def pick_random_number_items(input_list: list[str], number_of_items: int) -> lis
         list[str]: A list containing the randomly picked items.
     """
     random_items = random.sample(input_list, number_of_items)
-    return random_items
\ No newline at end of file
+    return random_items
+
+TASK_PATTERN = r"- \[( |x|X)\] .*?\[\[(?:BOOKS/)?(.+?)\.pdf(?:\|.*?)?\]\]"
+
+def parse_task_line(line: str, date: datetime | None, tasks: list[dict]) -> datetime | None:
+    """
+    Parse a line of a task list, appending the task it holds to `tasks`.
+
+    Parameters:
+        line (str): The line.
+        date (datetime | None): The date of the day the line belongs to, None before the first day.
+        tasks (list[dict]): The tasks parsed so far.
+
+    Returns:
+        datetime | None: The date of the day the next line belongs to: the date the line holds, if any, otherwise
+        `date`.
+    """
+    line = line.strip()
+    match = re.match(TASK_PATTERN, line)
+    if match:
+        if date is not None:
+            tasks.append({"Date": date, "Title": match.group(2), "Done": match.group(1) != " "})
+        return date
+    try:
+        return datetime.strptime(line, '%a, %b %d, %Y')
+    except ValueError:
+        return date
+
+def read_task_history(task_file: str) -> list[dict]:
+    """
+    Read the reading tasks written by `Export.pick_number_random_book_to_read` back from a task list.
+
+    Parameters:
+        task_file (str): The path to the task list file.
+
+    Returns:
+        list[dict]: One entry per task, in the order of the file, with the "Date" of the day it was given (a
+        `datetime`), the "Title" of the book and whether it is "Done".
+
+    Each day of the task list starts with a line in the format of `get_current_time`, followed by lines such as
+    `- [x] Read a chapter of [[BOOKS/{filename}.pdf|{filename}]]`. Lines of any other form are skipped.
+    """
+    if not os.path.exists(task_file):
+        return []
+    tasks = []
+    date = None
+    with open(task_file, "r", encoding="utf-8") as inputFile:
+        for line in inputFile:
+            date = parse_task_line(line, date, tasks)
+    return tasks
+
+@Profiler.timed("task history")
+def load_task_history(task_file: str, cache_file: str) -> list[dict]:
+    """
+    Read the reading tasks of a task list like `read_task_history`, only parsing the days added since the last call.
+
+    Parameters:
+        task_file (str): The path to the task list file.
+        cache_file (str): The path to the binary cache of the parsed tasks.
+
+    Returns:
+        list[dict]: The tasks, as returned by `read_task_history`.
+
+    The cache holds the tasks, the size and the modification time of the file they were parsed from, the byte
+    offset where the last day starts, the number of tasks before it and a hash of every byte before it. When the
+    size and the modification time of the file did not change, the cached tasks are returned without opening the
+    file. Otherwise, as long as the file only grows, by new days being appended, the bytes up to that offset are
+    hashed, which costs far less than parsing them, and the file is parsed from the offset on, so the parsing
+    follows the days added rather than the length of the history. The last day is always parsed again, since its
+    boxes are the ones still being ticked. The whole file is parsed again when it shrank or the hash does not
+    match, i.e. when an older day was edited, even by ticking a box in place.
+    """
+    try:
+        file_stat = os.stat(task_file)
+    except FileNotFoundError:
+        return []
+    try:
+        with open(cache_file, "rb") as cache:
+            cached = pickle.load(cache)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        cached = None
+    if not isinstance(cached, dict) or "Prefix Tasks" not in cached:
+        cached = None
+    elif cached["Size"] == file_stat.st_size and cached["Mtime"] == file_stat.st_mtime_ns:
+        return list(cached["Tasks"])
+
+    with open(task_file, "rb") as inputFile:
+        start, tasks, prefix = 0, [], hashlib.blake2b()
+        file_stat = os.fstat(inputFile.fileno())
+        if cached is not None and cached["Offset"] <= file_stat.st_size:
+            cached_prefix = hashlib.blake2b()
+            remaining = cached["Offset"]
+            while remaining > 0:
+                chunk = inputFile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                cached_prefix.update(chunk)
+                remaining -= len(chunk)
+            if cached_prefix.digest() == cached["Fingerprint"]:
+                start, tasks, prefix = cached["Offset"], cached["Tasks"][:cached["Prefix Tasks"]], cached_prefix
+
+        inputFile.seek(start)
+        date = None
+        last_day_offset, last_day_task_count, last_day_prefix = start, len(tasks), prefix.copy()
+        offset = start
+        for raw_line in inputFile:
+            new_date = parse_task_line(raw_line.decode("utf-8"), date, tasks)
+            if new_date is not date:
+                last_day_offset, last_day_task_count, last_day_prefix = offset, len(tasks), prefix.copy()
+            date = new_date
+            prefix.update(raw_line)
+            offset += len(raw_line)
+        fingerprint = last_day_prefix.digest()
+
+    Output.write_document(pickle.dumps({"Size": file_stat.st_size, "Mtime": file_stat.st_mtime_ns, "Offset": last_day_offset,
+                                        "Fingerprint": fingerprint, "Prefix Tasks": last_day_task_count, "Tasks": tasks},
+                                       protocol=pickle.HIGHEST_PROTOCOL), cache_file)
+    return tasks
@@ -0,0 +1,243 @@
+import os
+import sqlite3
+from datetime import datetime
+from modules.Record import BookRecord
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS books (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL UNIQUE,
+    title_length_char INTEGER NOT NULL,
+    title_length_word INTEGER NOT NULL,
+    tag_number INTEGER NOT NULL,
+    file_size_kb INTEGER NOT NULL,
+    updated_time INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tags (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS book_tags (
+    tag_id INTEGER NOT NULL REFERENCES tags(id),
+    book_id INTEGER NOT NULL REFERENCES books(id),
+    PRIMARY KEY (tag_id, book_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    date INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    done INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_books_updated_time ON books(updated_time);
+CREATE INDEX IF NOT EXISTS idx_books_file_size ON books(file_size_kb);
+CREATE INDEX IF NOT EXISTS idx_book_tags_book ON book_tags(book_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_title ON tasks(title);
+"""
+
+def connect(db_file: str) -> sqlite3.Connection:
+    """
+    Open the catalog database, creating its folder, its tables and its indexes when they do not exist yet.
+
+    Parameters:
+        db_file (str): The path to the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: The connection to the database.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_file)), exist_ok=True)
+    connection = sqlite3.connect(db_file)
+    connection.executescript(SCHEMA)
+    return connection
+
+def write_books(db_file: str, records: list[BookRecord], delta: dict[str, list[str]] = None) -> None:
+    """
+    Bring the books, the tags and the book-tag relation of the database up to date with the given book records.
+
+    Parameters:
+        db_file (str): The path to the SQLite database file.
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+        delta (dict[str, list[str]], optional): The titles "Added", "Modified" and "Removed" since the records the
+            database holds, as returned by `DataProcess.get_book_records_incremental`. When not given, every row
+            is replaced.
+
+    Returns:
+        None
+
+    Every row is written with `executemany` inside a single transaction, so readers never see a half-written
+    catalog and the whole library costs one commit. With a delta, only the rows of the changed books are written
+    by `update_books`. All the rows are replaced by `replace_books` instead when the delta touches most of the
+    library, such as after a change of the banned words, or when the database turns out not to hold the books
+    the delta was computed against.
+    """
+    connection = connect(db_file)
+    try:
+        with connection:
+            if delta is None or not update_books(connection, records, delta):
+                replace_books(connection, records)
+    finally:
+        connection.close()
+
+def replace_books(connection: sqlite3.Connection, records: list[BookRecord]) -> None:
+    """
+    Replace every book, tag and book-tag row with those of the given book records, see `write_books`.
+
+    Parameters:
+        connection (sqlite3.Connection): The connection to the database, within a transaction.
+        records (list[BookRecord]): The book records.
+
+    Returns:
+        None
+    """
+    tag_ids = {}
+    book_rows = []
+    book_tag_rows = []
+    for book_id, record in enumerate(records, start=1):
+        book_rows.append((book_id,
+                          record.title,
+                          record.title_length_char,
+                          record.title_length_word,
+                          record.tag_number,
+                          record.file_size,
+                          record.updated_time))
+        for tag in record.tags:
+            book_tag_rows.append((tag_ids.setdefault(tag, len(tag_ids) + 1), book_id))
+
+    connection.execute("DELETE FROM book_tags")
+    connection.execute("DELETE FROM tags")
+    connection.execute("DELETE FROM books")
+    connection.executemany("INSERT INTO books VALUES (?, ?, ?, ?, ?, ?, ?)", book_rows)
+    connection.executemany("INSERT INTO tags VALUES (?, ?)", ((tag_id, tag) for tag, tag_id in tag_ids.items()))
+    connection.executemany("INSERT INTO book_tags VALUES (?, ?)", book_tag_rows)
+
+def update_books(connection: sqlite3.Connection, records: list[BookRecord], delta: dict[str, list[str]]) -> bool:
+    """
+    Write the rows of the books of a delta only, see `write_books`.
+
+    Parameters:
+        connection (sqlite3.Connection): The connection to the database, within a transaction.
+        records (list[BookRecord]): The book records after the delta.
+        delta (dict[str, list[str]]): The titles "Added", "Modified" and "Removed".
+
+    Returns:
+        bool: Whether the database now matches the records. False when the delta touches more than half of the
+        library, in which case nothing was written, or when the number of books does not match afterwards, in
+        which case the caller must replace every row.
+
+    The rows of the removed and modified books, and of the added ones in case they are already there, are
+    deleted through the unique index on titles and the index of the book-tag relation on books, and the rows of
+    the added and modified books are inserted again. New tags are inserted with INSERT OR IGNORE, and the tags
+    that were only carried by deleted books are deleted.
+    """
+    changed = set(delta["Added"]).union(delta["Modified"])
+    if len(changed) + len(delta["Removed"]) > len(records) // 2:
+        return False
+
+    connection.execute("DROP TABLE IF EXISTS temp.stale_titles")
+    connection.execute("DROP TABLE IF EXISTS temp.stale_tags")
+    connection.execute("CREATE TEMP TABLE stale_titles (title TEXT PRIMARY KEY) WITHOUT ROWID")
+    connection.executemany("INSERT OR IGNORE INTO stale_titles VALUES (?)", ((title,) for title in changed.union(delta["Removed"])))
+    connection.execute("""
+        CREATE TEMP TABLE stale_tags AS
+        SELECT DISTINCT book_tags.tag_id FROM books
+        JOIN book_tags ON book_tags.book_id = books.id
+        WHERE books.title IN stale_titles
+    """)
+    connection.execute("DELETE FROM book_tags WHERE book_id IN (SELECT id FROM books WHERE title IN stale_titles)")
+    connection.execute("DELETE FROM books WHERE title IN stale_titles")
+
+    changed_records = [record for record in records if record.title in changed]
+    connection.executemany("INSERT INTO books (title, title_length_char, title_length_word, tag_number, file_size_kb, updated_time) VALUES (?, ?, ?, ?, ?, ?)",
+                           ((record.title,
+                             record.title_length_char,
+                             record.title_length_word,
+                             record.tag_number,
+                             record.file_size,
+                             record.updated_time) for record in changed_records))
+    connection.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", ((tag,) for record in changed_records for tag in record.tags))
+    connection.executemany("""
+        INSERT INTO book_tags
+        SELECT tags.id, books.id FROM books, tags
+        WHERE books.title = ? AND tags.name = ?
+    """, ((record.title, tag) for record in changed_records for tag in record.tags))
+    connection.execute("""
+        DELETE FROM tags
+        WHERE id IN stale_tags AND NOT EXISTS (SELECT 1 FROM book_tags WHERE book_tags.tag_id = tags.id)
+    """)
+    connection.execute("DROP TABLE temp.stale_titles")
+    connection.execute("DROP TABLE temp.stale_tags")
+    return connection.execute("SELECT COUNT(*) FROM books").fetchone()[0] == len(records)
+
+def write_tasks(db_file: str, tasks: list[dict]) -> None:
+    """
+    Replace the reading-task history of the database.
+
+    Parameters:
+        db_file (str): The path to the SQLite database file.
+        tasks (list[dict]): The tasks returned by `DataProcess.read_task_history` or `DataProcess.load_task_history`.
+
+    Returns:
+        None
+    """
+    connection = connect(db_file)
+    try:
+        with connection:
+            connection.execute("DELETE FROM tasks")
+            connection.executemany("INSERT INTO tasks (date, title, done) VALUES (?, ?, ?)",
+                                   ((int(task["Date"].timestamp()), task["Title"], task["Done"]) for task in tasks))
+    finally:
+        connection.close()
+
+def query_books_tagged(db_file: str, tag: str, modified_since: datetime = None) -> list[str]:
+    """
+    Find the books carrying a tag, optionally only those modified since a given date.
+
+    Parameters:
+        db_file (str): The path to the SQLite database file.
+        tag (str): The tag, without the leading "#".
+        modified_since (datetime, optional): The earliest updated time of the books to return.
+
+    Returns:
+        list[str]: The titles of the books, most recently updated first.
+
+    The tag is found through the unique index on tag names, its books through the primary key of the book-tag
+    relation and the date filter through the index on updated times.
+    """
+    since = int(modified_since.timestamp()) if modified_since is not None else 0
+    connection = connect(db_file)
+    try:
+        rows = connection.execute("""
+            SELECT books.title FROM tags
+            JOIN book_tags ON book_tags.tag_id = tags.id
+            JOIN books ON books.id = book_tags.book_id
+            WHERE tags.name = ? AND books.updated_time >= ?
+            ORDER BY books.updated_time DESC
+        """, (tag.removeprefix("#"), since)).fetchall()
+    finally:
+        connection.close()
+    return [title for title, in rows]
+
+def query_largest_unread(db_file: str, limit: int) -> list[tuple[str, int]]:
+    """
+    Find the largest books that never appeared in the reading-task history.
+
+    Parameters:
+        db_file (str): The path to the SQLite database file.
+        limit (int): The number of books to return.
+
+    Returns:
+        list[tuple[str, int]]: The titles of the books with their file size in kilobytes, largest first.
+
+    The books are walked in descending order of the index on file sizes, and each one is checked against the
+    index on task titles, so only the returned books and the ones skipped before them are read.
+    """
+    connection = connect(db_file)
+    try:
+        rows = connection.execute("""
+            SELECT title, file_size_kb FROM books
+            WHERE NOT EXISTS (SELECT 1 FROM tasks WHERE tasks.title = books.title)
+            ORDER BY file_size_kb DESC
+            LIMIT ?
+        """, (limit,)).fetchall()
+    finally:
+        connection.close()
+    return rows
@@ -0,0 +1,245 @@
+"""
+Find the PDF files of the BOOKS folder that are copies of each other, and the books whose titles are nearly the same.
+
+Identical files are found in stages, each stage only looking at the files the previous one could not tell apart:
+    1. the files are grouped by size, known from the scan of the folder, and a file of a size no other file has
+       is never opened,
+    2. within a group, the first and last `BLOCK_SIZE` bytes of each file are hashed, read from the file mapped
+       in memory, so a textbook of several hundred megabytes costs two small reads,
+    3. only the files whose edges match are hashed in full.
+A file no larger than two blocks is hashed in full at the second stage. Empty files are left out.
+
+Near-duplicate titles are found by MinHash over the tags of each title, as found by
+`DataProcess.get_word_list_from_file`: the signature of a title is the minimum of `PERMUTATIONS` hash
+functions over its tags, and two titles agree on each of them with a probability equal to the Jaccard
+similarity of their tags. The signatures are cut into `BANDS` bands, titles sharing a band are candidates, and
+only the candidates have the Jaccard similarity of their tags computed, so the titles are never compared pair by
+pair. With 20 bands of 3 rows, a pair of a similarity of 0.5 is a candidate with a probability of 0.93, and of
+0.6 with a probability of 0.99.
+
+The digests and signatures of each file are kept in a cache keyed by the size and modification time of the
+file, and by the fingerprint of the banned words for the signatures, so a repeated search reads no file and
+hashes no tag.
+"""
+import mmap
+import os
+from collections.abc import Iterable
+from itertools import combinations
+from modules.Lazy import lazy_import
+from modules import Profiler
+
+hashlib = lazy_import("hashlib")
+pickle = lazy_import("pickle")
+Output = lazy_import("modules.Output")
+
+BLOCK_SIZE = 1 << 16
+PERMUTATIONS = 60
+BANDS = 20
+LANE_TOP_BITS = int.from_bytes(b"\x00\x00\x00\x80" * PERMUTATIONS, "little")
+LANE_LOW_BITS = int.from_bytes(b"\xff\xff\xff\x7f" * PERMUTATIONS, "little")
+
+def get_edge_digest(file_path: str) -> bytes:
+    """
+    Hash the first and last `BLOCK_SIZE` bytes of a file, read from the file mapped in memory.
+
+    Parameters:
+        file_path (str): The path to the file.
+
+    Returns:
+        bytes: The BLAKE2b digest of the edges of the file. For a file no larger than two blocks, every byte is
+        hashed once, in order, so the digest is the one `Output.get_file_digest` gives for the whole file.
+    """
+    with open(file_path, "rb") as inputFile, mmap.mmap(inputFile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        if hasattr(mmap, "MADV_RANDOM"):
+            data.madvise(mmap.MADV_RANDOM)
+        digest = hashlib.blake2b(data[:BLOCK_SIZE])
+        digest.update(data[max(BLOCK_SIZE, len(data) - BLOCK_SIZE):])
+        Profiler.count(items=1, bytes_read=min(len(data), 2 * BLOCK_SIZE))
+    return digest.digest()
+
+def find_identical_files(folderPath: str, file_stats: list[tuple[str, os.stat_result]], entries: dict[str, dict]) -> list[tuple[int, list[str]]]:
+    """
+    Group the files whose contents are identical.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        file_stats (list[tuple[str, os.stat_result]]): The files, as listed by `DataProcess.scan_pdf_files`.
+        entries (dict[str, dict]): The cache entry of each file, see `find_duplicates`. The digests computed are
+            stored in them.
+
+    Returns:
+        list[tuple[int, list[str]]]: The size in bytes and the sorted titles of each group of identical files,
+        sorted by title.
+    """
+    by_size = {}
+    for filename, file_stat in file_stats:
+        if file_stat.st_size:
+            by_size.setdefault(file_stat.st_size, []).append(filename)
+
+    by_edge = {}
+    with Profiler.stage("edge hash"):
+        for size, filenames in by_size.items():
+            if len(filenames) < 2:
+                continue
+            for filename in filenames:
+                entry = entries[filename]
+                if entry["Edge"] is None:
+                    entry["Edge"] = get_edge_digest(os.path.join(folderPath, filename + ".pdf"))
+                by_edge.setdefault((size, entry["Edge"]), []).append(filename)
+
+    groups = []
+    with Profiler.stage("full hash"):
+        for (size, _), filenames in by_edge.items():
+            if len(filenames) < 2:
+                continue
+            by_content = {}
+            for filename in filenames:
+                entry = entries[filename]
+                if entry["Full"] is None:
+                    entry["Full"] = entry["Edge"] if size <= 2 * BLOCK_SIZE else Output.get_file_digest(os.path.join(folderPath, filename + ".pdf"))
+                by_content.setdefault(entry["Full"], []).append(filename)
+            groups.extend((size, sorted(group)) for group in by_content.values() if len(group) > 1)
+    return sorted(groups, key=lambda group: group[1])
+
+def get_lane_minimum(first: int, second: int) -> int:
+    """
+    Take the minimum of each lane of two signatures packed in integers, see `get_signature`.
+
+    Parameters:
+        first (int): The first signature.
+        second (int): The second signature.
+
+    Returns:
+        int: The signature whose lanes are the minimums of the lanes of both signatures.
+    """
+    # Subtracting from lanes whose top bit is set cannot borrow from the next lane, and leaves the top bit set
+    # where the lane of `first` is not smaller, which is spread to a mask of the 31 lower bits of these lanes.
+    larger = (((first | LANE_TOP_BITS) - second) & LANE_TOP_BITS) >> 31
+    larger = (larger << 31) - larger
+    return first ^ ((first ^ second) & larger)
+
+def get_signature(tags: Iterable[str], tag_signatures: dict[str, int]) -> bytes:
+    """
+    Compute the MinHash signature of a set of tags.
+
+    Parameters:
+        tags (Iterable[str]): The tags.
+        tag_signatures (dict[str, int]): The hash values of the tags seen so far, filled as new tags are met.
+
+    Returns:
+        bytes: The `PERMUTATIONS` minimums, as 32-bit little-endian integers, or b"" when there is no tag.
+
+    The `PERMUTATIONS` hash values of a tag are the 32-bit words of a single SHAKE-128 digest of it, with their
+    top bit cleared, so they do not depend on the hash randomization of the interpreter and can be cached across
+    runs. They are packed in one integer, so the minimums of all the lanes are taken at once by
+    `get_lane_minimum` rather than one by one, which matters since most tags of a title, the double and triple
+    word tags, are seen only once.
+    """
+    signature = None
+    for tag in tags:
+        hashes = tag_signatures.get(tag)
+        if hashes is None:
+            hashes = tag_signatures[tag] = int.from_bytes(hashlib.shake_128(tag.encode("utf-8")).digest(4 * PERMUTATIONS), "little") & LANE_LOW_BITS
+        signature = hashes if signature is None else get_lane_minimum(signature, hashes)
+    return b"" if signature is None else signature.to_bytes(4 * PERMUTATIONS, "little")
+
+def find_similar_titles(tags_by_title: dict[str, set[str]], entries: dict[str, dict], threshold: float = 0.5) -> list[tuple[str, str, float]]:
+    """
+    Find the pairs of titles whose tags are nearly the same.
+
+    Parameters:
+        tags_by_title (dict[str, set[str]]): The tags of each title, in title order.
+        entries (dict[str, dict]): The cache entry of each title, see `find_duplicates`. The signatures computed
+            are stored in them.
+        threshold (float): The lowest Jaccard similarity of the tags of two titles reported.
+
+    Returns:
+        list[tuple[str, str, float]]: The two titles, in title order, and the Jaccard similarity of their tags,
+        rounded to 3 decimal places, of each pair, most similar first.
+    """
+    tag_signatures = {}
+    width = 4 * PERMUTATIONS // BANDS
+    # The first title of each band value, then the titles of the band values shared by several titles, so that
+    # no list is made for the many band values of a single title.
+    first_titles = [{} for _ in range(BANDS)]
+    buckets = {}
+    with Profiler.stage("minhash"):
+        Profiler.count(items=len(tags_by_title))
+        for title, tags in tags_by_title.items():
+            entry = entries[title]
+            if entry["Signature"] is None:
+                entry["Signature"] = get_signature(tags, tag_signatures)
+            signature = entry["Signature"]
+            if signature:
+                for band, band_titles in enumerate(first_titles):
+                    key = signature[band * width:(band + 1) * width]
+                    first_title = band_titles.setdefault(key, title)
+                    if first_title is not title:
+                        buckets.setdefault((band, key), [first_title]).append(title)
+
+    pairs = []
+    with Profiler.stage("compare"):
+        candidates = {pair for titles in buckets.values() for pair in combinations(titles, 2)}
+        Profiler.count(items=len(candidates))
+        for first, second in candidates:
+            first_tags, second_tags = tags_by_title[first], tags_by_title[second]
+            similarity = len(first_tags & second_tags) / len(first_tags | second_tags)
+            if similarity >= threshold:
+                pairs.append((first, second, round(similarity, 3)))
+    return sorted(pairs, key=lambda pair: (-pair[2], pair[0], pair[1]))
+
+def load_cache(cache_file: str) -> dict:
+    """Load the cache saved by `find_duplicates`, or an empty cache when there is none or it cannot be read."""
+    try:
+        with open(cache_file, "rb") as inputFile:
+            cache = pickle.load(inputFile)
+        if isinstance(cache, dict) and "Files" in cache:
+            return cache
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+    return {"Version": "", "Files": {}}
+
+def find_duplicates(folderPath: str, file_stats: list[tuple[str, os.stat_result]], tags_by_title: dict[str, set[str]],
+                    cache_file: str, version: str, threshold: float = 0.5) -> dict[str, list]:
+    """
+    Find the identical files and the similar titles of a folder.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        file_stats (list[tuple[str, os.stat_result]]): The files, as listed by `DataProcess.scan_pdf_files`.
+        tags_by_title (dict[str, set[str]]): The tags of each title, in the order of `file_stats`.
+        cache_file (str): The path to the binary cache of the digests and signatures.
+        version (str): The fingerprint of the banned words the tags were found with, such as the one returned by
+            `DataProcess.tokenizer.get_version`.
+        threshold (float): The lowest Jaccard similarity of the tags of two titles reported.
+
+    Returns:
+        dict[str, list]: The groups of identical files under "Identical", as returned by `find_identical_files`,
+        and under "Similar" the pairs of similar titles, as returned by `find_similar_titles`, without the pairs
+        of identical files.
+
+    The cache holds, for each file, its "Size" and "Mtime" in nanoseconds, the digest of its "Edge" and "Full"
+    contents and the MinHash "Signature" of its tags, each None until it is first needed. It is saved when any
+    of them was computed, or when a file was removed. The signatures are computed again when the banned words or
+    `PERMUTATIONS` changed.
+    """
+    version = f"{version}:{PERMUTATIONS}"
+    cache = load_cache(cache_file)
+    same_version = cache["Version"] == version
+    entries = {}
+    for filename, file_stat in file_stats:
+        entry = cache["Files"].get(filename)
+        if entry is None or entry["Size"] != file_stat.st_size or entry["Mtime"] != file_stat.st_mtime_ns:
+            entry = {"Size": file_stat.st_size, "Mtime": file_stat.st_mtime_ns, "Edge": None, "Full": None, "Signature": None}
+        elif not same_version:
+            entry = entry | {"Signature": None}
+        entries[filename] = entry
+
+    identical = find_identical_files(folderPath, file_stats, entries)
+    copies = {title: group_id for group_id, (_, titles) in enumerate(identical) for title in titles}
+    similar = [(first, second, similarity) for first, second, similarity in find_similar_titles(tags_by_title, entries, threshold)
+               if first not in copies or copies[first] != copies.get(second)]
+
+    if not same_version or entries != cache["Files"]:
+        Output.write_document(pickle.dumps({"Version": version, "Files": entries}, protocol=pickle.HIGHEST_PROTOCOL), cache_file)
+    return {"Identical": identical, "Similar": similar}
@@ -1,14 +1,54 @@
-import modules.DataProcess as DataProcess
+from __future__ import annotations
 import modules.path as path
-from csv import reader
+from modules.Lazy import lazy_import
+from modules import Profiler
 from warnings import filterwarnings
-import json
-import colorama
+from io import StringIO
+import os
+import time
+from datetime import datetime
+from modules.Record import BookRecord
+
+# Every command only pays for the modules it uses: these are loaded on first use.
+DataProcess = lazy_import("modules.DataProcess")
+Search = lazy_import("modules.Search")
+RunningStat = lazy_import("modules.RunningStat")
+Catalog = lazy_import("modules.Catalog")
+Database = lazy_import("modules.Database")
+Output = lazy_import("modules.Output")
+Render = lazy_import("modules.Render")
+TagAnalytics = lazy_import("modules.TagAnalytics")
+Scheduler = lazy_import("modules.Scheduler")
+Duplicates = lazy_import("modules.Duplicates")
+Server = lazy_import("modules.Server")
+json = lazy_import("json")
+futures = lazy_import("concurrent.futures")
+asyncio = lazy_import("asyncio")
+heapq = lazy_import("heapq")
+colorama = lazy_import("colorama")
 
 def AnnounceFinish() -> None:
+    """
+    Announce that a command finished, followed by the summary of its stages when profiling with `--profile`.
+    """
     colorama.init()
     print(colorama.Fore.GREEN + "Process executed successfully finished." + colorama.Style.RESET_ALL)
     colorama.deinit()
+    AnnounceProfile()
+
+def AnnounceProfile() -> None:
+    """
+    When profiling with `--profile`, print the calls, items, bytes and time of each stage recorded by `Profiler`
+    since the last summary, then start over for the next command.
+    """
+    if not Profiler.enabled or not Profiler.stages:
+        return
+    colorama.init()
+    summary = Profiler.get_summary()
+    print(colorama.Style.BRIGHT + summary[0] + colorama.Style.RESET_ALL)
+    print("\n".join(summary[1:]))
+    colorama.deinit()
+    Profiler.reset()
 
 def mirrorFile_to_destination(source: str, destination: str) -> None:
     """
@@ -21,58 +61,77 @@ def mirrorFile_to_destination(source: str, destination: str) -> None:
     Returns:
         None: This function does not return anything.
 
-    This function opens the source file in read mode and the destination file in write mode. It then reads each line from the source file and writes it to the destination file. The source file is read line by line, and each line is written to the destination file without any modifications.
+    The copy is done by `Output.copy_document`: it is skipped when the destination already holds the same contents, and otherwise written to a temporary file renamed over the destination, so the destination is never left half-written.
 
     Example:
         >>> mirrorFile_to_destination("source.txt", "destination.txt")
         # The contents of "source.txt" will be copied to "destination.txt".
     """
-    with open(source, 'r') as read_obj, open(destination, 'w') as write_obj:
-        for line in read_obj:
-            write_obj.write(line)
+    Output.copy_document(source, destination)
 
-def exportTagSet(folderPath: str, banned_words: set[str]) -> None:
+PDF_info_header = ("Title", "Title Length (char)", "Title Length (word)", "Multi-Tags", "Tag Number", "Pages", "File Size (Kb)", "Updated Time")
+
+def get_PDF_info_rows(records: list[BookRecord]) -> list[tuple[str, ...]]:
+    """
+    Turn book records into the rows of the PDF info table, every field formatted as it is written to the CSV file.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        list[tuple[str, ...]]: One row per record, in the column order of `PDF_info_header`.
+    """
+    return [(record.title,
+             str(record.title_length_char),
+             str(record.title_length_word),
+             Render.get_tag_fragment(record.tags),
+             str(record.tag_number),
+             str(record.pages),
+             str(record.file_size),
+             record.get_updated_time_text())
+            for record in records]
+
+@Profiler.timed("tag catalog")
+def exportTagSet(folderPath: str, banned_words: set[str], records: list[BookRecord] = None) -> None:
     """
     Export the tag set to a file in the specified folder path.
 
     Parameters:
         folderPath (str): The path to the folder where the tag set will be exported.
         banned_words (set[str]): A set of words to be excluded from the tag set.
+        records (list[BookRecord], optional): Book records from an earlier scan of `folderPath`. When given, the
+            tag set is taken from their tags and the folder is not scanned again.
 
     Returns:
         None
 
     This function retrieves the tuned word list from the specified folder path using the
-    `get_tuned_word_list_from_folder` function from the `DataProcess` module. It then breaks
+    `get_tuned_word_list_from_folder` function from the `DataProcess` module, unless `records` are given. It then breaks
     the word set into a displayable format using the `break_tag_set_to_list` function from the
     `DataProcess` module. The function writes the tag set to a file specified by the
-    `TagCatalog_path` constant from the `path` module. The file is opened in write mode and
-    the total number of tags is written as a header. For each character in the displayable
-    tag set, the function writes the character and the number of tags associated with it.
-    If there are no tags for a character, a message indicating that there are no tags in
-    that category is written. The function then writes each tag associated with the character.
-    Finally, the function calls the `mirrorFile_to_destination` function to mirror the tag
-    catalog file to the Obsidian tag catalog path.
+    `TagCatalog_path` constant from the `path` module. The total number of tags is written as a
+    header. For each character in the displayable tag set, the function writes the character and
+    the number of tags associated with it. If there are no tags for a character, a message
+    indicating that there are no tags in that category is written. The function then writes each
+    tag associated with the character. The document is rendered section by section by
+    `Render.render_tag_catalog` and streamed in chunks by `Output.write_chunks` to both the tag
+    catalog file and the Obsidian tag catalog path, skipping the files that are already up to date.
 
     Note: The `DataProcess` module and the `path` module must be imported for this function
     to work properly.
     """
-    word_set = sorted(DataProcess.get_tuned_word_list_from_folder(folderPath, banned_words))
+    if records is None:
+        word_set = sorted(DataProcess.get_tuned_word_list_from_folder(folderPath, banned_words))
+    else:
+        word_set = sorted(set().union(*(record.tags for record in records)))
     tag_set_display = DataProcess.break_tag_set_to_list(word_set)
-    CHARACTER = tag_set_display.keys()
+    Profiler.count(items=len(word_set))
+    Output.write_chunks(Render.iter_chunks(Render.render_tag_catalog(tag_set_display, len(word_set))),
+                        path.TagCatalog_path, path.Obsidian_TagCatalog_path)
 
-    with open(path.TagCatalog_path, "w") as outputFile:
-        outputFile.write("\n# Tags (Total: " + str(len(word_set)) + ")\n")
-        for char in CHARACTER:
-            outputFile.write(f"\n## {char.upper()} ({len(tag_set_display[char])})\n\n")
-            if tag_set_display[char] == []:
-                outputFile.write("There is no tag in this category.")
-            for tag in tag_set_display[char]:
-                outputFile.write(f"#{tag} ")
-            outputFile.write("\n")
-    mirrorFile_to_destination(path.TagCatalog_path, path.Obsidian_TagCatalog_path)
-
-def exportPDF_info(folderPath: str, banned_words: set[str]) -> None:
+@Profiler.timed("PDF info")
+def exportPDF_info(folderPath: str, banned_words: set[str], records: list[BookRecord] = None, workers: int = None, content_tags: bool = False,
+                  delta: dict[str, list[str]] = None) -> None:
     """
     A function to export information about PDF files based on the input folder path and banned words.
     
@@ -81,6 +140,14 @@ def exportPDF_info(folderPath: str, banned_words: set[str]) -> None:
     Parameters:
         folderPath (str): The path to the folder containing the PDF files.
         banned_words (set[str]): A set of words to be excluded during the information extraction process.
+        records (list[BookRecord], optional): Book records from an earlier scan of `folderPath`. When not given,
+            the folder is scanned with DataProcess.get_book_records().
+        workers (int, optional): The number of threads used to stat the files when the folder is scanned.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its
+            tags when the folder is scanned.
+        delta (dict[str, list[str]], optional): The titles added, modified and removed since the last export, as
+            returned by `DataProcess.get_book_records_incremental`, so that only their rows of the database are
+            written. When not given, every row is replaced.
     
     Returns:
         None
@@ -88,29 +155,28 @@ def exportPDF_info(folderPath: str, banned_words: set[str]) -> None:
     The function retrieves PDF filenames using DataProcess.get_pdf_name() and processes various data about the PDFs.
     It writes the information to a file specified by path.PDF_info_path. The information includes the title of the PDF,
     the length of the title in characters and words, a list of multi-tags extracted from the title, the number of tags,
-    the file size in kilobytes, and the updated time of the PDF. The information is written in a CSV format with each
-    field separated by a semicolon. The function uses DataProcess.get_word_list_from_file() to extract multi-tags from
-    the PDF title and DataProcess.get_file_size() and DataProcess.get_updated_time() to get the file size and updated
-    time of the PDF.
-    """
-    filename_list = DataProcess.get_pdf_name(folderPath)
-
-    with open(path.PDF_info_path, "w") as outputFile:
-        outputFile.write("Title;Title Length (char);Title Length (word);Multi-Tags;Tag Number;File Size (Kb);Updated Time\n")
-        for filename in filename_list:
-            outputFile.write(f"{filename};")
-            outputFile.write(f"{len(filename)};")
-            outputFile.write(f"{len(filename.strip().split())};")
-            word_list = DataProcess.get_word_list_from_file(filename, banned_words)
-            for word in word_list:
-                outputFile.write(f"#{word}")
-                if word != word_list[-1]:
-                    outputFile.write(" ")
-            outputFile.write(f";{len(word_list)};")
-            outputFile.write(f"{DataProcess.get_file_size(folderPath + '/' + filename + ".pdf")};")
-            outputFile.write(f"{DataProcess.get_updated_time(folderPath + '/' + filename + ".pdf")}\n")
-
-def exportPDF_index(folderPath: str) -> None:
+    the number of pages, the file size in kilobytes, and the updated time of the PDF. The number of pages is read from
+    the PDF file itself by `PDFScan.scan_files`, whose results are cached at `path.PDF_content_path`. The information is written in a CSV format with each
+    field separated by a semicolon, rendered one row at a time by `Render.render_csv` and streamed in chunks by
+    `Output.write_chunks`. The multi-tags, the file size and the updated time of each PDF come from the
+    book records, in which every file is tokenized and stat-ed only once. The same records are also written to the
+    columnar catalog at `path.PDF_catalog_path`, from which the other exports can read only the columns they need,
+    and to the SQLite database at `path.PDF_database_path` along with the reading-task history.
+    """
+    if records is None:
+        records = DataProcess.get_book_records(folderPath, banned_words, workers=workers,
+                                               content_cache=path.PDF_content_path, content_tags=content_tags)
+
+    Profiler.count(items=len(records))
+    Output.write_chunks(Render.iter_chunks(Render.render_csv(PDF_info_header, get_PDF_info_rows(records))), path.PDF_info_path)
+    with Profiler.stage("catalog"):
+        Catalog.write_catalog(path.PDF_catalog_path, records)
+    with Profiler.stage("database"):
+        Database.write_books(path.PDF_database_path, records, delta)
+        Database.write_tasks(path.PDF_database_path, DataProcess.load_task_history(path.taskList_path, path.TaskHistory_path))
+
+@Profiler.timed("PDF index")
+def exportPDF_index(folderPath: str, records: list[BookRecord] = None) -> None:
     """
     Export the PDF index to two separate files: `Obsidian_PDF_index_path` and `PDF_index_path`.
 
@@ -118,34 +184,49 @@ def exportPDF_index(folderPath: str) -> None:
     The `Obsidian_PDF_index_path` file contains a list of filenames along with their corresponding indices.
     Each filename is written in the format `[[BOOKS/{filename}.pdf|{filename}]]`.
     The `PDF_index_path` file contains the same information as `Obsidian_PDF_index_path`, but without the Obsidian link format.
+    The index is rendered one book at a time by `Render.render_pdf_index` and streamed in chunks to both files by `Output.write_chunks`, which skips the files that are already up to date.
 
     Parameters:
     - `folderPath` (str): The path to the folder containing the PDF files.
+    - `records` (list[BookRecord], optional): Book records from an earlier scan of `folderPath`. When not given, the
+      folder is scanned and the titles are tokenized with the banned words read from `path.ban_path`.
 
     Returns:
     - None
 
     Note: The `DataProcess` module and the `path` module must be imported for this function to work properly.
     """
-    filename_list = DataProcess.get_pdf_name(folderPath)
-    banned_words = DataProcess.get_banned_words(path.ban_path)
+    if records is None:
+        banned_words = DataProcess.get_banned_words(path.ban_path)
+        records = DataProcess.get_book_records(folderPath, banned_words, include_file_stat=False)
 
-    with open(path.Obsidian_PDF_index_path, "w") as outputFile:
-        outputFile.write("\n# PDF index (Total: " + str(len(filename_list)) + ")\n\n")
-        for index, filename in enumerate(filename_list, start= 1):
-            outputFile.write(f"{index}. [[BOOKS/{filename}.pdf|{filename}]]\n")
+    Profiler.count(items=len(records))
+    Output.write_chunks(Render.iter_chunks(Render.render_pdf_index(records)), path.Obsidian_PDF_index_path, path.PDF_index_path)
 
-            outputFile.write("\nKeywords: ")
-            keyword_list = DataProcess.get_word_list_from_file(filename, banned_words)
-            
-            for keyword in keyword_list:
-                outputFile.write(f"#{keyword}")
-                if keyword != keyword_list[-1]:
-                    outputFile.write(" ")
-            outputFile.write("\n\n")
-    mirrorFile_to_destination(path.Obsidian_PDF_index_path, path.PDF_index_path)
+@Profiler.timed("tag analytics")
+def exportTagAnalytics(records: list[BookRecord]) -> dict:
+    """
+    Build the tag analytics of the book records, save them for the related-tags and similar-books queries, and
+    export the tag statistics.
 
-def updateStat(PDF_info_file: str) -> None:
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        dict: The analytics, as returned by `TagAnalytics.build_tag_analytics`.
+
+    The analytics are saved to `path.TagAnalytics_path`. The most frequent tags, with their number of books, their
+    IDF and the tags most related to them, are rendered by `Render.render_tag_stat` and written to both
+    `path.TagStat_path` and `path.Obsidian_TagStat_path`.
+    """
+    analytics = TagAnalytics.build_tag_analytics(records)
+    Profiler.count(items=len(analytics["Tags"]))
+    TagAnalytics.save_tag_analytics(path.TagAnalytics_path, analytics)
+    Output.write_chunks(Render.iter_chunks(Render.render_tag_stat(analytics)), path.TagStat_path, path.Obsidian_TagStat_path)
+    return analytics
+
+@Profiler.timed("statistics")
+def updateStat(PDF_info_file: str, records: list[BookRecord] = None, property_stats: dict[str, RunningStat.RunningStat] = None) -> None:
     """
     Updates the statistics of PDFs based on the information provided in the given CSV file.
 
@@ -153,40 +234,55 @@ def updateStat(PDF_info_file: str) -> None:
         PDF_info_file (str): The path to the CSV file containing the information about the PDFs.
             The CSV file should have the following format:
             - Title;Title Length (char);Title Length (word);Multi-Tags;Tag Number;Pages;File Size (byte);Updated Time
+        records (list[BookRecord], optional): Book records from an earlier scan. When given, the CSV file is not read.
+            When not given, the numeric columns are read from the catalog at `path.PDF_catalog_path`, and the CSV
+            file is only read when there is no catalog yet.
+        property_stats (dict[str, RunningStat.RunningStat], optional): Running statistics of the properties, kept up
+            to date by `updateData`. When given, the characteristics and distributions are read from them instead of
+            being computed over every record.
 
     Returns:
         None
 
-    This function reads the CSV file and extracts the necessary data. It then analyzes the characteristics of various properties
-    such as title length (char) and title length (word), tag number, file size, and updated time using the `DataProcess.analyze_characteristic_of_property` function.
-    The analyzed properties are stored in separate dictionaries.
+    This function reads the CSV file, unless `records` are given, and extracts the necessary data into integer columns with `DataProcess.get_property_columns`.
+    It then analyzes the characteristics of various properties such as title length (char) and title length (word), tag number, number of pages and file size using the
+    `DataProcess.analyze_column` function. The analyzed properties are stored in separate dictionaries, and the distribution of each property is counted
+    with `DataProcess.get_histogram`.
 
     The function also retrieves the timestamp history using the `DataProcess.get_ordered_timestamps` function.
 
-    The analyzed properties and timestamp history are used to generate a markdown table that provides statistics about the PDFs.
-    The table is written to the file specified by `path.TableStat_path`.
+    The analyzed properties, their distributions and the timestamp history are used to generate a markdown table that provides statistics about the PDFs.
 
-    The function also mirrors the generated table to the destination specified by `path.Obsidian_TableStat_path`.
+    The table is rendered in memory and written by `Output.write_document` to both `path.TableStat_path` and `path.Obsidian_TableStat_path`.
 
     Finally, the analyzed properties are converted to JSON format and written to the file specified by `path.PropertyStat_tokens_path`.
     """
     # CSV format:Title;Title Length (char);Title Length (word);Multi-Tags;Tag Number;Pages;File Size (byte);Updated Time
 
-    with open(PDF_info_file, "r") as csv_file:
-        csvreader = reader(csv_file, delimiter = ';')
-        data = list(zip(*csvreader))
-
-    title, title_length_char, title_length_word,multi_tag, tag_number, file_size, updated_time = data
-
-    title_length_char_property = DataProcess.analyze_characteristic_of_property(title_length_char)
-    title_length_word_property = DataProcess.analyze_characteristic_of_property(title_length_word)
-    tag_number_property = DataProcess.analyze_characteristic_of_property(tag_number)
-    file_size_property = DataProcess.analyze_characteristic_of_property(file_size)
-
-    timestamp_history = DataProcess.get_ordered_timestamps(updated_time)
+    if records is None and property_stats is None and Catalog.is_readable(path.PDF_catalog_path):
+        columns = Catalog.read_catalog_columns(path.PDF_catalog_path, list(Catalog.NUMERIC_COLUMNS))
+        timestamp_history = DataProcess.get_ordered_timestamps(columns.pop("Updated Time"))
+    else:
+        if records is None:
+            records = DataProcess.read_book_records(PDF_info_file)
+        columns = DataProcess.get_property_columns(records) if property_stats is None else None
+        timestamp_history = DataProcess.get_ordered_timestamps(record.updated_time for record in records)
+
+    if property_stats is None:
+        properties = {name: DataProcess.analyze_column(name, column) for name, column in columns.items()}
+        histograms = {name: DataProcess.get_histogram(column) for name, column in columns.items()}
+    else:
+        properties = {name: running_stat.describe(name) for name, running_stat in property_stats.items()}
+        histograms = {name: running_stat.get_histogram() for name, running_stat in property_stats.items()}
+
+    title_length_char_property = properties["Title Length (char)"]
+    title_length_word_property = properties["Title Length (word)"]
+    tag_number_property = properties["Tag Number"]
+    pages_property = properties["Pages"]
+    file_size_property = properties["File Size (Kb)"]
     keys = list(title_length_char_property.keys())
 
-    with open(path.TableStat_path, "w") as outputFile:
+    with StringIO() as outputFile:
         outputFile.write("# Statistic of PDFs\n")
         outputFile.write("\n## Title Stat\n\n")
         outputFile.write("| Characteristic| Title Length (char)| Title Length (word)|\n")
@@ -194,10 +290,19 @@ def updateStat(PDF_info_file: str) -> None:
         for key in keys[1:]:
             outputFile.write(f"| {key} | {title_length_char_property[key]} | {title_length_word_property[key]} |\n")
         outputFile.write("\n## Keywords Stat\n\n")
-        outputFile.write("| Characteristic| Tag Number | File Size (Kb)|\n")
+        outputFile.write("| Characteristic| Tag Number | Pages | File Size (Kb)|\n")
         outputFile.write("| --- | --- | --- | --- |\n")
         for key in keys[1:]:
-            outputFile.write(f"| {key} | {tag_number_property[key]} | {file_size_property[key]} |\n")
+            outputFile.write(f"| {key} | {tag_number_property[key]} | {pages_property[key]} | {file_size_property[key]} |\n")
+        outputFile.write("\n")
+
+        outputFile.write("## Distribution\n")
+        for name, histogram in histograms.items():
+            outputFile.write(f"\n### {name}\n\n")
+            outputFile.write("| Range | Count |\n")
+            outputFile.write("| --- | --- |\n")
+            for low, high, count in histogram:
+                outputFile.write(f"| {low} - {high} | {count} |\n")
         outputFile.write("\n")
 
         outputFile.write("## Time Stamp History\n\n")
@@ -218,61 +323,403 @@ def updateStat(PDF_info_file: str) -> None:
             else:
                 outputFile.write("\n")
                 counter = 0
-            
-    mirrorFile_to_destination(path.TableStat_path, path.Obsidian_TableStat_path)
+        Output.write_document(outputFile.getvalue(), path.TableStat_path, path.Obsidian_TableStat_path)
 
-    with open(path.PropertyStat_tokens_path, "w") as outputFile:
-        dict_list = [title_length_char_property, title_length_word_property, tag_number_property, file_size_property]
-        json_string = json.dumps(dict_list,indent=4)
-        outputFile.write(json_string)
+    dict_list = [title_length_char_property, title_length_word_property, tag_number_property, pages_property, file_size_property]
+    json_string = json.dumps(dict_list,indent=4)
+    Output.write_document(json_string, path.PropertyStat_tokens_path)
 
-def exportPDF_tokens(pdf_info_file: str) -> None:
-    """Export PDF tokens from a given PDF info file."""
-    with open(pdf_info_file, "r") as csv_file:
-        reader_ = reader(csv_file, delimiter=";")
-        data = list(zip(*reader_))
+@Profiler.timed("PDF tokens")
+def exportPDF_tokens(pdf_info_file: str, records: list[BookRecord] = None) -> None:
+    """
+    Export PDF tokens from the book records of an earlier scan when given, otherwise from the catalog at
+    `path.PDF_catalog_path`, or from a given PDF info file when there is no catalog yet. Numbers are written as
+    JSON numbers, and there is one token per book.
+    """
+    if records is None:
+        if Catalog.is_readable(path.PDF_catalog_path):
+            records = Catalog.read_catalog_records(path.PDF_catalog_path)
+        else:
+            records = DataProcess.read_book_records(pdf_info_file)
 
+    Profiler.count(items=len(records))
     PDF_token_list = [
         {
-            "Title": title,
-            "Title Length (char)": title_length_char,
-            "Title Length (word)": title_length_word,
-            "Multi-Tags": multi_tags,
-            "Tag Number": tag_number,
-            "File Size (Kb)": file_size,
-            "Updated Time": updated_time
-        } 
-        for title, title_length_char, title_length_word, multi_tags, tag_number, file_size, updated_time 
-        in zip(data[0], data[1], data[2], data[3], data[4], data[5], data[6])
+            "Title": record.title,
+            "Title Length (char)": record.title_length_char,
+            "Title Length (word)": record.title_length_word,
+            "Multi-Tags": Render.get_tag_fragment(record.tags),
+            "Tag Number": record.tag_number,
+            "Pages": record.pages,
+            "File Size (Kb)": record.file_size,
+            "Updated Time": record.get_updated_time_text()
+        }
+        for record in records
     ]
 
-    with open(path.PDF_tokens_path, "w") as output_file:
-        json.dump(PDF_token_list, output_file, indent=4,)
+    Output.write_document(json.dumps(PDF_token_list, indent=4), path.PDF_tokens_path)
 
-def pick_number_random_book_to_read() -> None:
+def updateData(folderPath: str, banned_words: set[str], full_rebuild: bool = False, workers: int = None, content_tags: bool = False) -> None:
     """
-    Picks a random number of books from the list of PDF filenames in the BOOKS folder and appends them to the Obsidian task list.
-    
-    This function retrieves the list of PDF filenames using `DataProcess.get_pdf_name()` and selects a random number of items using `DataProcess.pick_random_number_items()`. It then appends the selected items to the Obsidian task list file specified by `path.Obsidian_taskList_path`. Each item is written in the format `- [ ] Read a chapter of [[BOOKS/{filename}.pdf|{filename}]]`.
-    
+    Rebuild every catalog output from a single scan of the folder.
+
     Parameters:
-    - None
-    
+        folderPath (str): The path to the folder containing the PDF files.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        full_rebuild (bool): Whether to ignore the manifest and process every file again.
+        workers (int, optional): The number of threads used to stat the files.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+
+    Returns:
+        None
+
+    The manifest at `path.PDF_manifest_path` and the running statistics at `path.PropertyStat_running_path`
+    are loaded from disk and handed to `refresh_catalog`.
+    """
+    manifest = {} if full_rebuild else DataProcess.load_manifest(path.PDF_manifest_path)
+    property_stats = None if full_rebuild else RunningStat.load_property_stats(path.PropertyStat_running_path)
+    refresh_catalog(folderPath, banned_words, manifest, property_stats, workers, content_tags)
+
+def catalog_vault(vault: path.Vault, banned_words: set[str], full_rebuild: bool = False, workers: int = None, content_tags: bool = False,
+                  processes: int = 1) -> tuple[list[BookRecord], dict[str, RunningStat.RunningStat]]:
+    """
+    Bring the catalog outputs of one vault up to date, like `updateData`, and return what `updateVaults` merges.
+
+    Parameters:
+        vault (path.Vault): The vault. It becomes the current vault of the process.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        full_rebuild (bool): Whether to ignore the manifest and process every file again.
+        workers (int, optional): The number of threads used to stat the files.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+        processes (int): The number of worker processes reading the PDF files of the vault. Defaults to 1, the
+            files being read by the process of the vault itself.
+
+    Returns:
+        tuple[list[BookRecord], dict[str, RunningStat.RunningStat]]: The book records of the vault, sorted by title, and
+        the running statistics of their properties.
+
+    This is the task run by each worker process of `updateVaults`, so both its arguments and its results are
+    sent between processes, and the PDF files are read by no more processes than its share of the processors.
+    """
+    path.use_vault(vault)
+    manifest = {} if full_rebuild else DataProcess.load_manifest(path.PDF_manifest_path)
+    property_stats = None if full_rebuild else RunningStat.load_property_stats(path.PropertyStat_running_path)
+    _, property_stats = refresh_catalog(path.BOOKS_folder_path, banned_words, manifest, property_stats, workers, content_tags,
+                                        processes)
+    records = [manifest["Files"][title]["Record"] for title in sorted(manifest["Files"])]
+    if property_stats is None:
+        property_stats = RunningStat.build_property_stats(records)
+    return records, property_stats
+
+@Profiler.timed("vaults")
+def updateVaults(banned_words: set[str], full_rebuild: bool = False, workers: int = None, processes: int = None, content_tags: bool = False) -> None:
+    """
+    Catalog every vault of the configuration in parallel, then merge their tag catalogs, PDF indexes and statistics.
+
+    Parameters:
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        full_rebuild (bool): Whether to ignore the manifests and process every file again.
+        workers (int, optional): The number of threads used to stat the files of each vault.
+        processes (int, optional): The number of worker processes. Defaults to one per vault, up to the number
+            of processors.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+
+    Returns:
+        None
+
+    Each vault is a shard handled by `catalog_vault` in a process of its own, so the tokenizing, the statistics
+    and the writing of the outputs of the vaults run on separate cores, and each vault keeps its own outputs up to
+    date. The processors are shared between the shards: each one reads its PDF files with its share of them, at
+    least one process, rather than with a pool as large as the machine. The shards send back their book records
+    and the `RunningStat` accumulators of their properties. The records, already sorted by title, are merged in
+    order, the accumulators are combined with `RunningStat.merge_property_stats`, and the merged records and
+    statistics are written as the tag catalog, the PDF index, the tag analytics and the statistics table of the
+    "All Vaults" vault, `path.combined_vault`.
+    """
+    vaults = path.vaults
+    current_vault = path.current_vault
+    pool_size = processes or min(len(vaults), os.cpu_count() or 1)
+    scan_processes = max(1, (os.cpu_count() or 1) // pool_size)
+    with futures.ProcessPoolExecutor(max_workers=pool_size) as executor:
+        shards = list(executor.map(catalog_vault, vaults, [banned_words] * len(vaults), [full_rebuild] * len(vaults), [workers] * len(vaults),
+                                   [content_tags] * len(vaults), [scan_processes] * len(vaults)))
+
+    records = list(heapq.merge(*(shard_records for shard_records, _ in shards), key=lambda record: record.title))
+    property_stats = RunningStat.merge_property_stats([shard_stats for _, shard_stats in shards])
+    path.combined_vault.root.mkdir(parents=True, exist_ok=True)
+    path.use_vault(path.combined_vault)
+    try:
+        exportTagSet(None, banned_words, records)
+        exportPDF_index(None, records)
+        exportTagAnalytics(records)
+        updateStat(None, records, property_stats)
+    finally:
+        path.use_vault(current_vault)
+
+@Profiler.timed("update")
+def refresh_catalog(folderPath: str, banned_words: set[str], manifest: dict, property_stats: dict[str, RunningStat.RunningStat] = None, workers: int = None,
+                    content_tags: bool = False, processes: int = None) -> tuple[dict[str, list[str]], dict[str, RunningStat.RunningStat]]:
+    """
+    Bring every catalog output up to date with the folder, starting from a manifest and running statistics.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        manifest (dict): The manifest of the previous scan, as returned by `DataProcess.load_manifest`. It is
+            updated in place.
+        property_stats (dict[str, RunningStat.RunningStat], optional): The running statistics matching the
+            manifest. They are rebuilt from the records when missing or out of step with the manifest.
+        workers (int, optional): The number of threads used to stat the files.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+        processes (int, optional): The number of worker processes reading the PDF files. Defaults to the number of
+            processors.
+
+    Returns:
+        tuple[dict[str, list[str]], dict[str, RunningStat.RunningStat]]: The delta found by the scan, and the
+        running statistics after it, to be handed to the next call.
+
+    The folder is scanned once with `DataProcess.get_book_records_incremental`, which only reads the page count of
+    and tokenizes the files that were added or modified since the manifest was written. The same records feed the tag catalog, the PDF
+    index, the PDF info CSV, the statistics table, the PDF tokens and the search index, so no exporter lists the
+    folder, stats a file, tokenizes a title or re-reads the CSV file again. When nothing changed and the outputs
+    are current, see `are_outputs_current`, none of them is written. Otherwise the tag catalog is only written
+    when the set of tags changed, and the PDF index, the search index and the tag analytics only when a title or
+    its tags changed, unless one of their files is missing or was edited, in which case they are written again.
+
+    The running statistics are patched with the properties of the removed, modified and added books only, and
+    the statistics table is rendered from them. The rows of the database are also written from the delta only,
+    see `Database.write_books`. Both the running statistics and the manifest are then saved.
+
+    The other outputs are rendered again from the records in memory whenever they are written, because their
+    layout does not allow patching a few books in place:
+
+    - The PDF info CSV, the PDF tokens and the columnar catalog are single documents sorted by title, the catalog
+      holding each column as one array with the offsets of its strings, so adding or removing a book moves every
+      byte after it. `Output.write_chunks` and `Output.write_document` still leave a file untouched when its
+      contents did not change.
+    - The search index and the tag analytics refer to each book by its position among the sorted titles, so
+      adding or removing a book renumbers every posting after it. They are skipped when no title or tag changed.
+    - The statistics table holds the timeline of the updated times of every book, sorted from the records. The
+      characteristics of each property come from the running statistics.
+
+    None of them lists the folder, reads a PDF file or tokenizes a title again, so their cost is that of
+    rendering and writing the documents.
+    """
+    old_files = manifest.get("Files", {})
+    records, delta = DataProcess.get_book_records_incremental(folderPath, banned_words, manifest, workers, path.PDF_content_path, content_tags,
+                                                              processes)
+    tag_catalog_current = are_outputs_current(path.TagCatalog_path, path.Obsidian_TagCatalog_path)
+    index_current = are_outputs_current(path.PDF_index_path, path.Obsidian_PDF_index_path, path.PDF_search_index_path,
+                                        path.TagAnalytics_path, path.TagStat_path, path.Obsidian_TagStat_path)
+    info_current = (are_outputs_current(path.PDF_info_path, path.PDF_catalog_path, path.TableStat_path, path.Obsidian_TableStat_path,
+                                        path.PropertyStat_tokens_path, path.PDF_tokens_path, path.PropertyStat_running_path)
+                    and os.path.exists(path.PDF_database_path))
+    if not any(delta.values()) and tag_catalog_current and index_current and info_current:
+        return delta, property_stats
+
+    if (property_stats is None or tuple(property_stats) != RunningStat.PROPERTY_NAMES
+            or property_stats["Title Length (char)"].count != len(old_files)):
+        property_stats = RunningStat.build_property_stats(records)
+    else:
+        for title in delta["Modified"] + delta["Removed"]:
+            RunningStat.remove_record(property_stats, old_files[title]["Record"])
+        for title in delta["Added"] + delta["Modified"]:
+            RunningStat.add_record(property_stats, manifest["Files"][title]["Record"])
+
+    old_records = [entry["Record"] for entry in old_files.values()]
+    old_tags = [(record.title, record.tags) for record in old_records]
+    new_tags = [(record.title, record.tags) for record in records]
+    if (not old_files or not tag_catalog_current
+            or {tag for _, tags in old_tags for tag in tags} != {tag for _, tags in new_tags for tag in tags}):
+        exportTagSet(folderPath, banned_words, records)
+    if not old_files or not index_current or old_tags != new_tags:
+        exportPDF_index(folderPath, records)
+        with Profiler.stage("search index"):
+            Profiler.count(items=len(records))
+            Search.save_index(path.PDF_search_index_path, Search.build_index(records))
+        exportTagAnalytics(records)
+    exportPDF_info(folderPath, banned_words, records, delta=delta if old_files else None)
+    updateStat(path.PDF_info_path, records, property_stats)
+    exportPDF_tokens(path.PDF_info_path, records)
+    with Profiler.stage("running statistics"):
+        RunningStat.save_property_stats(path.PropertyStat_running_path, property_stats)
+    DataProcess.save_manifest(path.PDF_manifest_path, manifest)
+    # The manifest is left untouched when it did not change, but it must still be newer than the outputs just written.
+    os.utime(path.PDF_manifest_path)
+    return delta, property_stats
+
+def are_outputs_current(*outputs: str) -> bool:
+    """
+    Tell whether outputs of `refresh_catalog` can be left as they are.
+
+    Parameters:
+        *outputs (str): The paths of the outputs.
+
+    Returns:
+        bool: Whether every output exists and none was modified after the manifest was last saved, such as a note
+        edited by hand in the Obsidian vault. `refresh_catalog` saves the manifest after all of its outputs.
+    """
+    try:
+        manifest_time = os.stat(path.PDF_manifest_path).st_mtime_ns
+        return all(os.stat(output).st_mtime_ns <= manifest_time for output in outputs)
+    except OSError:
+        return False
+
+def watch(folderPath: str, workers: int = None, interval: float = 0.2, debounce: float = 0.5, rescan_interval: float = 5.0, content_tags: bool = False) -> None:
+    """
+    Keep the catalog outputs up to date with the folder until interrupted with Ctrl+C.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        workers (int, optional): The number of threads used to stat the files.
+        interval (float): The number of seconds between two polls of the folder.
+        debounce (float): The number of seconds the folder must stay unchanged before the outputs are refreshed.
+        rescan_interval (float): The number of seconds after which the folder is scanned even though it did not
+            seem to change, to catch files modified in place.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+
+    Returns:
+        None
+
+    The manifest and the running statistics are loaded once and then kept in memory. Each poll only stats the
+    folder itself: its modification time changes whenever a file is added, removed or renamed. A burst of such
+    changes, such as a batch of PDF files being dropped into the vault, is folded into a single refresh once the
+    folder has been quiet for `debounce` seconds. Each refresh goes through `refresh_catalog`, so only the
+    changed files are processed and only the affected outputs are written. The ban list is reloaded from its
+    cache at every refresh, so editing it re-tags the library.
+    """
+    manifest = DataProcess.load_manifest(path.PDF_manifest_path)
+    property_stats = RunningStat.load_property_stats(path.PropertyStat_running_path)
+    _, property_stats = refresh_catalog(folderPath, DataProcess.get_banned_words(path.ban_path), manifest, property_stats, workers, content_tags)
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + f"Watching {folderPath} (Ctrl+C to stop)" + colorama.Style.RESET_ALL)
+    folder_mtime = os.stat(folderPath).st_mtime_ns
+    last_change = None
+    last_refresh = time.monotonic()
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            current_mtime = os.stat(folderPath).st_mtime_ns
+            if current_mtime != folder_mtime:
+                folder_mtime = current_mtime
+                last_change = now
+                continue
+            if (last_change is None or now - last_change < debounce) and now - last_refresh < rescan_interval:
+                continue
+            delta, property_stats = refresh_catalog(folderPath, DataProcess.get_banned_words(path.ban_path), manifest, property_stats, workers, content_tags)
+            last_change = None
+            last_refresh = now
+            if any(delta.values()):
+                print(colorama.Fore.GREEN + f"{DataProcess.get_current_time()}: {len(delta['Added'])} added, {len(delta['Modified'])} modified, {len(delta['Removed'])} removed" + colorama.Style.RESET_ALL)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        colorama.deinit()
+
+def serve(folderPath: str, address: str = None, workers: int = None, content_tags: bool = False) -> None:
+    """
+    Answer the queries of `main.py --server` and other local clients from memory until interrupted with Ctrl+C.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        address (str, optional): The address to listen on, "HOST:PORT" or "unix:PATH", see `Server.parse_address`.
+            Defaults to `Server.DEFAULT_ADDRESS`.
+        workers (int, optional): The number of threads used to stat the files.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+
+    Returns:
+        None
+
+    The server is run by `Server.serve`, which keeps the catalog outputs up to date with the folder like `watch`
+    does, and the changes it brings in are printed the same way.
+    """
+    def report(delta: dict[str, list[str]]) -> None:
+        print(colorama.Fore.GREEN + f"{DataProcess.get_current_time()}: {len(delta['Added'])} added, {len(delta['Modified'])} modified, {len(delta['Removed'])} removed" + colorama.Style.RESET_ALL)
+
+    address = address or Server.DEFAULT_ADDRESS
+    colorama.init()
+    print(colorama.Fore.MAGENTA + f"Serving {folderPath} on {address} (Ctrl+C to stop)" + colorama.Style.RESET_ALL)
+    try:
+        asyncio.run(Server.serve(folderPath, address, workers, content_tags=content_tags, on_refresh=report))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        colorama.deinit()
+
+@Profiler.timed("server query")
+def query_server(address: str, route: str, parameters: dict[str, str] = None) -> None:
+    """
+    Prints the answer of the query server to a query, as the command answering it locally would.
+
+    Parameters:
+        address (str): The address of the server, see `Server.parse_address`.
+        route (str): The route of the query: "/search", "/fuzzy", "/tagged", "/related", "/similar" or "/tasks".
+        parameters (dict[str, str], optional): The parameters of the query.
+
+    Returns:
+        None: This function does not return anything.
+
+    The query is sent by `Server.request`, so neither the index nor the ban list is loaded by this process. Like
+    `pick_number_random_book_to_read`, "/tasks" prints nothing: the server appends the books picked to the task
+    list.
+    """
+    results = Server.request(address, route, parameters, "POST" if route == "/tasks" else "GET")
+    if route == "/tasks":
+        return
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + {"/related": "Related Tags", "/similar": "Similar Books", "/tagged": "Query Result"}.get(route, "Search Result") + colorama.Style.RESET_ALL)
+    for result in results:
+        if route == "/related":
+            print(colorama.Fore.GREEN + f"#{result[0]}" + colorama.Style.RESET_ALL + f" ({result[1]} books)")
+        elif route == "/similar":
+            print(colorama.Fore.GREEN + result[0] + colorama.Style.RESET_ALL + f" ({result[1]})")
+        else:
+            print(colorama.Fore.GREEN + result + colorama.Style.RESET_ALL)
+    colorama.deinit()
+
+@Profiler.timed("tasks")
+def pick_number_random_book_to_read(count: int = 3) -> None:
+    """
+    Picks books from the BOOKS folder to read next and appends them to the Obsidian task list.
+
+    This function lists the books with `DataProcess.get_book_records()` and picks `count` of them with `Scheduler.pick_books()`, which favours the books never given, then the ones given longest ago, and avoids books given in the last days or sharing tags with each other. It then appends the selected items to the Obsidian task list file specified by `path.Obsidian_taskList_path`. Each item is written in the format `- [ ] Read a chapter of [[BOOKS/{filename}.pdf|{filename}]]`.
+
+    Parameters:
+    - count (int): The number of books to pick.
+
     Returns:
     - None
-    
-    The function uses the `DataProcess` module to retrieve the list of PDF filenames and select random items. It also uses the `path` module to specify the paths to the BOOKS folder and the Obsidian task list file. The function calls `mirrorFile_to_destination()` to copy the Obsidian task list file to the destination specified by `path.taskList_path`.
+
+    The task history is read from `path.taskList_path` by `DataProcess.load_task_history()`, which only parses the days added since the last call. The tasks are then appended by `append_reading_tasks()`.
+    """
+    records = DataProcess.get_book_records(path.BOOKS_folder_path, DataProcess.get_banned_words(path.ban_path), include_file_stat=False)
+    task_index = Scheduler.get_task_index(DataProcess.load_task_history(path.taskList_path, path.TaskHistory_path))
+    append_reading_tasks(Scheduler.pick_books(records, task_index, count))
+
+def append_reading_tasks(titles: list[str]) -> None:
     """
-    filename_list = DataProcess.get_pdf_name(path.BOOKS_folder_path)
-    pick_random_item = DataProcess.pick_random_number_items(filename_list, 3)
-    with open(path.Obsidian_taskList_path, "a") as outputFile:
+    Append a day of reading tasks to the Obsidian task list.
+
+    Parameters:
+        titles (list[str]): The titles of the books to read.
+
+    Returns:
+        None
+
+    The new tasks are appended to the Obsidian task list in memory, under the current time, and the result is written by `Output.write_document()` to both the Obsidian task list file and the destination specified by `path.taskList_path`, each through a temporary file renamed over it.
+    """
+    with StringIO() as outputFile:
+        if os.path.exists(path.Obsidian_taskList_path):
+            with open(path.Obsidian_taskList_path, "r", encoding="utf-8") as inputFile:
+                outputFile.write(inputFile.read())
         outputFile.write("\n\n" + DataProcess.get_current_time() + "\n\n")
-        for filename in pick_random_item:
-            outputFile.write(f"- [ ] Read a chapter of [[BOOKS/{filename}.pdf|{filename}]]")
-            if filename != pick_random_item[-1]:
-                outputFile.write("\n")
-    mirrorFile_to_destination(path.Obsidian_taskList_path, path.taskList_path)
+        outputFile.write("\n".join(f"- [ ] Read a chapter of [[BOOKS/{filename}.pdf|{filename}]]" for filename in titles))
+        Output.write_document(outputFile.getvalue(), path.Obsidian_taskList_path, path.taskList_path)
 
+@Profiler.timed("rewrite ban list")
 def rewrite_ban_file(banned_word: set[str]) -> None:
     """
     Write a set of banned words to a file.
@@ -283,7 +730,7 @@ def rewrite_ban_file(banned_word: set[str]) -> None:
     Returns:
         None: This function does not return anything.
 
-    This function opens a file specified by the `path.ban_path` constant and writes each word in the `banned_word` set to a new line in the file. The file is opened in write mode and any existing content in the file is overwritten.
+    This function opens a file specified by the `path.ban_path` constant and writes each word in the `banned_word` set to a new line in the file, in sorted order. The file is opened in write mode and any existing content in the file is overwritten. When the file already holds exactly these words it is left untouched, so the binary cache of the ban list stays valid.
 
     Example:
         >>> banned_words = {"apple", "banana", "orange"}
@@ -293,26 +740,202 @@ def rewrite_ban_file(banned_word: set[str]) -> None:
         banana
         orange
     """
-    with open(path.ban_path, "w") as outputFile:
-        for word in banned_word:
-            outputFile.write(word + "\n")
+    Output.write_document("".join(word + "\n" for word in sorted(banned_word)), path.ban_path)
 
+def get_search_index(banned_words: set[str]) -> dict:
+    """
+    Load the search index kept by `updateData`, building it from a scan of the BOOKS folder when it is missing.
+
+    Parameters:
+        banned_words (set[str]): A set of words to be excluded from the tags, used only when the index is built.
+
+    Returns:
+        dict: The index, as returned by `Search.load_index`.
+    """
+    index = Search.load_index(path.PDF_search_index_path)
+    if index is None or "Trigrams" not in index:
+        records = DataProcess.get_book_records(path.BOOKS_folder_path, banned_words, include_file_stat=False)
+        Search.save_index(path.PDF_search_index_path, Search.build_index(records))
+        index = Search.load_index(path.PDF_search_index_path)
+    return index
+
+@Profiler.timed("search")
 def search_file(input: str) -> None:
     """
-    Searches for a given input string in the filenames of PDF files located in the BOOKS folder.
+    Searches for the PDF files in the BOOKS folder whose tags match a given query.
     
     Parameters:
-        input (str): The string to search for in the filenames.
+        input (str): The query, in the syntax of `Search.parse_query`: terms separated by spaces must all match,
+            "OR" separates alternatives and a term ending with "*" matches by prefix.
         
     Returns:
         None: This function does not return anything.
         
-    This function initializes the colorama module to enable colored output. It then prints a header indicating the start of the search results. It retrieves a list of PDF filenames from the BOOKS folder using the `DataProcess.get_pdf_name()` function. It iterates over each filename in the list and checks if the input string is present in the filename. If a match is found, it prints the filename in green color.
+    This function initializes the colorama module to enable colored output. It then prints a header indicating the start of the search results. The query is answered from the inverted index at `path.PDF_search_index_path`, which `updateData` keeps up to date, so the BOOKS folder is not listed. Only when no index has been written yet is it built from a scan of the BOOKS folder. The matching filenames are printed in green color, best match first.
     """
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    index = get_search_index(banned_words)
+
     colorama.init()
     print(colorama.Fore.MAGENTA + "Search Result" + colorama.Style.RESET_ALL)
-    filename_list = DataProcess.get_pdf_name(path.BOOKS_folder_path)
-    for filename in filename_list:
-        if input in filename:
-            print(colorama.Fore.GREEN + filename + colorama.Style.RESET_ALL)
-    colorama.deinit()
\ No newline at end of file
+    for filename in Search.query_index(index, input, banned_words):
+        print(colorama.Fore.GREEN + filename + colorama.Style.RESET_ALL)
+    colorama.deinit()
+
+@Profiler.timed("fuzzy search")
+def fuzzy_search_file(input: str) -> None:
+    """
+    Searches for the PDF files in the BOOKS folder whose titles are close to a given input string, tolerating typos.
+
+    Parameters:
+        input (str): The words to look for, such as "javscript" or "C+ high performance".
+
+    Returns:
+        None: This function does not return anything.
+
+    This function answers the query with `Search.fuzzy_query_index` over the character trigram index kept in the
+    search index, and prints the matching filenames in green color, most similar first.
+    """
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    index = get_search_index(banned_words)
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Search Result" + colorama.Style.RESET_ALL)
+    for filename in Search.fuzzy_query_index(index, input, banned_words):
+        print(colorama.Fore.GREEN + filename + colorama.Style.RESET_ALL)
+    colorama.deinit()
+
+def get_tag_analytics(banned_words: set[str]) -> dict:
+    """
+    Load the tag analytics kept by `updateData`, building them from a scan of the BOOKS folder when they are missing.
+
+    Parameters:
+        banned_words (set[str]): A set of words to be excluded from the tags, used only when the analytics are built.
+
+    Returns:
+        dict: The analytics, as returned by `TagAnalytics.load_tag_analytics`.
+    """
+    analytics = TagAnalytics.load_tag_analytics(path.TagAnalytics_path)
+    if analytics is None:
+        exportTagAnalytics(DataProcess.get_book_records(path.BOOKS_folder_path, banned_words, include_file_stat=False))
+        analytics = TagAnalytics.load_tag_analytics(path.TagAnalytics_path)
+    return analytics
+
+@Profiler.timed("related tags")
+def related_tags(tag: str) -> None:
+    """
+    Prints the tags that most often appear on the same books as a given tag.
+
+    Parameters:
+        tag (str): The tag, with or without the leading "#".
+
+    Returns:
+        None: This function does not return anything.
+
+    The tags are found by `TagAnalytics.get_related_tags` in the co-occurrence matrix of the tag analytics, and
+    printed in green color with the number of books they share with `tag`, most related first.
+    """
+    analytics = get_tag_analytics(DataProcess.get_banned_words(path.ban_path))
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Related Tags" + colorama.Style.RESET_ALL)
+    for related_tag, shared, _ in TagAnalytics.get_related_tags(analytics, tag):
+        print(colorama.Fore.GREEN + f"#{related_tag}" + colorama.Style.RESET_ALL + f" ({shared} books)")
+    colorama.deinit()
+
+@Profiler.timed("similar books")
+def similar_books(title: str) -> None:
+    """
+    Prints the books whose tags are the most similar to those of a given book.
+
+    Parameters:
+        title (str): The title of the book, i.e. the PDF file name without the ".pdf" suffix.
+
+    Returns:
+        None: This function does not return anything.
+
+    The books are ranked by `TagAnalytics.get_similar_books`, by the cosine similarity of their TF-IDF tag
+    vectors, and printed in green color, most similar first.
+    """
+    analytics = get_tag_analytics(DataProcess.get_banned_words(path.ban_path))
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Similar Books" + colorama.Style.RESET_ALL)
+    for similar_title, similarity in TagAnalytics.get_similar_books(analytics, title):
+        print(colorama.Fore.GREEN + similar_title + colorama.Style.RESET_ALL + f" ({similarity})")
+    colorama.deinit()
+
+@Profiler.timed("duplicates")
+def exportDuplicates(folderPath: str, banned_words: set[str], threshold: float = 0.5, workers: int = None) -> None:
+    """
+    Export the report of the identical PDF files and of the books with nearly the same title.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        banned_words (set[str]): A set of words to be excluded from the tags of each book.
+        threshold (float): The lowest Jaccard similarity of the tags of two titles reported as similar.
+        workers (int, optional): The number of threads used to stat the files.
+
+    Returns:
+        None: This function does not return anything.
+
+    The folder is scanned with `DataProcess.scan_pdf_files` and each title is tokenized with
+    `DataProcess.get_word_list_from_file`. The duplicates are found by `Duplicates.find_duplicates`, which only
+    reads the files sharing their size with another file and keeps its digests and signatures at
+    `path.PDF_hash_path`, so a repeated report reads no file. The report is rendered by `Render.render_duplicates`
+    and written to both `path.Duplicates_path` and `path.Obsidian_Duplicates_path`, and the number of duplicates
+    found is printed.
+    """
+    file_stats = DataProcess.scan_pdf_files(folderPath, workers)
+    with Profiler.stage("tokenize"):
+        Profiler.count(items=len(file_stats))
+        tags_by_title = {filename: set(DataProcess.get_word_list_from_file(filename, banned_words)) for filename, _ in file_stats}
+    report = Duplicates.find_duplicates(folderPath, file_stats, tags_by_title, path.PDF_hash_path,
+                                        DataProcess.tokenizer.get_version(banned_words), threshold)
+    Output.write_chunks(Render.iter_chunks(Render.render_duplicates(report)), path.Duplicates_path, path.Obsidian_Duplicates_path)
+
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Duplicates" + colorama.Style.RESET_ALL)
+    print(colorama.Fore.GREEN + f"{len(report['Identical'])} groups of identical files, {len(report['Similar'])} pairs of similar titles" + colorama.Style.RESET_ALL)
+    colorama.deinit()
+
+@Profiler.timed("database query")
+def query_books_tagged(tag: str, modified_since: datetime = None) -> None:
+    """
+    Prints the books of the catalog database carrying a tag, optionally only those modified since a given date.
+
+    Parameters:
+        tag (str): The tag to look for.
+        modified_since (datetime, optional): The earliest updated time of the books to print.
+
+    Returns:
+        None: This function does not return anything.
+
+    The query is answered by `Database.query_books_tagged` from the database written by `exportPDF_info`.
+    """
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Query Result" + colorama.Style.RESET_ALL)
+    for filename in Database.query_books_tagged(path.PDF_database_path, tag, modified_since):
+        print(colorama.Fore.GREEN + filename + colorama.Style.RESET_ALL)
+    colorama.deinit()
+
+@Profiler.timed("database query")
+def query_largest_unread(limit: int) -> None:
+    """
+    Prints the largest books of the catalog database that were never given as a reading task.
+
+    Parameters:
+        limit (int): The number of books to print.
+
+    Returns:
+        None: This function does not return anything.
+
+    The reading-task history of the database is refreshed from `path.taskList_path` first, so tasks picked since
+    the last `exportPDF_info` are taken into account. The query is answered by `Database.query_largest_unread`.
+    """
+    Database.write_tasks(path.PDF_database_path, DataProcess.load_task_history(path.taskList_path, path.TaskHistory_path))
+    colorama.init()
+    print(colorama.Fore.MAGENTA + "Query Result" + colorama.Style.RESET_ALL)
+    for filename, file_size in Database.query_largest_unread(path.PDF_database_path, limit):
+        print(colorama.Fore.GREEN + filename + colorama.Style.RESET_ALL + f" ({file_size} Kb)")
+    colorama.deinit()
@@ -0,0 +1,35 @@
+import importlib.util
+import sys
+from types import ModuleType
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module whose code only runs the first time one of its attributes is used.
+
+    Parameters:
+        name (str): The absolute name of the module, such as "json" or "modules.Catalog".
+
+    Returns:
+        ModuleType: The module. When it was already imported, it is returned as is.
+
+    The module is registered in `sys.modules` straight away, so a later `import` statement anywhere else gets the
+    same object and loads it on first use as well. This keeps the modules that only some commands need, such as
+    `sqlite3` or `colorama`, out of the start-up time of the other commands.
+
+    Example:
+        >>> json = lazy_import("json")      # nothing is executed yet
+        >>> json.dumps([1])                 # the module is loaded here
+        '[1]'
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    parent, _, child = name.rpartition(".")
+    if parent:
+        setattr(sys.modules[parent], child, module)
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,181 @@
+import os
+from collections.abc import Iterable
+from modules.Lazy import lazy_import
+from modules import Profiler
+
+hashlib = lazy_import("hashlib")
+shutil = lazy_import("shutil")
+secrets = lazy_import("secrets")
+
+CHUNK_SIZE = 1 << 20
+
+def get_file_digest(file_path: str) -> bytes:
+    """
+    Hash the contents of a file, reading it in chunks.
+
+    Parameters:
+        file_path (str): The path to the file.
+
+    Returns:
+        bytes: The BLAKE2b digest of the file.
+    """
+    digest = hashlib.blake2b()
+    with open(file_path, "rb") as inputFile:
+        for chunk in iter(lambda: inputFile.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+        Profiler.count(bytes_read=inputFile.tell())
+    return digest.digest()
+
+def is_unchanged(destination: str, data: bytes, digest: bytes) -> bool:
+    """
+    Tell whether a file already holds the given data.
+
+    Parameters:
+        destination (str): The path to the file.
+        data (bytes): The data about to be written.
+        digest (bytes): The BLAKE2b digest of `data`.
+
+    Returns:
+        bool: True when the file exists with the same contents. Files of a different size are told apart
+        without being read.
+    """
+    try:
+        if os.path.getsize(destination) != len(data):
+            return False
+        return get_file_digest(destination) == digest
+    except OSError:
+        return False
+
+def replace_atomically(destination: str, write) -> None:
+    """
+    Write a file through a temporary file in the same folder that is then renamed over it.
+
+    Parameters:
+        destination (str): The path to the file.
+        write (Callable[[str], None]): A function writing the new contents to the temporary file whose path it
+            is given.
+
+    Returns:
+        None
+
+    Renaming within a folder is atomic, so a reader such as the indexer of the Obsidian vault sees either the
+    old file or the new one, never a half-written one. The temporary file is created by `write` itself, with the
+    usual permissions, and is removed if writing fails. The folder is created when it does not exist yet.
+    """
+    folder, filename = os.path.split(os.path.abspath(destination))
+    os.makedirs(folder, exist_ok=True)
+    temporary_path = os.path.join(folder, f".{filename}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    try:
+        write(temporary_path)
+        os.replace(temporary_path, destination)
+    except BaseException:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+@Profiler.timed("write")
+def write_document(content: str | bytes, *destinations: str) -> list[str]:
+    """
+    Write a document rendered in memory to one or more files, skipping the files that already hold it.
+
+    Parameters:
+        content (str | bytes): The document. Text is encoded in UTF-8.
+        *destinations (str): The paths of the files to write, such as a file under `data/` and its copy in the
+            Obsidian vault.
+
+    Returns:
+        list[str]: The destinations that were actually written.
+
+    The document is hashed once and compared with each destination, and only the destinations whose contents
+    differ are replaced, atomically, by `replace_atomically`. Unchanged notes are not touched, so their
+    modification time stays the same and the indexer of the Obsidian vault does not process them again.
+    """
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    digest = hashlib.blake2b(data).digest()
+    written = []
+    for destination in destinations:
+        if is_unchanged(destination, data, digest):
+            continue
+        def write(temporary_path: str) -> None:
+            with open(temporary_path, "wb") as outputFile:
+                outputFile.write(data)
+        replace_atomically(destination, write)
+        written.append(destination)
+    Profiler.count(items=len(written), bytes_written=len(data) * len(written))
+    return written
+
+@Profiler.timed("write")
+def write_chunks(chunks: Iterable[str | bytes], *destinations: str) -> list[str]:
+    """
+    Stream a document, chunk by chunk, to one or more files, skipping the files that already hold it.
+
+    Parameters:
+        chunks (Iterable[str | bytes]): The chunks of the document, such as those yielded by `Render.iter_chunks`.
+            Text is encoded in UTF-8.
+        *destinations (str): The paths of the files to write.
+
+    Returns:
+        list[str]: The destinations that were actually written.
+
+    Unlike `write_document`, the document is never held in memory as a whole. Each chunk is written once, to a
+    temporary file next to the first destination, and hashed on the way. The temporary file is then compared
+    with each destination like in `write_document`: it is copied over the destinations that differ and renamed
+    over the first one, or removed when nothing changed.
+    """
+    folder, filename = os.path.split(os.path.abspath(destinations[0]))
+    os.makedirs(folder, exist_ok=True)
+    temporary_path = os.path.join(folder, f".{filename}.{os.getpid()}.{secrets.token_hex(4)}.tmp")
+    digest = hashlib.blake2b()
+    size = 0
+    written = []
+    try:
+        with open(temporary_path, "wb") as outputFile:
+            for chunk in chunks:
+                data = chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+                digest.update(data)
+                size += len(data)
+                outputFile.write(data)
+        digest = digest.digest()
+
+        def is_current(destination: str) -> bool:
+            try:
+                return os.path.getsize(destination) == size and get_file_digest(destination) == digest
+            except OSError:
+                return False
+
+        for destination in destinations[1:]:
+            if not is_current(destination):
+                replace_atomically(destination, lambda path: shutil.copyfile(temporary_path, path))
+                written.append(destination)
+        if not is_current(destinations[0]):
+            os.replace(temporary_path, destinations[0])
+            written.insert(0, destinations[0])
+    finally:
+        if os.path.exists(temporary_path):
+            os.remove(temporary_path)
+    Profiler.count(items=len(written), bytes_written=size * len(written))
+    return written
+
+@Profiler.timed("write")
+def copy_document(source: str, destination: str) -> bool:
+    """
+    Copy a file to a destination unless the destination already holds the same contents.
+
+    Parameters:
+        source (str): The path to the source file.
+        destination (str): The path to the destination file.
+
+    Returns:
+        bool: True when the destination was written.
+
+    The copy is done by `shutil.copyfile`, which uses the copy primitives of the operating system when there are
+    some, into a temporary file renamed over the destination by `replace_atomically`.
+    """
+    try:
+        if os.path.getsize(source) == os.path.getsize(destination) and get_file_digest(source) == get_file_digest(destination):
+            return False
+    except OSError:
+        pass
+    replace_atomically(destination, lambda temporary_path: shutil.copyfile(source, temporary_path))
+    Profiler.count(items=1, bytes_written=os.path.getsize(destination))
+    return True
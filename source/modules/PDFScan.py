@@ -0,0 +1,546 @@
+"""
+Read the page count, the title and subject metadata and the words of the first page of PDF files.
+
+A file is mapped in memory with `mmap` and only the parts the scan needs are touched: its end, for the offset
+given after `startxref`, the cross-reference sections found there, and a handful of objects: the document
+catalog, the root of the page tree, whose /Count is the number of pages, the document information dictionary
+and, when asked for, the first page and its content streams. The operating system pages these parts in on
+demand, so scanning a textbook of several hundred megabytes reads a few pages of it, and the memory of the
+process does not grow with the size of the file. The mapping is advised as random access, where the platform
+supports it, so that touching a page does not read ahead the megabytes after it. Compressed streams, i.e.
+cross-reference streams, object streams and content streams, are inflated a chunk at a time, up to a fixed size.
+
+Both the cross-reference tables of classic files and the cross-reference streams of PDF 1.5 are read, following
+their /Prev chain, so an incrementally updated file is read as its last revision. When the cross-reference data
+is damaged, an object is looked up by searching the mapped file for its header, and the pages are counted by
+searching for their /Type. Encrypted files only report their page count, since their strings cannot be read
+without the key, and a file that cannot be read at all is reported with 0 pages.
+
+`scan_files` scans the PDF files of a folder in a process pool and keeps the results in a cache keyed by the
+size and modification time of each file, so only the added and modified files are read again.
+"""
+import mmap
+import os
+import re
+import zlib
+from collections.abc import Iterable
+from functools import lru_cache
+from modules.Lazy import lazy_import
+from modules import Profiler
+
+pickle = lazy_import("pickle")
+futures = lazy_import("concurrent.futures")
+Output = lazy_import("modules.Output")
+
+HEADER_SIZE = 1024
+TAIL_SIZE = 2048
+CHUNK_SIZE = 1 << 16
+MAX_DICTIONARY_SIZE = 1 << 20
+MAX_STREAM_SIZE = 1 << 24
+MAX_TEXT_SIZE = 1 << 20
+MAX_DEPTH = 32
+MAX_WORDS = 200
+MAX_KEYWORDS = 16
+PARALLEL_THRESHOLD = 8
+
+STARTXREF = re.compile(rb"startxref\s+(\d+)")
+OBJECT_HEADER = re.compile(rb"\s*(\d+)\s+(\d+)\s+obj\b\s*")
+STREAM_START = re.compile(rb"\s*stream(?:\r\n|\n|\r)")
+XREF_SUBSECTION = re.compile(rb"\s*(\d+)[ \t]+(\d+)\s")
+XREF_ENTRY = re.compile(rb"\s*(\d{10})[ \t]+(\d{5})[ \t]+([nf])")
+TRAILER = re.compile(rb"\s*trailer\s*")
+DICTIONARY_TOKEN = re.compile(rb"\\.|<<|<[0-9A-Fa-f\s]*>|>>|[()]", re.DOTALL)
+LITERAL_STRING = rb"\((?:[^\\()]|\\.|\((?:[^\\()]|\\.)*\))*\)"
+ESCAPE = re.compile(rb"\\([0-7]{1,3}|\r\n|.)", re.DOTALL)
+ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f", b"\r\n": b"", b"\n": b"", b"\r": b""}
+TEXT_OBJECT = re.compile(rb"\bBT\b(.*?)\bET\b", re.DOTALL)
+TEXT_SHOWING = re.compile(rb"(" + LITERAL_STRING + rb")\s*(?:Tj|'|\")|\[((?:" + LITERAL_STRING + rb"|[^\]()])*)\]\s*TJ", re.DOTALL)
+ARRAY_ITEM = re.compile(LITERAL_STRING + rb"|-?\d*\.?\d+", re.DOTALL)
+PAGE_TYPE = re.compile(rb"/Type\s*/Page(?![A-Za-z])")
+WORD = re.compile(r"[A-Za-z]{3,}")
+
+@lru_cache(maxsize=None)
+def get_key_pattern(key: bytes) -> re.Pattern:
+    """Compile the pattern of a key of a dictionary followed by an integer, a reference, a string or a name."""
+    return re.compile(rb"/" + key + rb"(?![A-Za-z0-9])\s*(?:(\d+)(\s+\d+\s+R)?(?![\d.])|(" + LITERAL_STRING + rb"|<[0-9A-Fa-f\s]*>)|/([^\s/<>\[\]()]+)|(\[[^\]]*\]))", re.DOTALL)
+
+def get_value(dictionary: bytes, key: bytes) -> re.Match | None:
+    """Find the value of a key of a dictionary, see `get_key_pattern`."""
+    return get_key_pattern(key).search(dictionary)
+
+def get_reference(dictionary: bytes, key: bytes) -> int | None:
+    """Return the object number referred to by a key of a dictionary, or None when it is not a reference."""
+    match = get_value(dictionary, key)
+    return int(match.group(1)) if match is not None and match.group(2) else None
+
+def decode_string(raw: bytes) -> bytes:
+    """Turn a literal string, with its parentheses, or a hexadecimal string, with its angle brackets, into its bytes."""
+    if raw.startswith(b"<"):
+        digits = re.sub(rb"\s", b"", raw[1:-1])
+        return bytes.fromhex((digits + b"0" * (len(digits) % 2)).decode("ascii"))
+    return ESCAPE.sub(lambda match: bytes([int(match.group(1), 8) & 255]) if 48 <= match.group(1)[0] <= 55
+                      else ESCAPES.get(match.group(1), match.group(1)), raw[1:-1])
+
+def decode_text(data: bytes) -> str:
+    """Decode a text string, in UTF-16 or UTF-8 when it starts with their byte order mark, in Latin-1 otherwise."""
+    if data.startswith(b"\xfe\xff"):
+        return data[2:].decode("utf-16-be", "replace")
+    if data.startswith(b"\xef\xbb\xbf"):
+        return data[3:].decode("utf-8", "replace")
+    return data.decode("latin-1")
+
+def undo_png_predictor(data: bytes, columns: int) -> bytes:
+    """Undo the PNG predictors applied to the rows of a stream of one byte per sample, as in cross-reference streams."""
+    output = bytearray()
+    previous = bytearray(columns)
+    for start in range(0, len(data) - columns, columns + 1):
+        kind, row = data[start], bytearray(data[start + 1:start + 1 + columns])
+        for i in range(columns):
+            left = row[i - 1] if i else 0
+            if kind == 1:
+                row[i] = (row[i] + left) & 255
+            elif kind == 2:
+                row[i] = (row[i] + previous[i]) & 255
+            elif kind == 3:
+                row[i] = (row[i] + (left + previous[i]) // 2) & 255
+            elif kind == 4:
+                upper_left = previous[i - 1] if i else 0
+                estimate = left + previous[i] - upper_left
+                distances = (abs(estimate - left), abs(estimate - previous[i]), abs(estimate - upper_left))
+                row[i] = (row[i] + (left, previous[i], upper_left)[distances.index(min(distances))]) & 255
+        output += row
+        previous = row
+    return bytes(output)
+
+def extract_text(content: bytes) -> str:
+    """
+    Extract the text shown by the text objects of a content stream.
+
+    Parameters:
+        content (bytes): The content stream, inflated.
+
+    Returns:
+        str: The literal strings shown by the Tj, ', " and TJ operators, one text operation per line. Within a TJ
+        array, a space is put where the strings are moved apart by more than a fifth of the font size.
+
+    The strings are decoded as Latin-1: the text of fonts with a custom encoding, such as subsetted CID fonts,
+    comes out as noise, which the words of `get_words` mostly leave out.
+    """
+    lines = []
+    for text_object in TEXT_OBJECT.finditer(content):
+        for match in TEXT_SHOWING.finditer(text_object.group(1)):
+            if match.group(1) is not None:
+                lines.append(decode_string(match.group(1)))
+                continue
+            parts = []
+            for item in ARRAY_ITEM.finditer(match.group(2)):
+                if item.group().startswith(b"("):
+                    parts.append(decode_string(item.group()))
+                elif float(item.group()) < -200:
+                    parts.append(b" ")
+            lines.append(b"".join(parts))
+    return b"\n".join(lines).decode("latin-1")
+
+def get_words(text: str) -> list[str]:
+    """List the distinct words of at least three ASCII letters of a text, lowercased, in the order they first appear."""
+    return list(dict.fromkeys(word.lower() for word in WORD.findall(text)))
+
+class PDFReader:
+    """
+    Read objects from a PDF file mapped in memory.
+
+    Parameters:
+        data (mmap.mmap): The file, mapped in memory.
+
+    Raises:
+        ValueError: If the file does not start with a PDF header.
+
+    The cross-reference sections are read when the reader is built. An object listed in none of them is looked
+    up by searching the file for its header.
+    """
+
+    def __init__(self, data: mmap.mmap) -> None:
+        self.data = data
+        self.advise("MADV_RANDOM")
+        if data[:HEADER_SIZE].find(b"%PDF-") < 0:
+            raise ValueError("not a PDF file")
+        self.offsets = {}
+        self.compressed = {}
+        self.object_streams = {}
+        self.trailer = b""
+        try:
+            self.read_cross_references()
+        except (ValueError, IndexError, zlib.error):
+            pass
+        self.encrypted = b"/Encrypt" in self.trailer
+
+    def advise(self, advice: str) -> None:
+        """Tell the operating system how the mapping is about to be read, e.g. "MADV_SEQUENTIAL", when it supports it."""
+        if hasattr(mmap, advice):
+            self.data.madvise(getattr(mmap, advice))
+
+    def read_cross_references(self) -> None:
+        """Read the cross-reference sections, from the last one given after `startxref` back through /Prev."""
+        matches = list(STARTXREF.finditer(self.data, max(0, len(self.data) - TAIL_SIZE)))
+        if not matches:
+            raise ValueError("no startxref")
+        offset = int(matches[-1].group(1))
+        seen = set()
+        while offset is not None and offset not in seen and 0 <= offset < len(self.data):
+            seen.add(offset)
+            if self.data[offset:offset + 4] == b"xref":
+                trailer, offset = self.read_cross_reference_table(offset)
+            else:
+                trailer, offset = self.read_cross_reference_stream(offset)
+            if not self.trailer:
+                self.trailer = trailer
+
+    def read_cross_reference_table(self, offset: int) -> tuple[bytes, int | None]:
+        """Read a classic cross-reference table and its trailer, returning the trailer and the offset of /Prev."""
+        position = offset + 4
+        while (subsection := XREF_SUBSECTION.match(self.data, position)) is not None:
+            first, count = int(subsection.group(1)), int(subsection.group(2))
+            position = subsection.end()
+            for number in range(first, first + count):
+                entry = XREF_ENTRY.match(self.data, position)
+                if entry is None:
+                    raise ValueError(f"damaged cross-reference table at {offset}")
+                position = entry.end()
+                if entry.group(3) == b"n":
+                    self.offsets.setdefault(number, int(entry.group(1)))
+        trailer = TRAILER.match(self.data, position)
+        if trailer is None:
+            raise ValueError(f"no trailer after the cross-reference table at {offset}")
+        dictionary, _ = self.read_dictionary(trailer.end())
+        hybrid = self.get_integer(dictionary, b"XRefStm")
+        if hybrid is not None:
+            self.read_cross_reference_stream(hybrid)
+        return dictionary, self.get_integer(dictionary, b"Prev")
+
+    def read_cross_reference_stream(self, offset: int) -> tuple[bytes, int | None]:
+        """Read a cross-reference stream, returning its dictionary, which stands for the trailer, and the offset of /Prev."""
+        header = OBJECT_HEADER.match(self.data, offset)
+        if header is None:
+            raise ValueError(f"no cross-reference stream at {offset}")
+        dictionary, stream = self.read_value(header.end())
+        widths = re.search(rb"/W\s*\[\s*(\d+)\s+(\d+)\s+(\d+)\s*\]", dictionary)
+        if widths is None or stream is None:
+            raise ValueError(f"no cross-reference stream at {offset}")
+        widths = [int(width) for width in widths.groups()]
+        index = re.search(rb"/Index\s*\[([\d\s]*)\]", dictionary)
+        ranges = [int(value) for value in index.group(1).split()] if index else [0, self.get_integer(dictionary, b"Size") or 0]
+        content = self.read_stream(dictionary, stream, MAX_STREAM_SIZE)
+        position = 0
+        for first, count in zip(ranges[::2], ranges[1::2]):
+            for number in range(first, first + count):
+                fields = []
+                for width in widths:
+                    fields.append(int.from_bytes(content[position:position + width], "big"))
+                    position += width
+                kind = fields[0] if widths[0] else 1
+                if kind == 1:
+                    self.offsets.setdefault(number, fields[1])
+                elif kind == 2:
+                    self.compressed.setdefault(number, (fields[1], fields[2]))
+        return dictionary, self.get_integer(dictionary, b"Prev")
+
+    def read_dictionary(self, position: int) -> tuple[bytes, int]:
+        """Read the dictionary starting at `position`, returning it, with its angle brackets, and the offset after it."""
+        depth = 0
+        string_depth = 0
+        for match in DICTIONARY_TOKEN.finditer(self.data, position, min(len(self.data), position + MAX_DICTIONARY_SIZE)):
+            token = match.group()
+            if token == b"(":
+                string_depth += 1
+            elif token == b")":
+                string_depth = max(string_depth - 1, 0)
+            elif string_depth:
+                continue
+            elif token == b"<<":
+                depth += 1
+            elif token == b">>":
+                depth -= 1
+                if depth == 0:
+                    return bytes(self.data[position:match.end()]), match.end()
+        raise ValueError(f"unterminated dictionary at {position}")
+
+    def read_value(self, position: int) -> tuple[bytes, int | None]:
+        """Read the value of an object starting at `position`, returning it and the offset of its stream data, if any."""
+        if self.data[position:position + 2] == b"<<":
+            dictionary, end = self.read_dictionary(position)
+            stream = STREAM_START.match(self.data, end)
+            return dictionary, stream.end() if stream is not None else None
+        end = self.data.find(b"endobj", position, position + MAX_DICTIONARY_SIZE)
+        if end < 0:
+            raise ValueError(f"unterminated object at {position}")
+        return bytes(self.data[position:end]).strip(), None
+
+    def find_object(self, number: int) -> int:
+        """Search the whole file for the last header of an object, returning the offset of its value."""
+        self.advise("MADV_SEQUENTIAL")
+        last = None
+        for last in re.finditer(rb"(?<!\d)%d\s+\d+\s+obj\b\s*" % number, self.data):
+            pass
+        if last is None:
+            raise ValueError(f"object {number} not found")
+        return last.end()
+
+    def read_object(self, number: int | None) -> tuple[bytes, int | None]:
+        """
+        Read an object.
+
+        Parameters:
+            number (int | None): The number of the object, None when a reference was missing.
+
+        Returns:
+            tuple[bytes, int | None]: The value of the object, and the offset of its stream data when it is a stream.
+
+        Raises:
+            ValueError: If the object cannot be found.
+        """
+        if number is None:
+            raise ValueError("missing reference")
+        if number in self.compressed:
+            return self.read_compressed_object(*self.compressed[number]), None
+        offset = self.offsets.get(number)
+        header = OBJECT_HEADER.match(self.data, offset) if offset is not None else None
+        if header is None or int(header.group(1)) != number:
+            return self.read_value(self.find_object(number))
+        return self.read_value(header.end())
+
+    def read_compressed_object(self, stream_number: int, index: int) -> bytes:
+        """Read the value of the `index`-th object of an object stream."""
+        if stream_number not in self.object_streams:
+            dictionary, stream = self.read_object(stream_number)
+            content = self.read_stream(dictionary, stream, MAX_STREAM_SIZE)
+            first, count = self.get_integer(dictionary, b"First") or 0, self.get_integer(dictionary, b"N") or 0
+            offsets = [first + int(offset) for offset in content[:first].split()[1:2 * count:2]]
+            self.object_streams[stream_number] = (content, offsets)
+        content, offsets = self.object_streams[stream_number]
+        end = offsets[index + 1] if index + 1 < len(offsets) else len(content)
+        return content[offsets[index]:end].strip()
+
+    def read_stream(self, dictionary: bytes, start: int | None, limit: int) -> bytes:
+        """
+        Read the data of a stream, inflated when it is compressed with FlateDecode.
+
+        Parameters:
+            dictionary (bytes): The dictionary of the stream.
+            start (int | None): The offset of the stream data, as returned by `read_object`.
+            limit (int): The largest number of bytes returned. The rest of the stream is not read.
+
+        Returns:
+            bytes: The data of the stream, with the PNG predictors of its /DecodeParms undone.
+
+        Raises:
+            ValueError: If the object has no stream, or its stream is compressed with another filter.
+        """
+        if start is None:
+            raise ValueError("not a stream")
+        try:
+            length = self.get_integer(dictionary, b"Length")
+        except ValueError:
+            length = None
+        if length is None or self.data[start + length:start + length + 32].find(b"endstream") < 0:
+            end = self.data.find(b"endstream", start)
+            length = (end if end >= 0 else len(self.data)) - start
+        filters = get_value(dictionary, b"Filter")
+        names = re.findall(rb"/(\w+)", filters.group()[len(b"/Filter"):]) if filters is not None else []
+        if not names:
+            return bytes(self.data[start:start + min(length, limit)])
+        if names not in ([b"FlateDecode"], [b"Fl"]):
+            raise ValueError(f"unsupported filter {names}")
+
+        decompressor = zlib.decompressobj()
+        output = bytearray()
+        for chunk_start in range(start, start + length, CHUNK_SIZE):
+            output += decompressor.decompress(self.data[chunk_start:min(chunk_start + CHUNK_SIZE, start + length)], limit - len(output))
+            if len(output) >= limit or decompressor.eof:
+                break
+        predictor = re.search(rb"/Predictor\s*(\d+)", dictionary)
+        if predictor is not None and int(predictor.group(1)) >= 10:
+            columns = re.search(rb"/Columns\s*(\d+)", dictionary)
+            return undo_png_predictor(bytes(output), int(columns.group(1)) if columns else 1)
+        return bytes(output)
+
+    def get_integer(self, dictionary: bytes, key: bytes) -> int | None:
+        """Return the integer value of a key of a dictionary, following a reference, or None when it is missing."""
+        match = get_value(dictionary, key)
+        if match is None or match.group(1) is None:
+            return None
+        if match.group(2):
+            return int(self.read_object(int(match.group(1)))[0])
+        return int(match.group(1))
+
+    def get_string(self, dictionary: bytes, key: bytes) -> str:
+        """Return the text string value of a key of a dictionary, following a reference, or "" when it is missing."""
+        match = get_value(dictionary, key)
+        if match is None:
+            return ""
+        raw = match.group(3)
+        if match.group(2):
+            raw = self.read_object(int(match.group(1)))[0]
+        if not raw or raw[:1] not in b"(<":
+            return ""
+        return decode_text(decode_string(raw))
+
+    def get_page_tree(self) -> bytes:
+        """Return the dictionary of the root of the page tree."""
+        catalog, _ = self.read_object(get_reference(self.trailer, b"Root"))
+        return self.read_object(get_reference(catalog, b"Pages"))[0]
+
+    def get_page_count(self) -> int:
+        """Return the number of pages of the document, from the /Count of the page tree or, failing that, by searching the file."""
+        try:
+            count = self.get_integer(self.get_page_tree(), b"Count")
+            if count is not None:
+                return count
+        except (ValueError, IndexError, zlib.error):
+            pass
+        self.advise("MADV_SEQUENTIAL")
+        return sum(1 for _ in PAGE_TYPE.finditer(self.data))
+
+    def get_metadata(self) -> dict[str, str]:
+        """Return the "Title" and "Subject" of the document information dictionary, "" when missing."""
+        info = get_reference(self.trailer, b"Info")
+        if info is None:
+            return {"Title": "", "Subject": ""}
+        dictionary, _ = self.read_object(info)
+        return {"Title": self.get_string(dictionary, b"Title"), "Subject": self.get_string(dictionary, b"Subject")}
+
+    def get_first_page_text(self) -> str:
+        """Return the text of the first page, as extracted by `extract_text` from up to `MAX_TEXT_SIZE` bytes of content."""
+        node = self.get_page_tree()
+        for _ in range(MAX_DEPTH):
+            kid = re.search(rb"/Kids\s*\[\s*(\d+)\s+\d+\s+R", node)
+            if kid is None:
+                break
+            node, _ = self.read_object(int(kid.group(1)))
+        contents = re.search(rb"/Contents\s*(\[[^\]]*\]|\d+\s+\d+\s+R)", node)
+        if contents is None:
+            return ""
+        parts = []
+        budget = MAX_TEXT_SIZE
+        for number in re.findall(rb"(\d+)\s+\d+\s+R", contents.group(1)):
+            dictionary, stream = self.read_object(int(number))
+            parts.append(self.read_stream(dictionary, stream, budget))
+            budget -= len(parts[-1])
+            if budget <= 0:
+                break
+        return extract_text(b"\n".join(parts))
+
+def scan_pdf(file_path: str, read_text: bool = False) -> dict:
+    """
+    Read the page count and, optionally, the metadata and the words of the first page of a PDF file.
+
+    Parameters:
+        file_path (str): The path to the PDF file.
+        read_text (bool): Whether to read the title and subject metadata and the words of the first page.
+
+    Returns:
+        dict: The number of "Pages", 0 when the file cannot be read, and when `read_text` is set, the "Title"
+        and "Subject" of the metadata and the "Words" of the title, the subject and the first page, as listed by
+        `get_words`, up to `MAX_WORDS` of them.
+
+    The file is mapped in memory rather than read, see the module documentation. No error is raised for a
+    damaged or unsupported file: what could be read is returned.
+    """
+    result = {"Pages": 0}
+    if read_text:
+        result.update({"Title": "", "Subject": "", "Words": []})
+    try:
+        with open(file_path, "rb") as inputFile, mmap.mmap(inputFile.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            reader = PDFReader(data)
+            result["Pages"] = reader.get_page_count()
+            if read_text and not reader.encrypted:
+                texts = []
+                try:
+                    result.update(reader.get_metadata())
+                    texts += [result["Title"], result["Subject"]]
+                    texts.append(reader.get_first_page_text())
+                except (ValueError, IndexError, zlib.error):
+                    pass
+                result["Words"] = get_words("\n".join(texts))[:MAX_WORDS]
+    except (OSError, ValueError, IndexError, zlib.error, RecursionError):
+        pass
+    return result
+
+def get_keywords(content: dict, banned_words: set[str]) -> list[str]:
+    """
+    Pick the tags a PDF file adds to those of its title.
+
+    Parameters:
+        content (dict): The scan of the file, as returned by `scan_files`.
+        banned_words (set[str]): A set of words to be excluded from the tags.
+
+    Returns:
+        list[str]: The first `MAX_KEYWORDS` words of the metadata and the first page that are not banned, empty
+        when the text of the file was not read.
+    """
+    return [word for word in content.get("Words", ()) if word not in banned_words][:MAX_KEYWORDS]
+
+def load_cache(cache_file: str) -> dict:
+    """Load the scans saved by `scan_files`, or an empty cache when there is none or it cannot be read."""
+    try:
+        with open(cache_file, "rb") as inputFile:
+            cache = pickle.load(inputFile)
+        return cache if isinstance(cache, dict) else {}
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        return {}
+
+@Profiler.timed("PDF scan")
+def scan_files(folderPath: str, file_stats: list[tuple[str, os.stat_result]], cache_file: str, read_text: bool = False,
+               processes: int = None, folder_files: Iterable[str] = None) -> dict[str, dict]:
+    """
+    Scan PDF files of a folder with `scan_pdf`, reusing the scans of the unchanged ones.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        file_stats (list[tuple[str, os.stat_result]]): The files to scan, as listed by `DataProcess.scan_pdf_files`.
+        cache_file (str): The path to the binary cache of the scans.
+        read_text (bool): Whether to read the metadata and the words of the first page as well as the page count.
+        processes (int, optional): The number of worker processes. Defaults to the number of processors. With 1,
+            or fewer than `PARALLEL_THRESHOLD` files to read, the files are read in this process.
+        folder_files (Iterable[str], optional): The names of every PDF file of the folder, whose cached scans are
+            kept even when they are not in `file_stats`. Defaults to the files of `file_stats`.
+
+    Returns:
+        dict[str, dict]: The scan of each file of `file_stats`, keyed by file name. Without `read_text`, each scan
+        only holds the number of "Pages", even when the cache also holds the text of the file.
+
+    A cached scan is reused when the size and the modification time of its file did not change, and when it
+    holds the text of the file if `read_text` is set. The other files are spread over a process pool, since
+    inflating and searching their streams is CPU-bound, and the cache is saved when a file was scanned or
+    removed.
+    """
+    cache = load_cache(cache_file)
+    results = {}
+    missing = []
+    for filename, file_stat in file_stats:
+        entry = cache.get(filename)
+        if (entry is not None and entry["Size"] == file_stat.st_size and entry["Mtime"] == file_stat.st_mtime_ns
+                and (entry["Text"] or not read_text)):
+            results[filename] = entry
+        else:
+            missing.append((filename, file_stat))
+    Profiler.count(items=len(missing))
+
+    if missing:
+        file_paths = [os.path.join(folderPath, filename + ".pdf") for filename, _ in missing]
+        workers = processes or os.cpu_count() or 1
+        if workers == 1 or len(missing) < PARALLEL_THRESHOLD:
+            scans = [scan_pdf(file_path, read_text) for file_path in file_paths]
+        else:
+            with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+                scans = list(executor.map(scan_pdf, file_paths, [read_text] * len(file_paths),
+                                          chunksize=max(1, len(file_paths) // (4 * workers))))
+        for (filename, file_stat), scan in zip(missing, scans):
+            results[filename] = scan | {"Size": file_stat.st_size, "Mtime": file_stat.st_mtime_ns, "Text": read_text}
+
+    kept = set(results) if folder_files is None else set(folder_files)
+    if missing or not kept.issuperset(cache):
+        cache = {filename: entry for filename, entry in cache.items() if filename in kept} | results
+        Output.write_document(pickle.dumps(cache, protocol=pickle.HIGHEST_PROTOCOL), cache_file)
+    if read_text:
+        return results
+    return {filename: {"Pages": entry["Pages"]} for filename, entry in results.items()}
@@ -0,0 +1,170 @@
+"""
+Per-stage instrumentation of the commands, turned on by the `--profile` flag of `main.py`.
+
+A stage is a step of a command, such as listing the BOOKS folder, stat-ing the files, tokenizing the titles or
+writing the Obsidian notes. For each stage, the number of calls, the wall time, the number of items processed
+and the bytes read and written are added up. A function is made a stage with the `timed` decorator, and a part
+of a function with the `stage` context manager. Stages nest: a stage is recorded under the path of the stages
+open around it, so the writes of the tag catalog and those of the PDF index are told apart, the items and
+bytes counted by `count` go to the innermost stage, and the time of a stage includes the time of the stages it
+opens.
+
+When profiling is off, `stage` returns a shared object doing nothing and `timed` and `count` return after
+testing a flag, so the instrumentation of a stage costs a function call, however many items it processes.
+"""
+import os
+import time
+from functools import wraps
+
+enabled = False
+tracing = False
+stages = {}
+events = []
+open_stages = []
+started = time.perf_counter()
+
+class Stage:
+    """
+    A stage being timed, as returned by `stage` while profiling is on.
+
+    Parameters:
+        name (str): The name of the stage.
+    """
+
+    __slots__ = ("name", "key", "start", "items", "bytes_read", "bytes_written")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def __enter__(self) -> "Stage":
+        self.key = (open_stages[-1].key if open_stages else ()) + (self.name,)
+        if self.key not in stages:
+            stages[self.key] = {"Calls": 0, "Seconds": 0.0, "Items": 0, "Bytes Read": 0, "Bytes Written": 0}
+        open_stages.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        end = time.perf_counter()
+        open_stages.pop()
+        totals = stages[self.key]
+        totals["Calls"] += 1
+        totals["Seconds"] += end - self.start
+        totals["Items"] += self.items
+        totals["Bytes Read"] += self.bytes_read
+        totals["Bytes Written"] += self.bytes_written
+        if tracing:
+            events.append({"name": self.name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                           "ts": round(self.start * 1e6), "dur": round((end - self.start) * 1e6),
+                           "args": {"Items": self.items, "Bytes Read": self.bytes_read, "Bytes Written": self.bytes_written}})
+        return False
+
+class NullStage:
+    """The stage returned by `stage` while profiling is off: it records nothing."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+NULL_STAGE = NullStage()
+
+def enable(trace: bool = False) -> None:
+    """
+    Turn profiling on.
+
+    Parameters:
+        trace (bool): Whether to also keep one event per stage call, for `write_trace`.
+
+    Returns:
+        None
+    """
+    global enabled, tracing
+    enabled = True
+    tracing = trace
+    reset()
+
+def reset() -> None:
+    """Forget the stages recorded so far, e.g. between two commands, but keep the events of the trace."""
+    global started
+    stages.clear()
+    started = time.perf_counter()
+
+def stage(name: str) -> Stage | NullStage:
+    """
+    Time a part of a function as a stage, in a `with` statement.
+
+    Parameters:
+        name (str): The name of the stage.
+
+    Returns:
+        Stage | NullStage: The context manager of the stage.
+    """
+    return Stage(name) if enabled else NULL_STAGE
+
+def timed(name: str):
+    """Decorate a function so that each call to it is timed as a stage."""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            with Stage(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def count(items: int = 0, bytes_read: int = 0, bytes_written: int = 0) -> None:
+    """Add items processed and bytes read or written to the innermost stage being timed."""
+    if enabled and open_stages:
+        current = open_stages[-1]
+        current.items += items
+        current.bytes_read += bytes_read
+        current.bytes_written += bytes_written
+
+def get_summary() -> list[str]:
+    """
+    Render the stages recorded since the last `reset` as a table.
+
+    Returns:
+        list[str]: The lines of the table, each stage under the stage it was called from, followed by the total
+        wall time.
+    """
+    children = {}
+    for key in stages:
+        children.setdefault(key[:-1], []).append(key)
+    ordered = []
+    pending = list(reversed(children.get((), [])))
+    while pending:
+        key = pending.pop()
+        ordered.append(key)
+        pending.extend(reversed(children.get(key, [])))
+
+    lines = [f"{'Stage':<28}{'Calls':>7}{'Items':>9}{'Read (KB)':>11}{'Written (KB)':>14}{'Seconds':>10}"]
+    for key in ordered:
+        totals = stages[key]
+        label = "  " * (len(key) - 1) + key[-1]
+        lines.append(f"{label:<28}{totals['Calls']:>7}{totals['Items']:>9}{totals['Bytes Read'] / 1024:>11.1f}"
+                     f"{totals['Bytes Written'] / 1024:>14.1f}{totals['Seconds']:>10.3f}")
+    lines.append(f"{'Total':<28}{'':>41}{time.perf_counter() - started:>10.3f}")
+    return lines
+
+def write_trace(trace_file: str) -> None:
+    """
+    Write the events recorded while tracing in the Trace Event Format, as read by chrome://tracing or Perfetto.
+
+    Parameters:
+        trace_file (str): The path to the JSON trace file.
+
+    Returns:
+        None
+    """
+    import json
+    with open(trace_file, "w", encoding="utf-8") as outputFile:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, outputFile)
@@ -0,0 +1,73 @@
+import sys
+from collections.abc import Iterable
+from datetime import datetime
+
+TIME_FORMAT = '%a, %b %d, %Y, %H:%M:%S'
+
+class BookRecord:
+    """
+    The record of a book, shared by every exporter.
+
+    Parameters:
+        title (str): The title of the book, i.e. the PDF file name without the ".pdf" suffix.
+        tags (Iterable[str]): The tags of the book, sorted.
+        file_size (int): The size of the PDF file in kilobytes.
+        updated_time (int): The modification time of the PDF file in seconds since EPOCH.
+        pages (int): The number of pages of the PDF file, 0 when unknown, see `PDFScan`.
+
+    A record only holds these five slots, with no per-instance dictionary, so a library of hundreds of
+    thousands of books costs a few small objects per book. The tags are interned with `sys.intern`: every book
+    carrying a tag points to the same string, which acts as the id of the tag, and two tags are compared by
+    identity before their characters are. The modification time stays an integer until it is displayed with
+    `get_updated_time_text`, so sorting or storing the records never parses or formats a date.
+    """
+
+    __slots__ = ("title", "tags", "file_size", "updated_time", "pages")
+
+    def __init__(self, title: str, tags: Iterable[str], file_size: int = 0, updated_time: int = 0, pages: int = 0) -> None:
+        self.title = title
+        self.tags = tuple(map(sys.intern, tags))
+        self.file_size = file_size
+        self.updated_time = updated_time
+        self.pages = pages
+
+    def __repr__(self) -> str:
+        return f"BookRecord({self.title!r}, {self.tags!r}, {self.file_size!r}, {self.updated_time!r}, {self.pages!r})"
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, BookRecord):
+            return NotImplemented
+        return self.to_list() == other.to_list()
+
+    def __reduce__(self) -> tuple:
+        # Rebuilt through __init__, so the tags of the records sent back by a worker process are interned again.
+        return (BookRecord, (self.title, self.tags, self.file_size, self.updated_time, self.pages))
+
+    @property
+    def title_length_char(self) -> int:
+        return len(self.title)
+
+    @property
+    def title_length_word(self) -> int:
+        return len(self.title.strip().split())
+
+    @property
+    def tag_number(self) -> int:
+        return len(self.tags)
+
+    def get_updated_time_text(self) -> str:
+        """Format the modification time as '%a, %b %d, %Y, %H:%M:%S', as it is written to the catalog outputs."""
+        return datetime.fromtimestamp(self.updated_time).strftime(TIME_FORMAT)
+
+    def to_list(self) -> list:
+        """List the fields of the record, in the order of the parameters, e.g. to write it as JSON."""
+        return [self.title, list(self.tags), self.file_size, self.updated_time, self.pages]
+
+    @classmethod
+    def from_list(cls, fields: list) -> "BookRecord":
+        """Build a record from the fields listed by `to_list`."""
+        return cls(*fields)
+
+def parse_updated_time(text: str) -> int:
+    """Parse a modification time formatted by `BookRecord.get_updated_time_text` back into seconds since EPOCH."""
+    return int(datetime.strptime(text, TIME_FORMAT).timestamp())
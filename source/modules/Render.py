@@ -0,0 +1,132 @@
+from collections.abc import Iterable, Iterator
+from modules.Lazy import lazy_import
+from modules.Record import BookRecord
+
+TagAnalytics = lazy_import("modules.TagAnalytics")
+
+CHUNK_SIZE = 1 << 16
+
+def get_tag_fragment(tags: Iterable[str]) -> str:
+    """
+    Render the tags of a book as they appear in the PDF index, the PDF info CSV and the PDF tokens.
+
+    Parameters:
+        tags (Iterable[str]): The tags of the book, without the leading "#".
+
+    Returns:
+        str: The tags prefixed with "#" and separated by single spaces, with no trailing space.
+    """
+    return " ".join(f"#{tag}" for tag in tags)
+
+def render_tag_catalog(tag_set_display: dict[str, list[str]], tag_count: int) -> Iterator[str]:
+    """
+    Render the tag catalog, one fragment per section.
+
+    Parameters:
+        tag_set_display (dict[str, list[str]]): The tags grouped by first character, as returned by
+            `DataProcess.break_tag_set_to_list`.
+        tag_count (int): The total number of tags.
+
+    Returns:
+        Iterator[str]: The fragments of the document, to be joined or streamed with `iter_chunks`.
+    """
+    yield f"\n# Tags (Total: {tag_count})\n"
+    for char, tags in tag_set_display.items():
+        body = "".join(f"#{tag} " for tag in tags) if tags else "There is no tag in this category."
+        yield f"\n## {char.upper()} ({len(tags)})\n\n{body}\n"
+
+def render_pdf_index(records: list[BookRecord]) -> Iterator[str]:
+    """
+    Render the PDF index, one fragment per book.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        Iterator[str]: The fragments of the document, to be joined or streamed with `iter_chunks`.
+    """
+    yield f"\n# PDF index (Total: {len(records)})\n\n"
+    for index, record in enumerate(records, start=1):
+        filename = record.title
+        yield f"{index}. [[BOOKS/{filename}.pdf|{filename}]]\n\nKeywords: {get_tag_fragment(record.tags)}\n\n"
+
+def render_tag_stat(analytics: dict, limit: int = 50, related_limit: int = 5) -> Iterator[str]:
+    """
+    Render the tag statistics, one fragment per tag.
+
+    Parameters:
+        analytics (dict): The analytics returned by `TagAnalytics.build_tag_analytics`.
+        limit (int): The number of tags listed, the most frequent first.
+        related_limit (int): The number of related tags listed for each tag.
+
+    Returns:
+        Iterator[str]: The fragments of the document, to be joined or streamed with `iter_chunks`.
+    """
+    yield f"\n# Tag Stat (Total: {len(analytics['Tags'])} tags over {len(analytics['Titles'])} books)\n\n"
+    yield "| Tag | Books | IDF | Related Tags |\n| --- | --- | --- | --- |\n"
+    for tag_id, frequency in TagAnalytics.get_top_tag_ids(analytics, limit):
+        related = get_tag_fragment(tag for tag, _, _ in TagAnalytics.get_related_tags_by_id(analytics, tag_id, related_limit))
+        yield f"| #{analytics['Tags'][tag_id]} | {frequency} | {analytics['IDF'][tag_id]:.3f} | {related} |\n"
+
+def render_duplicates(report: dict[str, list]) -> Iterator[str]:
+    """
+    Render the duplicate report, one fragment per group of identical files or pair of similar titles.
+
+    Parameters:
+        report (dict[str, list]): The report returned by `Duplicates.find_duplicates`.
+
+    Returns:
+        Iterator[str]: The fragments of the document, to be joined or streamed with `iter_chunks`.
+    """
+    yield f"\n# Duplicates\n\n## Identical Files ({len(report['Identical'])})\n\n"
+    if not report["Identical"]:
+        yield "There is no identical file.\n"
+    for index, (size, titles) in enumerate(report["Identical"], start=1):
+        yield f"{index}. " + ", ".join(f"[[BOOKS/{title}.pdf|{title}]]" for title in titles) + f" ({-(-size // 1024)} Kb)\n"
+    yield f"\n## Similar Titles ({len(report['Similar'])})\n\n"
+    if not report["Similar"]:
+        yield "There is no similar title.\n"
+    for first, second, similarity in report["Similar"]:
+        yield f"- {similarity}: [[BOOKS/{first}.pdf|{first}]] and [[BOOKS/{second}.pdf|{second}]]\n"
+
+def render_csv(header: tuple[str, ...], rows: Iterable[tuple[str, ...]], separator: str = ";") -> Iterator[str]:
+    """
+    Render a table as CSV, one fragment per row.
+
+    Parameters:
+        header (tuple[str, ...]): The names of the columns.
+        rows (Iterable[tuple[str, ...]]): The rows, every field already formatted as a string.
+        separator (str): The field separator.
+
+    Returns:
+        Iterator[str]: The lines of the document, each ending with a newline.
+    """
+    yield separator.join(header) + "\n"
+    for row in rows:
+        yield separator.join(row) + "\n"
+
+def iter_chunks(fragments: Iterable[str], chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """
+    Group the fragments of a document into chunks of about `chunk_size` characters.
+
+    Parameters:
+        fragments (Iterable[str]): The fragments, such as those yielded by the `render_*` functions.
+        chunk_size (int): The number of characters after which a chunk is yielded.
+
+    Returns:
+        Iterator[str]: The chunks, each the join of consecutive fragments.
+
+    A document shorter than `chunk_size` comes out as a single chunk, so it costs a single write. A longer one
+    is never held in memory as a whole, only one chunk at a time.
+    """
+    buffer = []
+    buffered = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffered += len(fragment)
+        if buffered >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        yield "".join(buffer)
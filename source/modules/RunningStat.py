@@ -0,0 +1,301 @@
+import json
+import os
+from bisect import bisect_right
+from math import floor, log, sqrt
+from modules.Lazy import lazy_import
+from modules.Record import BookRecord
+
+Output = lazy_import("modules.Output")
+
+GAMMA = 1.02
+PROPERTY_NAMES = ("Title Length (char)", "Title Length (word)", "Tag Number", "Pages", "File Size (Kb)")
+
+class RunningStat:
+    """
+    Online statistics of a property of non-negative integers, kept up to date one value at a time.
+
+    The count, the exact total, the minimum and maximum, the sum of reciprocals of the positive values and the
+    Welford mean and sum of squared deviations are updated in constant time when a value is added or removed.
+    The median, the mode, the percentiles and the histogram are read from a sketch counting each distinct
+    value. Once the sketch holds more than `capacity` distinct values, it switches to logarithmic buckets that
+    are at most 2% wide, so its size stays bounded whatever the number of values and these characteristics
+    become approximate.
+
+    Two accumulators, for example built from separate shards of the library, are combined with `merge`. The mode
+    is the smallest of the most frequent values.
+    """
+
+    def __init__(self, capacity: int = 2048) -> None:
+        self.capacity = capacity
+        self.count = 0
+        self.total = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.positive_count = 0
+        self.reciprocal_total = 0.0
+        self.bucketed = False
+        self.sketch = {}
+
+    def get_key(self, value: int) -> int:
+        """Return the key of the sketch counting `value`."""
+        if not self.bucketed:
+            return value
+        return 0 if value <= 0 else floor(log(value) / log(GAMMA)) + 1
+
+    def get_value(self, key: int) -> int:
+        """Return the value standing for a key of the sketch, the middle of its bucket once bucketed."""
+        if not self.bucketed or key == 0:
+            return key
+        return round(GAMMA ** (key - 1) * (1 + GAMMA) / 2)
+
+    def switch_to_buckets(self) -> None:
+        """Replace the exact counts of the sketch by counts per logarithmic bucket."""
+        if self.bucketed:
+            return
+        exact_sketch = self.sketch
+        self.bucketed = True
+        self.sketch = {}
+        for value, count in exact_sketch.items():
+            key = self.get_key(value)
+            self.sketch[key] = self.sketch.get(key, 0) + count
+
+    def add(self, value: int) -> None:
+        """Add a value to the statistics."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        self.minimum = value if self.minimum is None else min(self.minimum, value)
+        self.maximum = value if self.maximum is None else max(self.maximum, value)
+        if value > 0:
+            self.positive_count += 1
+            self.reciprocal_total += 1 / value
+        key = self.get_key(value)
+        self.sketch[key] = self.sketch.get(key, 0) + 1
+        if len(self.sketch) > self.capacity:
+            self.switch_to_buckets()
+
+    def remove(self, value: int) -> None:
+        """Remove a value that was added before from the statistics."""
+        if self.count <= 1:
+            self.__init__(self.capacity)
+            return
+        old_mean = (self.count * self.mean - value) / (self.count - 1)
+        self.m2 = max(self.m2 - (value - old_mean) * (value - self.mean), 0.0)
+        self.mean = old_mean
+        self.count -= 1
+        self.total -= value
+        if value > 0:
+            self.positive_count -= 1
+            self.reciprocal_total -= 1 / value
+        key = self.get_key(value)
+        self.sketch[key] -= 1
+        if self.sketch[key] == 0:
+            del self.sketch[key]
+            if value == self.minimum:
+                self.minimum = self.get_value(min(self.sketch))
+            if value == self.maximum:
+                self.maximum = self.get_value(max(self.sketch))
+
+    def merge(self, other: "RunningStat") -> None:
+        """Add every value counted by another accumulator to this one."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.minimum = other.minimum if self.minimum is None else min(self.minimum, other.minimum)
+        self.maximum = other.maximum if self.maximum is None else max(self.maximum, other.maximum)
+        self.positive_count += other.positive_count
+        self.reciprocal_total += other.reciprocal_total
+        if other.bucketed:
+            self.switch_to_buckets()
+        for key, key_count in other.sketch.items():
+            if self.bucketed and not other.bucketed:
+                key = self.get_key(key)
+            self.sketch[key] = self.sketch.get(key, 0) + key_count
+        if len(self.sketch) > self.capacity:
+            self.switch_to_buckets()
+
+    def get_value_at_rank(self, rank: int) -> int:
+        """Return the value at a given rank, counted from 0, of the values in ascending order."""
+        seen = 0
+        for key in sorted(self.sketch):
+            seen += self.sketch[key]
+            if seen > rank:
+                return self.get_value(key)
+        return self.maximum
+
+    def get_percentile(self, percent: float) -> float:
+        """Return a percentile, interpolating linearly between the two closest ranks, rounded to 3 decimal places."""
+        position = (self.count - 1) * percent / 100
+        lower = self.get_value_at_rank(floor(position))
+        upper = self.get_value_at_rank(min(floor(position) + 1, self.count - 1))
+        return round(lower + (upper - lower) * (position - floor(position)), 3)
+
+    def describe(self, name: str) -> dict[str, int]:
+        """
+        Summarize the statistics with the same characteristics as `DataProcess.analyze_column`.
+
+        Parameters:
+            name (str): The name of the property.
+
+        Returns:
+            dict[str, int]: The characteristics of the property, every one 0 when no value was added.
+        """
+        if self.count == 0:
+            keys = ["Minimum", "Maximum", "Total", "Avarage", "Harmonic Mean", "Median", "25th Percentile",
+                    "75th Percentile", "90th Percentile", "Mode", "Population Standard Deviation",
+                    "Standard Deviation", "Population Variance", "Variance"]
+            return {"Property": name} | dict.fromkeys(keys, 0)
+        middle = self.count // 2
+        if self.count % 2:
+            median = self.get_value_at_rank(middle)
+        else:
+            median = (self.get_value_at_rank(middle - 1) + self.get_value_at_rank(middle)) / 2
+        pvariance = self.m2 / self.count
+        variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        mode_key = max(sorted(self.sketch), key=self.sketch.__getitem__)
+
+        return {"Property": name,
+                "Minimum": self.minimum,
+                "Maximum": self.maximum,
+                "Total": self.total,
+                "Avarage": round(self.mean, 3),
+                "Harmonic Mean": round(self.positive_count / self.reciprocal_total, 3) if self.positive_count else 0,
+                "Median": median,
+                "25th Percentile": self.get_percentile(25),
+                "75th Percentile": self.get_percentile(75),
+                "90th Percentile": self.get_percentile(90),
+                "Mode": self.get_value(mode_key),
+                "Population Standard Deviation": round(sqrt(pvariance), 3),
+                "Standard Deviation": round(sqrt(variance), 3),
+                "Population Variance": round(pvariance, 3),
+                "Variance": round(variance, 3)}
+
+    def get_histogram(self, bins: int = 10) -> list[tuple[int, int, int]]:
+        """Count the values per equal-width range, in the format of `DataProcess.get_histogram`."""
+        if self.count == 0:
+            return []
+        span = self.maximum - self.minimum + 1
+        edges = sorted({self.minimum + span * i // bins for i in range(bins + 1)})
+        counts = [0] * (len(edges) - 1)
+        for key, key_count in self.sketch.items():
+            value = min(max(self.get_value(key), self.minimum), self.maximum)
+            counts[min(bisect_right(edges, value), len(counts)) - 1] += key_count
+        return [(edges[i], edges[i + 1] - 1, counts[i]) for i in range(len(counts))]
+
+    def to_dict(self) -> dict:
+        """Return the state of the accumulator as a JSON-serializable dictionary."""
+        return {"Capacity": self.capacity, "Count": self.count, "Total": self.total, "Mean": self.mean,
+                "M2": self.m2, "Minimum": self.minimum, "Maximum": self.maximum,
+                "Positive Count": self.positive_count, "Reciprocal Total": self.reciprocal_total,
+                "Bucketed": self.bucketed, "Sketch": sorted(self.sketch.items())}
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "RunningStat":
+        """Rebuild an accumulator from the dictionary returned by `to_dict`."""
+        running_stat = cls(state["Capacity"])
+        running_stat.count = state["Count"]
+        running_stat.total = state["Total"]
+        running_stat.mean = state["Mean"]
+        running_stat.m2 = state["M2"]
+        running_stat.minimum = state["Minimum"]
+        running_stat.maximum = state["Maximum"]
+        running_stat.positive_count = state["Positive Count"]
+        running_stat.reciprocal_total = state["Reciprocal Total"]
+        running_stat.bucketed = state["Bucketed"]
+        running_stat.sketch = {key: count for key, count in state["Sketch"]}
+        return running_stat
+
+def get_record_properties(record: BookRecord) -> dict[str, int]:
+    """
+    Read the numeric properties of a book record.
+
+    Parameters:
+        record (BookRecord): A book record returned by `DataProcess.get_book_records`.
+
+    Returns:
+        dict[str, int]: The "Title Length (char)", "Title Length (word)", "Tag Number", "Pages" and "File Size (Kb)"
+        of the book, in the order of `PROPERTY_NAMES`.
+    """
+    return {"Title Length (char)": record.title_length_char,
+            "Title Length (word)": record.title_length_word,
+            "Tag Number": record.tag_number,
+            "Pages": record.pages,
+            "File Size (Kb)": record.file_size}
+
+def build_property_stats(records: list[BookRecord]) -> dict[str, RunningStat]:
+    """
+    Build one accumulator per numeric property from a list of book records.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        dict[str, RunningStat]: The accumulators, keyed by property name as in `get_record_properties`.
+    """
+    property_stats = {name: RunningStat() for name in PROPERTY_NAMES}
+    for record in records:
+        add_record(property_stats, record)
+    return property_stats
+
+def add_record(property_stats: dict[str, RunningStat], record: BookRecord) -> None:
+    """Add the properties of a book record to the accumulators."""
+    for name, value in get_record_properties(record).items():
+        property_stats[name].add(value)
+
+def remove_record(property_stats: dict[str, RunningStat], record: BookRecord) -> None:
+    """Remove the properties of a book record, added before, from the accumulators."""
+    for name, value in get_record_properties(record).items():
+        property_stats[name].remove(value)
+
+def merge_property_stats(property_stats_list: list[dict[str, RunningStat]]) -> dict[str, RunningStat]:
+    """
+    Combine the accumulators of several shards into new accumulators covering all of them.
+
+    Parameters:
+        property_stats_list (list[dict[str, RunningStat]]): The accumulators of each shard.
+
+    Returns:
+        dict[str, RunningStat]: The combined accumulators.
+    """
+    merged = build_property_stats([])
+    for property_stats in property_stats_list:
+        for name, running_stat in property_stats.items():
+            merged[name].merge(running_stat)
+    return merged
+
+def load_property_stats(stat_file: str) -> dict[str, RunningStat] | None:
+    """
+    Load the accumulators saved by `save_property_stats`.
+
+    Parameters:
+        stat_file (str): The path to the JSON file of the accumulators.
+
+    Returns:
+        dict[str, RunningStat] | None: The accumulators, or None when the file does not exist.
+    """
+    if not os.path.exists(stat_file):
+        return None
+    with open(stat_file, "r") as inputFile:
+        return {name: RunningStat.from_dict(state) for name, state in json.load(inputFile).items()}
+
+def save_property_stats(stat_file: str, property_stats: dict[str, RunningStat]) -> None:
+    """
+    Save the accumulators to a JSON file.
+
+    Parameters:
+        stat_file (str): The path to the JSON file of the accumulators.
+        property_stats (dict[str, RunningStat]): The accumulators.
+
+    Returns:
+        None
+    """
+    Output.write_document(json.dumps({name: running_stat.to_dict() for name, running_stat in property_stats.items()}), stat_file)
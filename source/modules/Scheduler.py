@@ -0,0 +1,95 @@
+import random
+from datetime import datetime
+from modules.Record import BookRecord
+
+def get_task_index(tasks: list[dict]) -> dict[str, dict]:
+    """
+    Index the reading-task history by title.
+
+    Parameters:
+        tasks (list[dict]): The tasks returned by `DataProcess.read_task_history`, in the order of the file.
+
+    Returns:
+        dict[str, dict]: For each title ever given, the "Last Given" date, the number of "Times Given" and
+        "Times Done", and whether the last task given for it is still "Pending".
+    """
+    task_index = {}
+    for task in tasks:
+        entry = task_index.setdefault(task["Title"], {"Last Given": task["Date"], "Times Given": 0, "Times Done": 0, "Pending": False})
+        entry["Last Given"] = max(entry["Last Given"], task["Date"])
+        entry["Times Given"] += 1
+        entry["Times Done"] += task["Done"]
+        entry["Pending"] = not task["Done"]
+    return task_index
+
+def get_book_weight(entry: dict | None, today: datetime, cooldown_days: int, stale_days: int, unread_weight: float) -> float:
+    """
+    Weigh a book for the next reading task.
+
+    Parameters:
+        entry (dict | None): The entry of the book in the index returned by `get_task_index`, None when the book
+            was never given.
+        today (datetime): The current date.
+        cooldown_days (int): The number of days during which a book that was given is not given again.
+        stale_days (int): The number of days after which a book that was given weighs as much as one that was
+            read long ago. A book whose last task is still pending is not given again before that.
+        unread_weight (float): The weight of a book that was never given.
+
+    Returns:
+        float: The weight, 0 during the cooldown, growing linearly from there up to 1 at `stale_days` and divided
+        by one plus the number of times the book was read, or `unread_weight` for a book that was never given.
+    """
+    if entry is None:
+        return unread_weight
+    days = (today - entry["Last Given"]).days
+    if days < (stale_days if entry["Pending"] else cooldown_days):
+        return 0.0
+    return min(1.0, (days - cooldown_days + 1) / max(stale_days - cooldown_days, 1)) / (1 + entry["Times Done"])
+
+def pick_books(records: list[BookRecord], task_index: dict[str, dict], count: int, today: datetime = None, rng: random.Random = None,
+               cooldown_days: int = 7, stale_days: int = 60, unread_weight: float = 3.0, diversity: float = 0.5) -> list[str]:
+    """
+    Pick the books of the next reading tasks, by weighted sampling without replacement.
+
+    Parameters:
+        records (list[BookRecord]): The book records of the library, as returned by `DataProcess.get_book_records`.
+        task_index (dict[str, dict]): The task history, as returned by `get_task_index`.
+        count (int): The number of books to pick.
+        today (datetime, optional): The current date. Defaults to now.
+        rng (random.Random, optional): The random number generator. Defaults to the one of the `random` module.
+        cooldown_days, stale_days, unread_weight: See `get_book_weight`.
+        diversity (float): The factor applied to the weight of a book for each tag it shares with a book already
+            picked. 1 disables the tag diversity.
+
+    Returns:
+        list[str]: The titles of the picked books, at most `count` and fewer only when the library is smaller.
+
+    Each book is weighed by `get_book_weight`, so unread books come first, books read long ago before books read
+    recently and books read few times before books read many times, while the books of the tasks still pending
+    are left out. The books are then drawn one at a time, in proportion to their weights, and after each draw
+    the books sharing tags with the drawn one are weighed down, so one day does not get three books on the same
+    subject. When the cooldown leaves fewer than `count` books to draw from, the remaining ones are drawn among
+    the books given the longest ago.
+    """
+    today = today or datetime.now()
+    rng = rng or random
+    weights = [get_book_weight(task_index.get(record.title), today, cooldown_days, stale_days, unread_weight) for record in records]
+    books_by_tag = {}
+    for book_id, record in enumerate(records):
+        for tag in record.tags:
+            books_by_tag.setdefault(tag, []).append(book_id)
+
+    picked = []
+    remaining = set(range(len(records)))
+    while len(picked) < count and remaining:
+        candidates = [book_id for book_id in remaining if weights[book_id] > 0]
+        if candidates:
+            book_id = rng.choices(candidates, [weights[book_id] for book_id in candidates])[0]
+        else:
+            book_id = min(remaining, key=lambda book_id: (task_index.get(records[book_id].title, {}).get("Last Given", datetime.min), book_id))
+        picked.append(records[book_id].title)
+        remaining.discard(book_id)
+        for tag in records[book_id].tags:
+            for other_id in books_by_tag[tag]:
+                weights[other_id] *= diversity
+    return picked
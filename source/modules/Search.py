@@ -0,0 +1,299 @@
+import os
+import pickle
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from modules.Lazy import lazy_import
+from modules.Record import BookRecord
+
+DataProcess = lazy_import("modules.DataProcess")
+Output = lazy_import("modules.Output")
+
+_loaded_index = {}
+
+def normalize_term(term: str) -> str:
+    """
+    Normalize a tag or a query term so that both are compared on the same form.
+
+    Parameters:
+        term (str): The tag or query term.
+
+    Returns:
+        str: The term normalized by the rules of `DataProcess.tokenizer`, such as "C++" becoming "C_pp", in lower
+        case.
+    """
+    return DataProcess.tokenizer.normalize(term).lower()
+
+def get_character_trigrams(word: str) -> set[str]:
+    """
+    Split a word into its character trigrams, padded with a space on both ends.
+
+    Parameters:
+        word (str): The word, in lower case.
+
+    Returns:
+        set[str]: The trigrams of the word. "java" gives " ja", "jav", "ava" and "va ".
+    """
+    padded = " " + word + " "
+    return {padded[i:i+3] for i in range(len(padded) - 2)}
+
+def build_index(records: list[BookRecord]) -> dict:
+    """
+    Build an inverted index from the tags of the book records.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        dict: The index, with the list of "Titles" and the "Postings" mapping each normalized tag to the sorted
+        ids of the titles carrying it. The postings are ordered by tag so prefixes can be looked up by bisection.
+        For fuzzy search, it also holds the "Words" of the titles in lower case, the "Word Postings" giving the
+        ids of the titles using each word, and the "Trigrams" mapping each character trigram to the ids of the
+        words containing it.
+
+    The tags of a record already hold the single words, the bigrams and the trigrams of its title, so a query
+    for "machine_learning" is answered by a single posting list.
+    """
+    postings = {}
+    word_ids = {}
+    word_postings = []
+    for title_id, record in enumerate(records):
+        for tag in {normalize_term(tag) for tag in record.tags}:
+            postings.setdefault(tag, array("I")).append(title_id)
+        for word in set(record.title.lower().split()):
+            if word not in word_ids:
+                word_ids[word] = len(word_postings)
+                word_postings.append(array("I"))
+            word_postings[word_ids[word]].append(title_id)
+
+    trigrams = {}
+    for word, word_id in word_ids.items():
+        for trigram in get_character_trigrams(word):
+            trigrams.setdefault(trigram, array("I")).append(word_id)
+    return {"Titles": [record.title for record in records],
+            "Postings": {tag: postings[tag] for tag in sorted(postings)},
+            "Words": list(word_ids),
+            "Word Postings": word_postings,
+            "Trigrams": trigrams}
+
+def save_index(index_file: str, index: dict) -> None:
+    """
+    Write the inverted index to disk and drop any copy of it loaded by `load_index`.
+
+    Parameters:
+        index_file (str): The path to the index file.
+        index (dict): The index returned by `build_index`.
+
+    Returns:
+        None
+    """
+    Output.write_document(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL), index_file)
+    _loaded_index.pop(index_file, None)
+
+def load_index(index_file: str) -> dict | None:
+    """
+    Load the inverted index from disk the first time it is needed.
+
+    Parameters:
+        index_file (str): The path to the index file.
+
+    Returns:
+        dict | None: The index, or None when no index has been written yet. The index is read once per process
+        and kept in memory for the next queries, along with the sorted list of its tags.
+    """
+    if index_file not in _loaded_index:
+        if not os.path.exists(index_file):
+            return None
+        with open(index_file, "rb") as inputFile:
+            index = pickle.load(inputFile)
+        index["Terms"] = list(index["Postings"])
+        _loaded_index[index_file] = index
+    return _loaded_index[index_file]
+
+def parse_query(query: str) -> list[list[str]]:
+    """
+    Split a query into clauses of terms.
+
+    Parameters:
+        query (str): The query. Terms separated by spaces must all match, "AND" may be written between them, and
+            "OR" separates alternative clauses. A term ending with "*" matches every tag starting with it. A "*"
+            alone, which would match every tag, is left out.
+
+    Returns:
+        list[list[str]]: The clauses, each one a list of normalized terms.
+
+    Example:
+        >>> parse_query("machine learning OR data*")
+        [['machine', 'learning'], ['data*']]
+    """
+    clauses = [[]]
+    for word in query.split():
+        if word == "OR":
+            clauses.append([])
+        elif word not in ("AND", "*"):
+            clauses[-1].append(normalize_term(word))
+    return [clause for clause in clauses if clause]
+
+def get_postings(index: dict, term: str) -> set[int]:
+    """
+    Look up the ids of the titles matching a single term.
+
+    Parameters:
+        index (dict): The index returned by `load_index`.
+        term (str): A normalized term, ending with "*" for a prefix match.
+
+    Returns:
+        set[int]: The ids of the matching titles.
+    """
+    if not term.endswith("*"):
+        return set(index["Postings"].get(term, ()))
+    prefix = term[:-1]
+    terms = index["Terms"]
+    title_ids = set()
+    for position in range(bisect_left(terms, prefix), len(terms)):
+        if not terms[position].startswith(prefix):
+            break
+        title_ids.update(index["Postings"][terms[position]])
+    return title_ids
+
+def query_index(index: dict, query: str, stop_words: set[str] = frozenset(), normalized: bool = False) -> list[str]:
+    """
+    Find the titles matching a query and rank them by how many of its terms they carry.
+
+    Parameters:
+        index (dict): The index returned by `load_index`.
+        query (str): The query, in the syntax described by `parse_query`.
+        stop_words (set[str], optional): Words that are never tagged, such as the banned words. They are left out
+            of the query instead of making every clause fail.
+        normalized (bool): Whether the stop words are already normalized by `normalize_term`, so a caller
+            answering many queries with the same stop words only normalizes them once.
+
+    Returns:
+        list[str]: The matching titles, best match first and alphabetically among equal scores.
+
+    A title matches when it carries every term of at least one clause. Its score is the number of query terms it
+    carries, plus one for every pair of adjacent terms it carries as a bigram tag, so "machine learning" ranks
+    titles tagged "machine_learning" above titles that only mention both words apart. When no title matches a
+    plain query, one without "AND", "OR" or prefix terms, it falls back to the titles containing every one of its
+    words, ignoring case, as parts of their words. A query using the operators gets no fallback, so "OR" or "*"
+    alone never lists the titles merely containing "or" or the whole library.
+    """
+    if not normalized:
+        stop_words = {normalize_term(word) for word in stop_words}
+    clauses = [[term for term in clause if term not in stop_words] for clause in parse_query(query)]
+    clauses = [clause for clause in clauses if clause]
+
+    scores = {}
+    for clause in clauses:
+        postings = [get_postings(index, term) for term in clause]
+        matched = set.intersection(*postings)
+        pairs = [get_postings(index, first + "_" + second) for first, second in zip(clause, clause[1:])
+                 if not first.endswith("*") and not second.endswith("*")]
+        for title_id in matched:
+            score = len(postings) + sum(title_id in pair for pair in pairs)
+            scores[title_id] = max(scores.get(title_id, 0), score)
+
+    titles = index["Titles"]
+    if not scores:
+        words = query.split()
+        if any(word in ("AND", "OR") or word.endswith("*") for word in words):
+            return []
+        needles = [word.lower() for word in words if normalize_term(word) not in stop_words]
+        if not needles:
+            return []
+        return [title for title in titles if all(needle in title.lower() for needle in needles)]
+    return [titles[title_id] for title_id in sorted(scores, key=lambda title_id: (-scores[title_id], titles[title_id]))]
+
+def bounded_edit_distance(first: str, second: str, limit: int) -> int:
+    """
+    Compute the Levenshtein distance between two words, giving up as soon as it exceeds a limit.
+
+    Parameters:
+        first (str): The first word.
+        second (str): The second word.
+        limit (int): The largest distance of interest.
+
+    Returns:
+        int: The edit distance, or `limit + 1` when it is larger than `limit`.
+
+    Only one row of the dynamic programming table is kept, and the computation stops at the first row whose
+    smallest value is already above `limit`.
+    """
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, start=1):
+        current = [i]
+        for j, second_char in enumerate(second, start=1):
+            current.append(min(previous[j] + 1,
+                               current[j - 1] + 1,
+                               previous[j - 1] + (first_char != second_char)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+def get_similar_words(index: dict, word: str) -> dict[int, float]:
+    """
+    Find the words of the titles that are within a few typos of a given word.
+
+    Parameters:
+        index (dict): The index returned by `load_index`.
+        word (str): The word, in lower case.
+
+    Returns:
+        dict[int, float]: The ids of the similar words, each with its similarity, from 1.0 for the same word down
+        towards 0.0.
+
+    The allowed number of typos grows with the length of the word: one up to five characters, two beyond. Only
+    the words sharing enough character trigrams with `word` to be within that distance are compared to it,
+    so the cost follows the number of candidates rather than the size of the vocabulary.
+    """
+    limit = 1 if len(word) <= 5 else 2
+    trigrams = get_character_trigrams(word)
+    shared = Counter()
+    for trigram in trigrams:
+        shared.update(index["Trigrams"].get(trigram, ()))
+    threshold = max(1, len(trigrams) - 3 * limit)
+
+    similar_words = {}
+    for word_id, count in shared.items():
+        if count < threshold:
+            continue
+        candidate = index["Words"][word_id]
+        distance = bounded_edit_distance(word, candidate, limit)
+        if distance <= limit:
+            similar_words[word_id] = 1 - distance / max(len(word), len(candidate))
+    return similar_words
+
+def fuzzy_query_index(index: dict, query: str, stop_words: set[str] = frozenset(), normalized: bool = False) -> list[str]:
+    """
+    Find the titles whose words are close to the words of a query, tolerating typos.
+
+    Parameters:
+        index (dict): The index returned by `load_index`.
+        query (str): The words to look for, separated by spaces.
+        stop_words (set[str], optional): Words to leave out of the query, such as the banned words.
+        normalized (bool): Whether the stop words are already in lower case.
+
+    Returns:
+        list[str]: The matching titles, most similar first and alphabetically among equal scores.
+
+    Each query word is matched to its similar words with `get_similar_words`. A title scores, for each query
+    word, the similarity of its closest word, and titles are ranked by the sum of these scores.
+    """
+    if not normalized:
+        stop_words = {word.lower() for word in stop_words}
+    scores = {}
+    for word in dict.fromkeys(query.lower().split()):
+        if word in stop_words:
+            continue
+        best_similarity = {}
+        for word_id, similarity in get_similar_words(index, word).items():
+            for title_id in index["Word Postings"][word_id]:
+                best_similarity[title_id] = max(best_similarity.get(title_id, 0), similarity)
+        for title_id, similarity in best_similarity.items():
+            scores[title_id] = scores.get(title_id, 0) + similarity
+
+    titles = index["Titles"]
+    return [titles[title_id] for title_id in sorted(scores, key=lambda title_id: (-scores[title_id], titles[title_id]))]
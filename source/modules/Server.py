@@ -0,0 +1,383 @@
+"""
+A local query server keeping the catalog of a vault in memory, and the client the command line uses to query it.
+
+Each query run from the command line pays for starting the interpreter, loading the ban list and the search
+index or the tag analytics, and for some commands listing the BOOKS folder. The server loads all of them once,
+along with the book records and the running statistics, and answers the queries of any number of clients from
+memory. It speaks a small subset of HTTP/1.1 on a TCP port of the local machine or on a Unix socket, so scripts
+and Obsidian plugins can query it with any HTTP client:
+
+    GET  /search?q=machine+learning          the titles matching a query, as `Search.query_index`
+    GET  /fuzzy?q=javscript                  the titles close to the words, as `Search.fuzzy_query_index`
+    GET  /tagged?tag=python&since=2024-05-17 the titles carrying a tag, most recently updated first
+    GET  /related?tag=python                 the related tags, as `TagAnalytics.get_related_tags`
+    GET  /similar?title=think+C              the similar books, as `TagAnalytics.get_similar_books`
+    GET  /stats                              the characteristics of each property of the books
+    GET  /status                             the number of books and the time of the last refresh
+    POST /tasks?count=3                      pick books to read and append them to the task list
+
+Every answer is a JSON object holding the "Results", or the "Error" of a request that could not be answered.
+Only local clients are answered: a request whose Host header is not the local machine, or which carries an
+Origin header, is refused, so a web page open in a browser can neither post tasks nor read the catalog through
+a rebound domain name.
+The queries are answered one after the other on the event loop, each from the snapshot of the catalog current
+when it arrives, so none of them waits for the folder to be scanned. The folder is polled like `Export.watch`
+does, and each change is brought in by `Export.refresh_catalog` on a worker thread, which writes the outputs of
+the vault as `watch` would and builds a new snapshot that replaces the old one at once.
+
+An address is either "HOST:PORT", where the host defaults to the local machine, or "unix:PATH".
+"""
+import os
+import threading
+import time
+from datetime import datetime
+from modules.Lazy import lazy_import
+import modules.path as path
+
+asyncio = lazy_import("asyncio")
+json = lazy_import("json")
+socket = lazy_import("socket")
+parse = lazy_import("urllib.parse")
+DataProcess = lazy_import("modules.DataProcess")
+Export = lazy_import("modules.Export")
+RunningStat = lazy_import("modules.RunningStat")
+Scheduler = lazy_import("modules.Scheduler")
+Search = lazy_import("modules.Search")
+TagAnalytics = lazy_import("modules.TagAnalytics")
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+LOCAL_HOSTS = ("localhost", "127.0.0.1", "[::1]")
+
+class ServerError(Exception):
+    """Raised by `request` when the server cannot be reached or could not answer a request, with its reason."""
+
+def parse_address(address: str) -> tuple[str, int] | str:
+    """
+    Split an address into the host and port to listen on or connect to, or the path of a Unix socket.
+
+    Parameters:
+        address (str): The address, "HOST:PORT", ":PORT", "PORT" or "unix:PATH".
+
+    Returns:
+        tuple[str, int] | str: The host and the port, the host being "127.0.0.1" when not given, or the path.
+    """
+    if address.startswith("unix:"):
+        return os.path.expanduser(address.removeprefix("unix:"))
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+class Library:
+    """
+    The catalog of a vault held in memory by the server.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        workers (int, optional): The number of threads used to stat the files.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+
+    The manifest and the running statistics are only touched by `refresh`, one call at a time. The queries read
+    `snapshot`, a dictionary that is never changed once built: `refresh` builds a new one and replaces it, so a
+    query never sees the records of one scan with the index of another.
+    """
+
+    def __init__(self, folderPath: str, workers: int = None, content_tags: bool = False) -> None:
+        self.folderPath = folderPath
+        self.workers = workers
+        self.content_tags = content_tags
+        self.manifest = DataProcess.load_manifest(path.PDF_manifest_path)
+        self.property_stats = RunningStat.load_property_stats(path.PropertyStat_running_path)
+        self.snapshot = None
+        self.tasks_lock = threading.Lock()
+
+    def refresh(self) -> dict[str, list[str]]:
+        """
+        Bring the outputs of the vault and the snapshot up to date with the folder.
+
+        Returns:
+            dict[str, list[str]]: The delta found by the scan, as returned by `Export.refresh_catalog`.
+
+        The ban list is reloaded from its cache, so editing it re-tags the library. The snapshot is only rebuilt
+        when something changed, or when there is none yet.
+        """
+        banned_words = DataProcess.get_banned_words(path.ban_path)
+        delta, self.property_stats = Export.refresh_catalog(self.folderPath, banned_words, self.manifest, self.property_stats,
+                                                            self.workers, self.content_tags)
+        if self.snapshot is not None and not any(delta.values()) and banned_words == self.snapshot["Banned Words"]:
+            return delta
+
+        records = [entry["Record"] for entry in self.manifest["Files"].values()]
+        if self.property_stats is None:
+            self.property_stats = RunningStat.build_property_stats(records)
+        books_by_tag = {}
+        for record in sorted(records, key=lambda record: record.updated_time, reverse=True):
+            for tag in record.tags:
+                books_by_tag.setdefault(tag, []).append(record)
+        self.snapshot = {"Records": records,
+                         "Banned Words": banned_words,
+                         "Search Stop Words": {Search.normalize_term(word) for word in banned_words},
+                         "Fuzzy Stop Words": {word.lower() for word in banned_words},
+                         "Index": Export.get_search_index(banned_words),
+                         "Analytics": Export.get_tag_analytics(banned_words),
+                         "Books By Tag": books_by_tag,
+                         "Stats": {name: running_stat.describe(name) for name, running_stat in self.property_stats.items()},
+                         "Refreshed": datetime.now().isoformat(timespec="seconds")}
+        return delta
+
+    def search(self, q: str) -> list[str]:
+        """Find the titles matching a query, see `Search.query_index`."""
+        return Search.query_index(self.snapshot["Index"], q, self.snapshot["Search Stop Words"], normalized=True)
+
+    def fuzzy(self, q: str) -> list[str]:
+        """Find the titles close to the given words, see `Search.fuzzy_query_index`."""
+        return Search.fuzzy_query_index(self.snapshot["Index"], q, self.snapshot["Fuzzy Stop Words"], normalized=True)
+
+    def tagged(self, tag: str, since: str = None) -> list[str]:
+        """Find the titles carrying a tag, updated since an ISO date when given, most recently updated first."""
+        records = self.snapshot["Books By Tag"].get(tag.removeprefix("#"), [])
+        if since is None:
+            return [record.title for record in records]
+        since_time = datetime.fromisoformat(since).timestamp()
+        return [record.title for record in records if record.updated_time >= since_time]
+
+    def related(self, tag: str) -> list[tuple[str, int, float]]:
+        """Find the tags appearing the most often with a tag, see `TagAnalytics.get_related_tags`."""
+        return TagAnalytics.get_related_tags(self.snapshot["Analytics"], tag)
+
+    def similar(self, title: str) -> list[tuple[str, float]]:
+        """Find the books whose tags are the most similar to those of a book, see `TagAnalytics.get_similar_books`."""
+        return TagAnalytics.get_similar_books(self.snapshot["Analytics"], title)
+
+    def stats(self) -> dict[str, dict[str, int]]:
+        """Describe each property of the books, see `RunningStat.RunningStat.describe`."""
+        return self.snapshot["Stats"]
+
+    def status(self) -> dict:
+        """Report the folder served, its number of books and the time of the last refresh."""
+        return {"Folder": os.fspath(self.folderPath), "Books": len(self.snapshot["Records"]), "Refreshed": self.snapshot["Refreshed"]}
+
+    def tasks(self, count: str = "3") -> list[str]:
+        """
+        Pick books to read, see `Scheduler.pick_books`, and append them to the task list like `main.py tasks`.
+
+        The task list is read and written again as a whole, so the requests picking tasks are answered one at a time.
+        """
+        count = int(count)
+        with self.tasks_lock:
+            task_index = Scheduler.get_task_index(DataProcess.load_task_history(path.taskList_path, path.TaskHistory_path))
+            picked = Scheduler.pick_books(self.snapshot["Records"], task_index, count)
+            Export.append_reading_tasks(picked)
+        return picked
+
+    # The method and the query handling each route, and whether the query reads or writes files, in which case it
+    # runs on a worker thread instead of the event loop.
+    ROUTES = {"/search": ("GET", search, False),
+              "/fuzzy": ("GET", fuzzy, False),
+              "/tagged": ("GET", tagged, False),
+              "/related": ("GET", related, False),
+              "/similar": ("GET", similar, False),
+              "/stats": ("GET", stats, False),
+              "/status": ("GET", status, False),
+              "/tasks": ("POST", tasks, True)}
+
+    def is_local(self, headers: dict[str, str]) -> bool:
+        """
+        Tell whether a request comes from a local client rather than from a web page.
+
+        Parameters:
+            headers (dict[str, str]): The headers of the request, with names in lower case.
+
+        Returns:
+            bool: Whether the Host header names the local machine, with any port, and no Origin header was sent.
+            Browsers send an Origin header with the cross-site requests of a page, and the Host of the page's own
+            domain name when it was rebound to the local machine.
+        """
+        if "origin" in headers:
+            return False
+        host = headers.get("host", "")
+        if not host.startswith("["):
+            host = host.partition(":")[0]
+        elif "]" in host:
+            host = host[:host.index("]") + 1]
+        return host.lower() in LOCAL_HOSTS
+
+    def answer(self, method: str, target: str, headers: dict[str, str] = None) -> tuple[str, bytes]:
+        """
+        Answer a request.
+
+        Parameters:
+            method (str): The method of the request, "GET" or "POST".
+            target (str): The path of the request, with its query string.
+            headers (dict[str, str], optional): The headers of the request, with names in lower case, checked by
+                `is_local`. Not given when the request does not come from a socket.
+
+        Returns:
+            tuple[str, bytes]: The status line of the response, such as "200 OK", and its JSON body.
+        """
+        if headers is not None and not self.is_local(headers):
+            return "403 Forbidden", json.dumps({"Error": "only local clients are answered"}).encode("utf-8")
+        url = parse.urlsplit(target)
+        if url.path not in self.ROUTES:
+            return "404 Not Found", json.dumps({"Error": f"unknown route {url.path}"}).encode("utf-8")
+        route_method, query, _ = self.ROUTES[url.path]
+        if method != route_method:
+            return "405 Method Not Allowed", json.dumps({"Error": f"{url.path} expects {route_method}"}).encode("utf-8")
+        parameters = dict(parse.parse_qsl(url.query))
+        try:
+            results = query(self, **parameters)
+        except (TypeError, ValueError) as error:
+            return "400 Bad Request", json.dumps({"Error": str(error)}).encode("utf-8")
+        except Exception as error:
+            return "500 Internal Server Error", json.dumps({"Error": f"{type(error).__name__}: {error}"}).encode("utf-8")
+        try:
+            return "200 OK", json.dumps({"Results": results}, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as error:
+            return "500 Internal Server Error", json.dumps({"Error": f"{type(error).__name__}: {error}"}).encode("utf-8")
+
+    def is_blocking(self, target: str) -> bool:
+        """Tell whether the query of a request reads or writes files, see `ROUTES`."""
+        route = self.ROUTES.get(parse.urlsplit(target).path)
+        return route is not None and route[2]
+
+    async def handle_connection(self, reader: "asyncio.StreamReader", writer: "asyncio.StreamWriter") -> None:
+        """
+        Answer the requests of a client until it closes the connection or asks for it to be closed.
+
+        Parameters:
+            reader (asyncio.StreamReader): The stream the requests are read from.
+            writer (asyncio.StreamWriter): The stream the responses are written to.
+
+        Returns:
+            None
+        """
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()).strip():
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                await reader.readexactly(int(headers.get("content-length", 0)))
+
+                if self.is_blocking(target):
+                    status, body = await asyncio.get_running_loop().run_in_executor(None, self.answer, method, target, headers)
+                else:
+                    status, body = self.answer(method, target, headers)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(folderPath: str, address: str = DEFAULT_ADDRESS, workers: int = None, interval: float = 0.2, debounce: float = 0.5,
+                rescan_interval: float = 5.0, content_tags: bool = False, on_refresh=None) -> None:
+    """
+    Serve the queries on the catalog of a folder, keeping it up to date with the folder, until cancelled.
+
+    Parameters:
+        folderPath (str): The path to the folder containing the PDF files.
+        address (str): The address to listen on, see `parse_address`.
+        workers (int, optional): The number of threads used to stat the files. Defaults to 1: the threads of a
+            scan compete with the event loop for the interpreter, and a pool of them stalls the queries answered
+            during the scan for up to half a second on a large library, against tens of milliseconds for one.
+        interval, debounce, rescan_interval: How the folder is polled, see `Export.watch`.
+        content_tags (bool): Whether to add the words of the metadata and the first page of each PDF file to its tags.
+        on_refresh (callable, optional): Called with the delta of each refresh that found a change.
+
+    Returns:
+        None
+
+    The catalog is brought up to date before the server starts listening, so the first query is answered from
+    memory too. The socket file of a Unix socket address is removed when the server stops.
+    """
+    library = Library(folderPath, workers or 1, content_tags)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, library.refresh)
+
+    listen_address = parse_address(address)
+    if isinstance(listen_address, str):
+        if os.path.exists(listen_address):
+            os.remove(listen_address)
+        server = await asyncio.start_unix_server(library.handle_connection, listen_address)
+    else:
+        server = await asyncio.start_server(library.handle_connection, *listen_address)
+
+    try:
+        async with server:
+            folder_mtime = os.stat(folderPath).st_mtime_ns
+            last_change = None
+            last_refresh = time.monotonic()
+            while True:
+                await asyncio.sleep(interval)
+                now = time.monotonic()
+                current_mtime = os.stat(folderPath).st_mtime_ns
+                if current_mtime != folder_mtime:
+                    folder_mtime = current_mtime
+                    last_change = now
+                    continue
+                if (last_change is None or now - last_change < debounce) and now - last_refresh < rescan_interval:
+                    continue
+                delta = await loop.run_in_executor(None, library.refresh)
+                last_change = None
+                last_refresh = time.monotonic()
+                if on_refresh is not None and any(delta.values()):
+                    on_refresh(delta)
+    finally:
+        if isinstance(listen_address, str) and os.path.exists(listen_address):
+            os.remove(listen_address)
+
+def request(address: str, route: str, parameters: dict[str, str] = None, method: str = "GET", timeout: float = 10.0) -> object:
+    """
+    Send a request to the server and return the results of its answer.
+
+    Parameters:
+        address (str): The address of the server, see `parse_address`.
+        route (str): The route, such as "/search".
+        parameters (dict[str, str], optional): The parameters of the query string.
+        method (str): The method of the request.
+        timeout (float): The number of seconds to wait for the server.
+
+    Returns:
+        object: The "Results" of the answer, as decoded from JSON.
+
+    Raises:
+        ServerError: When the server cannot be reached or could not answer the request, with its reason.
+
+    The request is written and the response read on a plain socket, so the client only loads the modules it
+    needs to talk to the server.
+    """
+    target = route + ("?" + parse.urlencode(parameters) if parameters else "")
+    try:
+        server_address = parse_address(address)
+    except ValueError as error:
+        raise ServerError(f"invalid server address {address!r}, expected HOST:PORT or unix:PATH") from error
+    try:
+        if isinstance(server_address, str):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(timeout)
+            connection.connect(server_address)
+        else:
+            connection = socket.create_connection(server_address, timeout)
+        with connection:
+            connection.sendall(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Length: 0\r\nConnection: close\r\n\r\n".encode("latin-1"))
+            response = b"".join(iter(lambda: connection.recv(1 << 16), b""))
+    except OSError as error:
+        raise ServerError(f"cannot reach the server at {address}: {error.strerror or error}") from error
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = head.split(b" ", 2)[1] if head.startswith(b"HTTP/") else b""
+    try:
+        answer = json.loads(body) if body else {}
+    except ValueError:
+        answer = {}
+    if not isinstance(answer, dict):
+        answer = {}
+    if status != b"200" or "Results" not in answer:
+        raise ServerError(answer.get("Error", f"invalid response from {address}"))
+    return answer["Results"]
@@ -0,0 +1,210 @@
+import heapq
+import os
+import pickle
+from array import array
+from collections import Counter
+from itertools import chain
+from math import log, sqrt
+from modules.Lazy import lazy_import
+from modules.Record import BookRecord
+
+Output = lazy_import("modules.Output")
+
+_loaded_analytics = {}
+
+def build_tag_analytics(records: list[BookRecord]) -> dict:
+    """
+    Build the tag analytics of the book records: tag frequencies, tag co-occurrences and TF-IDF weights.
+
+    Parameters:
+        records (list[BookRecord]): The book records returned by `DataProcess.get_book_records`.
+
+    Returns:
+        dict: The analytics, every tag being interned as its id, its position in the sorted list of "Tags":
+            - "Titles": the titles of the books, a book id being its position in this list,
+            - "Tags": the distinct tags,
+            - "Book Tag Offsets" and "Book Tags": the sorted tag ids of each book, those of book i being
+              `Book Tags[Book Tag Offsets[i]:Book Tag Offsets[i + 1]]`,
+            - "Tag Book Offsets" and "Tag Books": the sorted ids of the books carrying each tag, laid out the
+              same way,
+            - "Document Frequency": the number of books carrying each tag,
+            - "Co-occurrence Offsets", "Co-occurrence Tags" and "Co-occurrence Counts": the sparse, symmetric
+              matrix of the number of books carrying two tags, in compressed sparse rows: the tags appearing with
+              tag i and their counts are at `Co-occurrence Offsets[i]:Co-occurrence Offsets[i + 1]`,
+            - "IDF": the inverse document frequency of each tag,
+            - "Book Norms": the Euclidean norm of the TF-IDF vector of each book.
+
+    Every list of ids is an unsigned integer array, 4 bytes per entry, so the analytics of hundreds of thousands
+    of titles stay compact in memory and on disk. The co-occurrence matrix is filled one row at a time, by
+    counting the tags of the books of each tag, so no table of every pair of tags is ever held in memory. A tag appears at most once in a book, so its term frequency is
+    1 and the TF-IDF weight of a tag in a book is its IDF, `log((1 + N) / (1 + df)) + 1` for N books.
+    """
+    tags = sorted(set().union(*(record.tags for record in records)))
+    tag_ids = {tag: tag_id for tag_id, tag in enumerate(tags)}
+
+    book_tag_offsets = array("I", [0])
+    book_tags = array("I")
+    for record in records:
+        book_tags.extend(sorted({tag_ids[tag] for tag in record.tags}))
+        book_tag_offsets.append(len(book_tags))
+
+    document_frequency = array("I", bytes(4 * len(tags)))
+    for tag_id in book_tags:
+        document_frequency[tag_id] += 1
+    tag_book_offsets = array("I", [0])
+    for frequency in document_frequency:
+        tag_book_offsets.append(tag_book_offsets[-1] + frequency)
+    tag_books = array("I", bytes(4 * len(book_tags)))
+    next_slot = array("I", tag_book_offsets[:-1])
+    for book_id in range(len(records)):
+        for tag_id in book_tags[book_tag_offsets[book_id]:book_tag_offsets[book_id + 1]]:
+            tag_books[next_slot[tag_id]] = book_id
+            next_slot[tag_id] += 1
+
+    cooccurrence_offsets = array("I", [0])
+    cooccurrence_tags = array("I")
+    cooccurrence_counts = array("I")
+    for tag_id in range(len(tags)):
+        row = Counter(chain.from_iterable(book_tags[book_tag_offsets[book_id]:book_tag_offsets[book_id + 1]]
+                                          for book_id in tag_books[tag_book_offsets[tag_id]:tag_book_offsets[tag_id + 1]]))
+        del row[tag_id]
+        other_ids = sorted(row)
+        cooccurrence_tags.extend(other_ids)
+        cooccurrence_counts.extend(map(row.__getitem__, other_ids))
+        cooccurrence_offsets.append(len(cooccurrence_tags))
+
+    idf = array("d", (log((1 + len(records)) / (1 + frequency)) + 1 for frequency in document_frequency))
+    book_norms = array("d", (sqrt(sum(idf[tag_id] ** 2 for tag_id in book_tags[book_tag_offsets[i]:book_tag_offsets[i + 1]]))
+                             for i in range(len(records))))
+    return {"Titles": [record.title for record in records],
+            "Tags": tags,
+            "Book Tag Offsets": book_tag_offsets,
+            "Book Tags": book_tags,
+            "Tag Book Offsets": tag_book_offsets,
+            "Tag Books": tag_books,
+            "Document Frequency": document_frequency,
+            "Co-occurrence Offsets": cooccurrence_offsets,
+            "Co-occurrence Tags": cooccurrence_tags,
+            "Co-occurrence Counts": cooccurrence_counts,
+            "IDF": idf,
+            "Book Norms": book_norms}
+
+def save_tag_analytics(analytics_file: str, analytics: dict) -> None:
+    """
+    Write the tag analytics to disk and drop any copy of them loaded by `load_tag_analytics`.
+
+    Parameters:
+        analytics_file (str): The path to the analytics file.
+        analytics (dict): The analytics returned by `build_tag_analytics`.
+
+    Returns:
+        None
+    """
+    Output.write_document(pickle.dumps(analytics, protocol=pickle.HIGHEST_PROTOCOL), analytics_file)
+    _loaded_analytics.pop(analytics_file, None)
+
+def load_tag_analytics(analytics_file: str) -> dict | None:
+    """
+    Load the tag analytics from disk the first time they are needed.
+
+    Parameters:
+        analytics_file (str): The path to the analytics file.
+
+    Returns:
+        dict | None: The analytics, or None when none have been written yet. They are read once per process and
+        kept in memory for the next queries, along with the "Tag IDs" and "Title IDs" mapping each tag and each
+        title to its id.
+    """
+    if analytics_file not in _loaded_analytics:
+        if not os.path.exists(analytics_file):
+            return None
+        with open(analytics_file, "rb") as inputFile:
+            analytics = pickle.load(inputFile)
+        analytics["Tag IDs"] = {tag: tag_id for tag_id, tag in enumerate(analytics["Tags"])}
+        analytics["Title IDs"] = {title: book_id for book_id, title in enumerate(analytics["Titles"])}
+        _loaded_analytics[analytics_file] = analytics
+    return _loaded_analytics[analytics_file]
+
+def find_id(ids: dict[str, int], name: str) -> int | None:
+    """Look a tag or a title up by its exact spelling, then regardless of case."""
+    if name in ids:
+        return ids[name]
+    folded = name.casefold()
+    return next((found_id for key, found_id in ids.items() if key.casefold() == folded), None)
+
+def get_related_tags(analytics: dict, tag: str, limit: int = 10) -> list[tuple[str, int, float]]:
+    """
+    Find the tags that most often appear on the same books as a given tag.
+
+    Parameters:
+        analytics (dict): The analytics returned by `load_tag_analytics`.
+        tag (str): The tag, with or without the leading "#".
+        limit (int): The number of tags to return.
+
+    Returns:
+        list[tuple[str, int, float]]: The related tags, each with the number of books it shares with `tag` and
+        their cosine similarity `shared / sqrt(df(tag) * df(related))`, most similar first. Empty when the tag is
+        unknown.
+
+    The similarity keeps tags found on almost every book from crowding out the ones specific to `tag`. Only the
+    row of `tag` in the sparse co-occurrence matrix is read.
+    """
+    tag_id = find_id(analytics["Tag IDs"], tag.removeprefix("#"))
+    return [] if tag_id is None else get_related_tags_by_id(analytics, tag_id, limit)
+
+def get_related_tags_by_id(analytics: dict, tag_id: int, limit: int = 10) -> list[tuple[str, int, float]]:
+    """Find the tags related to the tag of a given id, like `get_related_tags`."""
+    start, end = analytics["Co-occurrence Offsets"][tag_id], analytics["Co-occurrence Offsets"][tag_id + 1]
+    frequency = analytics["Document Frequency"]
+    related = [(analytics["Tags"][other_id], count, round(count / sqrt(frequency[tag_id] * frequency[other_id]), 3))
+               for other_id, count in zip(analytics["Co-occurrence Tags"][start:end], analytics["Co-occurrence Counts"][start:end])]
+    related.sort(key=lambda item: (-item[2], -item[1], item[0]))
+    return related[:limit]
+
+def get_similar_books(analytics: dict, title: str, limit: int = 10) -> list[tuple[str, float]]:
+    """
+    Find the books whose tags are the most similar to those of a given book.
+
+    Parameters:
+        analytics (dict): The analytics returned by `load_tag_analytics`.
+        title (str): The title of the book.
+        limit (int): The number of books to return.
+
+    Returns:
+        list[tuple[str, float]]: The titles of the similar books, each with the cosine similarity of its TF-IDF
+        vector to that of `title`, most similar first. Empty when the title is unknown.
+
+    Only the books sharing at least one tag with `title` are scored, by walking the book lists of its tags, so a
+    query costs the total frequency of its tags rather than the size of the library.
+    """
+    book_id = find_id(analytics["Title IDs"], title)
+    if book_id is None:
+        return []
+    idf = analytics["IDF"]
+    tag_book_offsets, tag_books = analytics["Tag Book Offsets"], analytics["Tag Books"]
+    scores = {}
+    for tag_id in analytics["Book Tags"][analytics["Book Tag Offsets"][book_id]:analytics["Book Tag Offsets"][book_id + 1]]:
+        weight = idf[tag_id] ** 2
+        for other_id in tag_books[tag_book_offsets[tag_id]:tag_book_offsets[tag_id + 1]]:
+            scores[other_id] = scores.get(other_id, 0.0) + weight
+    scores.pop(book_id, None)
+
+    norms = analytics["Book Norms"]
+    similar = [(analytics["Titles"][other_id], round(score / (norms[book_id] * norms[other_id]), 3)) for other_id, score in scores.items()]
+    similar.sort(key=lambda item: (-item[1], item[0]))
+    return similar[:limit]
+
+def get_top_tag_ids(analytics: dict, limit: int = 50) -> list[tuple[int, int]]:
+    """
+    List the tags carried by the most books.
+
+    Parameters:
+        analytics (dict): The analytics returned by `build_tag_analytics` or `load_tag_analytics`.
+        limit (int): The number of tags to return.
+
+    Returns:
+        list[tuple[int, int]]: The ids of the tags with their document frequency, most frequent first, ties in tag
+        order.
+    """
+    frequency = analytics["Document Frequency"]
+    return [(tag_id, frequency[tag_id]) for tag_id in heapq.nsmallest(limit, range(len(frequency)), key=lambda tag_id: (-frequency[tag_id], tag_id))]
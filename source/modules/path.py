@@ -1,19 +1,178 @@
-from os import getcwd
-
-StudyApp_root_path = getcwd() + "\\"
-Obsidian_root_path = "Destination\\to\\Obsidian\\"
-
-ban_path = StudyApp_root_path + "data\\ban.txt"
-PDF_info_path = StudyApp_root_path + "data\\PDF_info.csv"
-PDF_tokens_path = StudyApp_root_path + "data\\PDF_tokens.json"
-PropertyStat_tokens_path = StudyApp_root_path + "data\\PropertyStat_tokens.json"
-taskList_path = StudyApp_root_path + "data\\TaskList.txt"
-TableStat_path = StudyApp_root_path + "data\\Table Stat.txt"
-PDF_index_path = StudyApp_root_path + "data\\PDF index.txt"
-TagCatalog_path = StudyApp_root_path + "data\\Tag Catalog.txt"
-
-BOOKS_folder_path = Obsidian_root_path + "BOOKS"
-Obsidian_TableStat_path = Obsidian_root_path + "Table Stat.md"
-Obsidian_PDF_index_path = Obsidian_root_path + "PDF index.md"
-Obsidian_TagCatalog_path = Obsidian_root_path + "Tag Catalog.md"
-Obsidian_taskList_path = Obsidian_root_path + "Task List.md"
\ No newline at end of file
+"""
+The paths of the application, resolved once when the module is first imported.
+
+Every path is built with `pathlib`, from the root of the application rather than the working directory, so the
+same code runs on Windows and on Linux whatever folder it is started from. The vaults to catalog are read from
+a JSON configuration file, `config.json` at the root of the application or the file named by the
+STUDYAPP_CONFIG environment variable:
+
+    {
+        "Data Root": "data",
+        "Vaults": [
+            {"Name": "Main", "Root": "~/Obsidian/Main"},
+            {"Name": "Physics", "Root": "~/Obsidian/Physics", "BOOKS": "Library", "Data Root": "data/physics"}
+        ]
+    }
+
+The outputs merged across every vault by `Export.updateVaults` go to a vault of their own, "All Vaults", whose
+notes and data files are both written to the "All Vaults" sub-folder of the data root unless the configuration
+file gives it a root with an optional data root, as in "Combined": {"Root": "~/Obsidian/Main/All Vaults"}.
+
+Relative paths are resolved against the folder of the configuration file, and "~" and environment variables
+are expanded. "BOOKS" defaults to "BOOKS". The first vault writes its data files to the data root itself, as a
+single vault always did, and each other vault to a sub-folder of the data root named after it, unless given its
+own "Data Root". The list of banned words is shared by every vault. Without a configuration file, there is a
+single vault at "Destination/to/Obsidian".
+
+The module-level paths, such as `BOOKS_folder_path` or `TableStat_path`, are those of the current vault: the
+first one at start-up, another one after `use_vault`.
+"""
+import os
+from pathlib import Path
+from modules.Lazy import lazy_import
+
+json = lazy_import("json")
+
+StudyApp_root_path = Path(__file__).resolve().parents[2]
+config_path = Path(os.environ.get("STUDYAPP_CONFIG", StudyApp_root_path / "config.json"))
+
+class Vault:
+    """
+    An Obsidian vault to catalog: its BOOKS folder, the notes written into it and the folder of its data files.
+
+    Parameters:
+        name (str): The name of the vault.
+        root (Path): The root folder of the vault.
+        data_root (Path): The folder of the data files of the vault.
+        books_folder (str): The folder of the PDF files, relative to `root`.
+    """
+
+    def __init__(self, name: str, root: Path, data_root: Path, books_folder: str = "BOOKS") -> None:
+        self.name = name
+        self.root = root
+        self.data_root = data_root
+        self.books_folder = books_folder
+
+    def __repr__(self) -> str:
+        return f"Vault({self.name!r}, {str(self.root)!r})"
+
+    def get_paths(self) -> dict[str, Path]:
+        """
+        Resolve every path of the vault.
+
+        Returns:
+            dict[str, Path]: The paths, keyed by the names of the module-level paths they are bound to by `use_vault`.
+        """
+        data = self.data_root
+        return {"Obsidian_root_path": self.root,
+                "PDF_info_path": data / "PDF_info.csv",
+                "PDF_tokens_path": data / "PDF_tokens.json",
+                "PDF_catalog_path": data / "PDF_catalog.bin",
+                "PDF_database_path": data / "PDF_catalog.db",
+                "PDF_manifest_path": data / "PDF_manifest.json",
+                "PDF_search_index_path": data / "PDF_search_index.cache",
+                "PDF_content_path": data / "PDF_content.cache",
+                "PDF_hash_path": data / "PDF_hash.cache",
+                "TagAnalytics_path": data / "PDF_tag_analytics.cache",
+                "PropertyStat_tokens_path": data / "PropertyStat_tokens.json",
+                "PropertyStat_running_path": data / "PropertyStat_running.json",
+                "taskList_path": data / "TaskList.txt",
+                "TaskHistory_path": data / "TaskList_history.cache",
+                "TableStat_path": data / "Table Stat.txt",
+                "PDF_index_path": data / "PDF index.txt",
+                "TagCatalog_path": data / "Tag Catalog.txt",
+                "TagStat_path": data / "Tag Stat.txt",
+                "Duplicates_path": data / "Duplicates.txt",
+                "BOOKS_folder_path": self.root / self.books_folder,
+                "Obsidian_TableStat_path": self.root / "Table Stat.md",
+                "Obsidian_PDF_index_path": self.root / "PDF index.md",
+                "Obsidian_TagCatalog_path": self.root / "Tag Catalog.md",
+                "Obsidian_TagStat_path": self.root / "Tag Stat.md",
+                "Obsidian_Duplicates_path": self.root / "Duplicates.md",
+                "Obsidian_taskList_path": self.root / "Task List.md"}
+
+def resolve(value: str, base: Path) -> Path:
+    """Turn a path of the configuration file into an absolute path, relative ones being taken from `base`."""
+    return base / Path(os.path.expandvars(value)).expanduser()
+
+def load_config(config_file: Path) -> tuple[Path, list[Vault], Vault]:
+    """
+    Read the data root and the vaults from a configuration file.
+
+    Parameters:
+        config_file (Path): The path to the JSON configuration file.
+
+    Returns:
+        tuple[Path, list[Vault], Vault]: The data root, the vaults, in the order of the file, and the vault of the
+        outputs merged across every vault. When the file does not exist, the data root is `data` under the root
+        of the application, with a single vault.
+
+    Raises:
+        ValueError: If the file lists no vault, or two vaults with the same name.
+    """
+    if not config_file.exists():
+        data_root = StudyApp_root_path / "data"
+        return data_root, [Vault("Obsidian", StudyApp_root_path / "Destination" / "to" / "Obsidian", data_root)], \
+               Vault("All Vaults", data_root / "All Vaults", data_root / "All Vaults")
+
+    with open(config_file, "r", encoding="utf-8") as inputFile:
+        config = json.load(inputFile)
+    base = config_file.resolve().parent
+    data_root = resolve(config.get("Data Root", "data"), base)
+    combined = config.get("Combined", {})
+    combined_root = resolve(combined["Root"], base) if "Root" in combined else data_root / "All Vaults"
+    combined_vault = Vault("All Vaults", combined_root,
+                           resolve(combined["Data Root"], base) if "Data Root" in combined else data_root / "All Vaults")
+    vaults = []
+    for index, entry in enumerate(config.get("Vaults", [])):
+        default_data_root = data_root if index == 0 else data_root / entry["Name"]
+        vaults.append(Vault(entry["Name"],
+                            resolve(entry["Root"], base),
+                            resolve(entry["Data Root"], base) if "Data Root" in entry else default_data_root,
+                            entry.get("BOOKS", "BOOKS")))
+    names = [vault.name for vault in vaults]
+    if not vaults or len(set(names)) != len(names):
+        raise ValueError(f"{config_file} must list at least one vault, each with a distinct name")
+    return data_root, vaults, combined_vault
+
+def get_vault(name: str = None) -> Vault:
+    """
+    Find a vault of the configuration by name.
+
+    Parameters:
+        name (str, optional): The name of the vault. Defaults to the first vault.
+
+    Returns:
+        Vault: The vault.
+
+    Raises:
+        KeyError: If no vault has this name.
+    """
+    if name is None:
+        return vaults[0]
+    for vault in vaults:
+        if vault.name == name:
+            return vault
+    raise KeyError(f"No vault named {name!r} in {config_path}, expected one of {', '.join(vault.name for vault in vaults)}")
+
+def use_vault(vault: Vault) -> None:
+    """
+    Make a vault the current one, binding the module-level paths to its own.
+
+    Parameters:
+        vault (Vault): The vault.
+
+    Returns:
+        None
+
+    Nothing is created on disk: the folder of the data files of the vault is created by the first write to it,
+    see `Output.replace_atomically`.
+    """
+    global current_vault
+    current_vault = vault
+    globals().update(vault.get_paths())
+
+data_root_path, vaults, combined_vault = load_config(config_path)
+ban_path = data_root_path / "ban.txt"
+current_vault = None
+use_vault(vaults[0])
@@ -0,0 +1,50 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+SOURCE_PATH = Path(__file__).resolve().parents[1]
+DATA_PATH = SOURCE_PATH.parent / "data"
+sys.path.insert(0, str(SOURCE_PATH))
+
+import modules.path as path
+
+@pytest.fixture
+def vault(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> path.Vault:
+    """
+    Bind the module-level paths to a vault of its own under `tmp_path`, with an empty BOOKS folder.
+
+    The ban list of the repository is copied to the data folder, so titles are tagged as in the real library.
+    """
+    test_vault = path.Vault("Test", tmp_path / "vault", tmp_path / "data")
+    for name, value in test_vault.get_paths().items():
+        monkeypatch.setattr(path, name, value)
+    monkeypatch.setattr(path, "current_vault", test_vault)
+    monkeypatch.setattr(path, "ban_path", test_vault.data_root / "ban.txt")
+    (test_vault.root / test_vault.books_folder).mkdir(parents=True)
+    test_vault.data_root.mkdir()
+    path.ban_path.write_bytes((DATA_PATH / "ban.txt").read_bytes())
+    return test_vault
+
+@pytest.fixture
+def add_books(vault: path.Vault):
+    """
+    Return a function creating PDF files in the BOOKS folder of the vault.
+
+    Each file is given the size in kilobytes and the modification time in seconds since EPOCH it is listed with,
+    as a (title, size, mtime) tuple.
+    """
+    def add(*books: tuple[str, int, int]) -> None:
+        for title, size, mtime in books:
+            file_path = path.BOOKS_folder_path / f"{title}.pdf"
+            with open(file_path, "wb") as outputFile:
+                outputFile.truncate(size * 1024)
+            os.utime(file_path, (mtime, mtime))
+    return add
+
+@pytest.fixture(scope="session")
+def library_titles() -> list[str]:
+    """The titles of the library of the repository, read from its PDF info CSV."""
+    with open(DATA_PATH / "PDF_info.csv", "r", encoding="utf-8") as inputFile:
+        return [line.split(";", 1)[0] for line in inputFile.read().splitlines()[1:]]
@@ -0,0 +1,88 @@
+from array import array
+
+import pytest
+
+from modules import Catalog, DataProcess
+from modules.Record import BookRecord
+
+MTIME = 1700000000
+
+@pytest.fixture
+def records(library_titles) -> list[BookRecord]:
+    titles = sorted(library_titles[:40] + ["Ünïcode Straße handbook", "C++ and C# in practice", "untagged"])
+    return [BookRecord(title, [] if title == "untagged" else DataProcess.tokenizer.tokenize(title, frozenset()),
+                       100 + 13 * i, MTIME + 3600 * i, 7 * i) for i, title in enumerate(titles)]
+
+def write_v1_catalog(catalog_file, records: list[BookRecord]) -> None:
+    """Write a catalog in the layout of version 1, which had no "Pages" column."""
+    tag_ids = {}
+    book_tag_offsets = array("I", [0])
+    book_tag_ids = array("I")
+    for record in records:
+        book_tag_ids.extend(tag_ids.setdefault(tag, len(tag_ids)) for tag in record.tags)
+        book_tag_offsets.append(len(book_tag_ids))
+    title_offsets, title_data = Catalog.encode_strings([record.title for record in records])
+    tag_offsets, tag_data = Catalog.encode_strings(list(tag_ids))
+    columns = {"Title Length (char)": array("I", (record.title_length_char for record in records)),
+               "Title Length (word)": array("H", (record.title_length_word for record in records)),
+               "Tag Number": array("H", (record.tag_number for record in records)),
+               "File Size (Kb)": array("q", (record.file_size for record in records)),
+               "Updated Time": array("q", (record.updated_time for record in records)),
+               "Title.offsets": title_offsets,
+               "Title.data": title_data,
+               "Multi-Tags.offsets": book_tag_offsets,
+               "Multi-Tags.ids": book_tag_ids,
+               "Tag Table.offsets": tag_offsets,
+               "Tag Table.data": tag_data}
+    offset = Catalog.HEADER.size + Catalog.DIRECTORY_ENTRY.size * len(columns)
+    data = bytearray(Catalog.HEADER.pack(Catalog.MAGIC, 1, len(columns), len(records), Catalog.BYTE_ORDER))
+    for name, column in columns.items():
+        offset += -offset % 8
+        data += Catalog.DIRECTORY_ENTRY.pack(name.encode("utf-8"), column.typecode.encode("ascii"), offset, len(column) * column.itemsize)
+        offset += len(column) * column.itemsize
+    for column in columns.values():
+        data += b"\0" * (-len(data) % 8)
+        data += column.tobytes()
+    catalog_file.write_bytes(bytes(data))
+
+def test_round_trip(tmp_path, records):
+    catalog_file = tmp_path / "PDF_catalog.bin"
+    Catalog.write_catalog(catalog_file, records)
+    assert Catalog.is_readable(catalog_file)
+    assert Catalog.read_catalog_records(catalog_file) == records
+    columns = Catalog.read_catalog_columns(catalog_file, list(Catalog.NUMERIC_COLUMNS))
+    assert list(columns["Tag Number"]) == [record.tag_number for record in records]
+    assert list(columns["Title Length (char)"]) == [record.title_length_char for record in records]
+
+def test_round_trip_of_version_1(tmp_path, records):
+    catalog_file = tmp_path / "PDF_catalog.bin"
+    write_v1_catalog(catalog_file, records)
+    assert Catalog.is_readable(catalog_file)
+    assert Catalog.read_catalog_records(catalog_file) == [BookRecord(record.title, record.tags, record.file_size, record.updated_time)
+                                                          for record in records]
+    columns = Catalog.read_catalog_columns(catalog_file, list(Catalog.NUMERIC_COLUMNS))
+    assert list(columns) == list(Catalog.NUMERIC_COLUMNS)
+    assert list(columns["Pages"]) == [0] * len(records)
+    assert list(columns["Updated Time"]) == [record.updated_time for record in records]
+
+@pytest.mark.parametrize("write", [Catalog.write_catalog, write_v1_catalog])
+def test_round_trip_without_books(tmp_path, write):
+    catalog_file = tmp_path / "PDF_catalog.bin"
+    write(catalog_file, [])
+    assert Catalog.is_readable(catalog_file)
+    assert Catalog.read_catalog_records(catalog_file) == []
+    assert all(len(column) == 0 for column in Catalog.read_catalog_columns(catalog_file, list(Catalog.NUMERIC_COLUMNS)).values())
+
+def test_unknown_files_are_not_readable(tmp_path, records):
+    catalog_file = tmp_path / "PDF_catalog.bin"
+    assert not Catalog.is_readable(catalog_file)
+    catalog_file.write_bytes(b"STUDYCAT")
+    assert not Catalog.is_readable(catalog_file)
+
+    Catalog.write_catalog(catalog_file, records)
+    data = bytearray(catalog_file.read_bytes())
+    data[8:12] = (Catalog.VERSION + 1).to_bytes(4, "little")
+    catalog_file.write_bytes(bytes(data))
+    assert not Catalog.is_readable(catalog_file)
+    with pytest.raises(ValueError, match="not a catalog"):
+        Catalog.read_catalog_records(catalog_file)
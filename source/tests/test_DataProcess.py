@@ -0,0 +1,149 @@
+import os
+import pickle
+from datetime import datetime
+
+import pytest
+
+import modules.path as path
+from modules import DataProcess
+
+def get_word_list_before_tokenizer(filename: str, banned_words: set[str]) -> list[str]:
+    """`DataProcess.get_word_list_from_file` as it was before the tokenizer, kept as the reference."""
+    words = filename.strip().split()
+    tuned_words = set(words)
+    tuned_words = tuned_words.union(DataProcess.get_double_word_list_from_file(words))
+    tuned_words = tuned_words.union(DataProcess.get_triple_word_list_from_file(words))
+    tuned_words = {word.replace("C++", "C_pp").replace("C#", "C_sharp") for word in tuned_words}
+    tuned_words = tuned_words.difference(banned_words)
+    return sorted(tuned_words)
+
+@pytest.fixture
+def banned_words(vault) -> frozenset[str]:
+    return DataProcess.get_banned_words(path.ban_path)
+
+def test_tokenizer_matches_word_list_before_tokenizer(library_titles, banned_words):
+    titles = library_titles + ["C++ and C# for C++ programmers", "Modern C++ C++ C#", "one", "  padded   title  ", ""]
+    for title in titles:
+        assert list(DataProcess.get_word_list_from_file(title, banned_words)) == get_word_list_before_tokenizer(title, banned_words)
+
+def test_tokenizer_cache_follows_banned_words(banned_words):
+    tokenizer = DataProcess.Tokenizer(capacity=4)
+    title = "learning Python the hard way"
+    assert tokenizer.tokenize(title, banned_words) == tokenizer.tokenize(title, banned_words)
+    assert tokenizer.get_stats()["Hits"] == 1
+
+    fewer_banned_words = banned_words - {"the"}
+    assert list(tokenizer.tokenize(title, fewer_banned_words)) == get_word_list_before_tokenizer(title, fewer_banned_words)
+    assert tokenizer.get_stats()["Misses"] == 2
+
+def test_tokenizer_drops_least_recently_used_titles(banned_words):
+    tokenizer = DataProcess.Tokenizer(capacity=2)
+    for title in ["first book", "second book", "first book", "third book"]:
+        tokenizer.tokenize(title, banned_words)
+    assert tokenizer.get_stats() == {"Hits": 1, "Misses": 3, "Size": 2}
+    tokenizer.tokenize("first book", banned_words)
+    assert tokenizer.get_stats()["Hits"] == 2
+
+def test_tokenizer_normalizes_words_beyond_its_capacity():
+    tokenizer = DataProcess.Tokenizer(capacity=1)
+    assert [tokenizer.normalize(word) for word in ["C++", "C#", "C++", "Python"]] == ["C_pp", "C_sharp", "C_pp", "Python"]
+    assert len(tokenizer.word_forms) == 1
+
+def write_text(task_file, text: str) -> None:
+    """Write a task list, making sure its modification time changes even within the resolution of the clock."""
+    old_mtime = task_file.stat().st_mtime_ns if task_file.exists() else None
+    task_file.write_text(text, encoding="utf-8")
+    if task_file.stat().st_mtime_ns == old_mtime:
+        os.utime(task_file, ns=(old_mtime, old_mtime + 1))
+
+def write_days(task_file, days: list[tuple[str, list[str]]]) -> str:
+    """Write a task list in the format of `Export.append_reading_tasks`, each day as its date and its task lines."""
+    text = "".join(f"\n\n{date}\n\n" + "\n".join(f"- {box} Read a chapter of [[BOOKS/{title}.pdf|{title}]]" for box, title in tasks)
+                   for date, tasks in days)
+    write_text(task_file, text)
+    return text
+
+DAYS = [("Mon, Jan 01, 2024", [("[x]", "think Python"), ("[ ]", "deep learning")]),
+        ("Tue, Jan 02, 2024", [("[ ]", "C++ primer")]),
+        ("Wed, Jan 03, 2024", [("[ ]", "database internals"), ("[ ]", "think Python")])]
+
+@pytest.fixture
+def task_files(tmp_path):
+    return tmp_path / "TaskList.txt", tmp_path / "TaskList_history.cache"
+
+def test_task_history_cache_matches_full_read(task_files):
+    task_file, cache_file = task_files
+    write_days(task_file, DAYS)
+    first = DataProcess.load_task_history(task_file, cache_file)
+    assert first == DataProcess.read_task_history(task_file)
+    assert [task["Title"] for task in first] == ["think Python", "deep learning", "C++ primer", "database internals", "think Python"]
+    assert DataProcess.load_task_history(task_file, cache_file) == first
+
+def test_task_history_cache_reads_appended_days(task_files):
+    task_file, cache_file = task_files
+    write_days(task_file, DAYS[:2])
+    DataProcess.load_task_history(task_file, cache_file)
+    write_days(task_file, DAYS)
+    assert DataProcess.load_task_history(task_file, cache_file) == DataProcess.read_task_history(task_file)
+
+def test_task_history_cache_sees_boxes_ticked_in_older_days(task_files):
+    task_file, cache_file = task_files
+    filler_days = [(f"Sun, Jan {day:02d}, 2023", [("[x]", f"filler book {day}")]) for day in range(1, 29)]
+    text = write_days(task_file, filler_days[:14] + DAYS[:1] + filler_days[14:] + DAYS[1:])
+    DataProcess.load_task_history(task_file, cache_file)
+    write_text(task_file, text.replace("- [ ] Read a chapter of [[BOOKS/deep", "- [x] Read a chapter of [[BOOKS/deep"))
+    tasks = DataProcess.load_task_history(task_file, cache_file)
+    assert tasks == DataProcess.read_task_history(task_file)
+    assert tasks[15] == {"Date": datetime(2024, 1, 1), "Title": "deep learning", "Done": True}
+
+def test_task_history_cache_sees_ticked_last_day_and_shrunk_file(task_files):
+    task_file, cache_file = task_files
+    text = write_days(task_file, DAYS)
+    DataProcess.load_task_history(task_file, cache_file)
+    write_text(task_file, text.replace("- [ ] Read a chapter of [[BOOKS/database", "- [x] Read a chapter of [[BOOKS/database"))
+    assert DataProcess.load_task_history(task_file, cache_file)[3]["Done"]
+    write_days(task_file, DAYS[:1])
+    assert DataProcess.load_task_history(task_file, cache_file) == DataProcess.read_task_history(task_file)
+
+def test_task_history_of_missing_or_corrupted_files(task_files):
+    task_file, cache_file = task_files
+    assert DataProcess.load_task_history(task_file, cache_file) == []
+    write_days(task_file, DAYS)
+    cache_file.write_bytes(b"not a pickle")
+    assert DataProcess.load_task_history(task_file, cache_file) == DataProcess.read_task_history(task_file)
+
+@pytest.fixture
+def opened_files(monkeypatch) -> list[str]:
+    """Record the files `DataProcess` opens."""
+    opened_files = []
+    monkeypatch.setattr(DataProcess, "open", lambda file, *args, **kwargs: opened_files.append(os.fspath(file)) or open(file, *args, **kwargs),
+                        raising=False)
+    return opened_files
+
+def test_task_history_cache_skips_unchanged_file(task_files, opened_files):
+    task_file, cache_file = task_files
+    write_days(task_file, DAYS)
+    tasks = DataProcess.load_task_history(task_file, cache_file)
+    assert DataProcess.load_task_history(task_file, cache_file) == tasks
+    assert opened_files.count(os.fspath(task_file)) == 1
+
+def test_task_history_cache_hashes_prefix_of_touched_file(task_files, opened_files, monkeypatch):
+    task_file, cache_file = task_files
+    write_days(task_file, DAYS)
+    tasks = DataProcess.load_task_history(task_file, cache_file)
+    file_stat = task_file.stat()
+    os.utime(task_file, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10 ** 9))
+    parsed = []
+    parse_task_line = DataProcess.parse_task_line
+    monkeypatch.setattr(DataProcess, "parse_task_line", lambda line, *args: parsed.append(line) or parse_task_line(line, *args))
+    assert DataProcess.load_task_history(task_file, cache_file) == tasks
+    assert parsed and not any("deep learning" in line for line in parsed)
+    assert pickle.loads(cache_file.read_bytes())["Mtime"] == file_stat.st_mtime_ns + 10 ** 9
+    assert DataProcess.load_task_history(task_file, cache_file) == tasks
+    assert opened_files.count(os.fspath(task_file)) == 2
+
+def test_task_history_cache_of_an_older_format(task_files):
+    task_file, cache_file = task_files
+    write_days(task_file, DAYS)
+    cache_file.write_bytes(pickle.dumps({"Offset": 0, "Fingerprint": b"", "Tasks": []}))
+    assert DataProcess.load_task_history(task_file, cache_file) == DataProcess.read_task_history(task_file)
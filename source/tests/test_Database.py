@@ -0,0 +1,103 @@
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from modules import Database, DataProcess
+from modules.Record import BookRecord
+
+MTIME = 1700000000
+
+def make_record(title: str, file_size: int, updated_time: int = MTIME) -> BookRecord:
+    return BookRecord(title, DataProcess.tokenizer.tokenize(title, frozenset()), file_size, updated_time)
+
+def read_rows(db_file) -> dict[str, list[tuple]]:
+    """Read the books, the tags and the book-tag relation of a database, without their ids."""
+    connection = sqlite3.connect(db_file)
+    try:
+        return {"Books": sorted(connection.execute("""
+                    SELECT title, title_length_char, title_length_word, tag_number, file_size_kb, updated_time FROM books
+                """)),
+                "Book Tags": sorted(connection.execute("""
+                    SELECT books.title, tags.name FROM book_tags
+                    JOIN books ON books.id = book_tags.book_id
+                    JOIN tags ON tags.id = book_tags.tag_id
+                """)),
+                "Tags": sorted(connection.execute("SELECT name FROM tags"))}
+    finally:
+        connection.close()
+
+@pytest.fixture
+def records(library_titles) -> list[BookRecord]:
+    return sorted((make_record(title, 100 + i, MTIME + 3600 * i) for i, title in enumerate(library_titles[:30])),
+                  key=lambda record: record.title)
+
+def test_incremental_write_matches_full_write(tmp_path, records):
+    incremental_db, full_db = tmp_path / "incremental.db", tmp_path / "data" / "full.db"
+    Database.write_books(incremental_db, records)
+
+    removed = [records[3], records[17]]
+    modified = [make_record(records[5].title, 7777, MTIME - 60),
+                BookRecord(records[9].title, records[9].tags[:1] + ("Zyxwv",), records[9].file_size, records[9].updated_time)]
+    added = [make_record("renamed Qwerty handbook", 55), make_record(records[12].title + " second edition", 66)]
+    by_title = {record.title: record for record in records} | {record.title: record for record in modified + added}
+    for record in removed:
+        del by_title[record.title]
+    new_records = [by_title[title] for title in sorted(by_title)]
+    delta = {"Added": [record.title for record in added], "Modified": [record.title for record in modified],
+             "Removed": [record.title for record in removed]}
+
+    connection = Database.connect(incremental_db)
+    with connection:
+        assert Database.update_books(connection, new_records, delta)
+    connection.close()
+    Database.write_books(full_db, new_records)
+    rows = read_rows(incremental_db)
+    assert rows == read_rows(full_db)
+    assert ("renamed Qwerty handbook", "Qwerty") in rows["Book Tags"] and ("Zyxwv",) in rows["Tags"]
+    orphaned_tags = {tag for record in removed for tag in record.tags}.difference(*(record.tags for record in new_records))
+    assert orphaned_tags and orphaned_tags.isdisjoint(tag for tag, in rows["Tags"])
+
+def test_large_or_mismatched_delta_replaces_every_row(tmp_path, records):
+    db_file = tmp_path / "PDF_database.db"
+    Database.write_books(db_file, records)
+    renamed = sorted((make_record(record.title + " notes", record.file_size) for record in records[:20]),
+                     key=lambda record: record.title) + records[20:]
+    delta = {"Added": [record.title for record in renamed[:20]], "Modified": [], "Removed": [record.title for record in records[:20]]}
+    connection = Database.connect(db_file)
+    with connection:
+        assert not Database.update_books(connection, renamed, delta)
+    connection.close()
+    Database.write_books(db_file, renamed, delta)
+    Database.write_books(tmp_path / "full.db", renamed)
+    assert read_rows(db_file) == read_rows(tmp_path / "full.db")
+
+    stale_db = tmp_path / "stale.db"
+    Database.write_books(stale_db, records[:-1])
+    Database.write_books(stale_db, records, {"Added": [], "Modified": [records[0].title], "Removed": []})
+    Database.write_books(tmp_path / "full.db", records)
+    assert read_rows(stale_db) == read_rows(tmp_path / "full.db")
+
+@pytest.fixture
+def db_file(tmp_path) -> str:
+    db_file = tmp_path / "PDF_database.db"
+    Database.write_books(db_file, [make_record("think Python", 900, MTIME),
+                                   make_record("Python crash course", 300, MTIME + 86400),
+                                   make_record("fluent Python", 1200, MTIME + 2 * 86400),
+                                   make_record("deep learning", 5000, MTIME + 3 * 86400),
+                                   make_record("database internals", 700, MTIME + 4 * 86400)])
+    Database.write_tasks(db_file, [{"Date": datetime(2024, 1, 1), "Title": "fluent Python", "Done": True},
+                                   {"Date": datetime(2024, 1, 2), "Title": "deep learning", "Done": False},
+                                   {"Date": datetime(2024, 1, 2), "Title": "a book since removed", "Done": False}])
+    return db_file
+
+def test_query_books_tagged(db_file):
+    assert Database.query_books_tagged(db_file, "Python") == ["fluent Python", "Python crash course", "think Python"]
+    assert Database.query_books_tagged(db_file, "#Python", datetime.fromtimestamp(MTIME + 86400)) == ["fluent Python", "Python crash course"]
+    assert Database.query_books_tagged(db_file, "Rust") == []
+
+def test_query_largest_unread(db_file):
+    assert Database.query_largest_unread(db_file, 2) == [("think Python", 900), ("database internals", 700)]
+    assert Database.query_largest_unread(db_file, 10) == [("think Python", 900), ("database internals", 700), ("Python crash course", 300)]
+    Database.write_tasks(db_file, [{"Date": datetime(2024, 1, 3), "Title": "think Python", "Done": False}])
+    assert Database.query_largest_unread(db_file, 2) == [("deep learning", 5000), ("fluent Python", 1200)]
@@ -0,0 +1,80 @@
+import os
+import random
+
+import pytest
+
+from modules import DataProcess, Duplicates
+
+SIZE = 3 * Duplicates.BLOCK_SIZE + 100
+
+@pytest.fixture
+def contents() -> bytes:
+    generator = random.Random(3)
+    return bytes(generator.randrange(256) for _ in range(SIZE))
+
+def write_files(folder, files: dict[str, bytes]) -> None:
+    for title, data in files.items():
+        (folder / f"{title}.pdf").write_bytes(data)
+
+def find(folder, threshold: float = 0.5) -> dict[str, list]:
+    file_stats = DataProcess.scan_pdf_files(folder)
+    tags_by_title = {title: set(DataProcess.get_word_list_from_file(title, frozenset())) for title, _ in file_stats}
+    return Duplicates.find_duplicates(folder, file_stats, tags_by_title, folder / "PDF_hash.cache", "version", threshold)
+
+def jaccard(first: str, second: str) -> float:
+    first_tags = set(DataProcess.get_word_list_from_file(first, frozenset()))
+    second_tags = set(DataProcess.get_word_list_from_file(second, frozenset()))
+    return len(first_tags & second_tags) / len(first_tags | second_tags)
+
+def test_identical_files_are_reported(tmp_path, contents):
+    write_files(tmp_path, {"alpha": contents, "beta copy": contents, "small one": b"%PDF-1.4 small", "small two": b"%PDF-1.4 small",
+                           "empty one": b"", "empty two": b""})
+    assert find(tmp_path)["Identical"] == [(SIZE, ["alpha", "beta copy"]), (14, ["small one", "small two"])]
+
+def test_files_of_equal_size_but_different_content_are_not_reported(tmp_path, contents):
+    middle = SIZE // 2
+    write_files(tmp_path, {"alpha": contents,
+                           "other middle": contents[:middle] + bytes([contents[middle] ^ 1]) + contents[middle + 1:],
+                           "other start": bytes([contents[0] ^ 1]) + contents[1:],
+                           "small one": b"%PDF-1.4 small", "small two": b"%PDF-1.4 smalL"})
+    assert find(tmp_path)["Identical"] == []
+
+def test_similar_titles_follow_the_threshold(tmp_path):
+    close = ("learning Python the hard way", "learning Python the hard way third edition")
+    loose = ("introduction to algorithms", "introduction to machine learning algorithms")
+    write_files(tmp_path, {title: title.encode() for title in close + loose + ("Python crash course",)})
+    assert jaccard(*loose) < 0.5 <= jaccard(*close)
+    assert find(tmp_path)["Similar"] == [(*close, round(jaccard(*close), 3))]
+    assert find(tmp_path, jaccard(*close) + 0.01)["Similar"] == []
+    assert find(tmp_path, 0.25)["Similar"] == [(*close, round(jaccard(*close), 3)), (*loose, round(jaccard(*loose), 3))]
+
+def test_identical_files_are_not_reported_as_similar(tmp_path):
+    write_files(tmp_path, {"learning Python the hard way": b"same", "learning Python the hard way third edition": b"same"})
+    report = find(tmp_path)
+    assert report["Identical"] == [(4, ["learning Python the hard way", "learning Python the hard way third edition"])]
+    assert report["Similar"] == []
+
+def test_cache_follows_size_and_modification_time(tmp_path, contents, monkeypatch):
+    write_files(tmp_path, {"alpha": contents, "beta copy": contents, "gamma copy": contents})
+    find(tmp_path)
+    hashed = []
+    get_edge_digest = Duplicates.get_edge_digest
+    monkeypatch.setattr(Duplicates, "get_edge_digest", lambda file_path: hashed.append(os.path.basename(file_path)) or get_edge_digest(file_path))
+    signed = []
+    get_signature = Duplicates.get_signature
+    monkeypatch.setattr(Duplicates, "get_signature", lambda tags, tag_signatures: signed.append(tags) or get_signature(tags, tag_signatures))
+    assert find(tmp_path)["Identical"] == [(SIZE, ["alpha", "beta copy", "gamma copy"])]
+    assert hashed == [] and signed == []
+
+    file_stat = os.stat(tmp_path / "beta copy.pdf")
+    os.utime(tmp_path / "beta copy.pdf", ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns + 10 ** 9))
+    assert find(tmp_path)["Identical"] == [(SIZE, ["alpha", "beta copy", "gamma copy"])]
+    assert hashed == ["beta copy.pdf"] and len(signed) == 1
+
+    hashed.clear()
+    (tmp_path / "gamma copy.pdf").write_bytes(contents + b"\n")
+    assert find(tmp_path)["Identical"] == [(SIZE, ["alpha", "beta copy"])]
+    assert hashed == []
+    (tmp_path / "alpha.pdf").write_bytes(contents[:-1] + b"\n")
+    assert find(tmp_path)["Identical"] == []
+    assert hashed == ["alpha.pdf"]
@@ -0,0 +1,92 @@
+import os
+import sqlite3
+
+import modules.path as path
+from modules import DataProcess, Export
+
+MTIME = 1700000000
+
+def read_outputs() -> dict[str, bytes | tuple]:
+    """Read every output of the current vault that does not depend on how it was built."""
+    names = ["PDF_info_path", "PDF_tokens_path", "PDF_catalog_path", "PDF_index_path", "TagCatalog_path",
+             "TableStat_path", "PropertyStat_tokens_path", "TagStat_path", "Obsidian_PDF_index_path",
+             "Obsidian_TagCatalog_path", "Obsidian_TableStat_path", "Obsidian_TagStat_path"]
+    outputs = {name: getattr(path, name).read_bytes() for name in names}
+    connection = sqlite3.connect(path.PDF_database_path)
+    try:
+        outputs["Books"] = sorted(connection.execute("""
+            SELECT title, title_length_char, title_length_word, tag_number, file_size_kb, updated_time FROM books
+        """))
+        outputs["Book Tags"] = sorted(connection.execute("""
+            SELECT books.title, tags.name FROM book_tags
+            JOIN books ON books.id = book_tags.book_id
+            JOIN tags ON tags.id = book_tags.tag_id
+        """))
+        outputs["Tags"] = sorted(connection.execute("SELECT name FROM tags"))
+    finally:
+        connection.close()
+    return outputs
+
+def test_incremental_update_matches_rebuild(library_titles, add_books):
+    add_books(*[(title, 100 + 37 * i, MTIME + 3600 * i) for i, title in enumerate(library_titles[:40])])
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+
+    books = path.BOOKS_folder_path
+    os.rename(books / f"{library_titles[0]}.pdf", books / "renamed Zyxwv handbook.pdf")
+    os.remove(books / f"{library_titles[1]}.pdf")
+    add_books((library_titles[2], 9999, MTIME - 86400))
+    add_books(*[(title, 50 + i, MTIME + 60 * i) for i, title in enumerate(library_titles[40:45])])
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    incremental = read_outputs()
+
+    Export.updateData(path.BOOKS_folder_path, banned_words, full_rebuild=True)
+    rebuilt = read_outputs()
+    assert incremental.keys() == rebuilt.keys()
+    for name in rebuilt:
+        assert incremental[name] == rebuilt[name], name
+    assert ("renamed Zyxwv handbook", "Zyxwv") in rebuilt["Book Tags"]
+
+def test_update_without_changes_writes_nothing(library_titles, add_books):
+    add_books(*[(title, 100 + i, MTIME + i) for i, title in enumerate(library_titles[:10])])
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    modified_times = {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(path.current_vault.data_root)}
+
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    assert {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(path.current_vault.data_root)} == modified_times
+
+def test_update_without_changes_restores_deleted_outputs(library_titles, add_books):
+    add_books(*[(title, 100 + i, MTIME + i) for i, title in enumerate(library_titles[:10])])
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    outputs = read_outputs()
+
+    for name in ["TableStat_path", "Obsidian_TableStat_path", "PDF_tokens_path"]:
+        os.remove(getattr(path, name))
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    assert read_outputs() == outputs
+
+def test_update_without_changes_repairs_deleted_and_edited_notes(library_titles, add_books):
+    add_books(*[(title, 100 + i, MTIME + i) for i, title in enumerate(library_titles[:10])])
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    outputs = read_outputs()
+
+    for name in ["PDF_index_path", "Obsidian_PDF_index_path", "PDF_search_index_path", "Obsidian_TagStat_path"]:
+        os.remove(getattr(path, name))
+    path.Obsidian_TagCatalog_path.write_text("edited by hand", encoding="utf-8")
+    manifest_time = os.stat(path.PDF_manifest_path).st_mtime_ns
+    os.utime(path.Obsidian_TagCatalog_path, ns=(manifest_time + 10**9, manifest_time + 10**9))
+    Export.updateData(path.BOOKS_folder_path, banned_words)
+    assert read_outputs() == outputs
+    assert path.PDF_search_index_path.exists()
+
+def test_vault_shards_read_files_with_their_share_of_processes(library_titles, add_books, monkeypatch):
+    add_books(*[(title, 100 + i, MTIME + i) for i, title in enumerate(library_titles[:5])])
+    scan_files = DataProcess.PDFScan.scan_files
+    calls = []
+    monkeypatch.setattr(DataProcess.PDFScan, "scan_files", lambda *args: calls.append(args[4]) or scan_files(*args))
+    records, _ = Export.catalog_vault(path.current_vault, DataProcess.get_banned_words(path.ban_path))
+    assert len(records) == 5
+    assert calls == [1]
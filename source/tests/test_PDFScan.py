@@ -0,0 +1,166 @@
+import json
+import os
+import random
+import zlib
+
+import pytest
+
+import modules.path as path
+from modules import DataProcess, Export, PDFScan
+
+CONTENT = b"BT /F1 12 Tf (Quantum Field) Tj [(Theo) -50 (ry) -400 (Primer)] TJ ET"
+PAGES = {3: b"<< /Type /Page /Parent 2 0 R /Contents 6 0 R >>",
+         4: b"<< /Type /Page /Parent 2 0 R >>",
+         5: b"<< /Type /Page /Parent 2 0 R >>"}
+OBJECTS = {1: b"<< /Type /Catalog /Pages 2 0 R >>",
+           2: b"<< /Type /Pages /Kids [3 0 R 4 0 R 5 0 R] /Count 3 >>",
+           **PAGES,
+           6: b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(zlib.compress(CONTENT)), zlib.compress(CONTENT)),
+           7: b"<< /Title (Quantum Mechanics) /Subject <FEFF0050006800790073006900630073> >>"}
+TRAILER = b"/Root 1 0 R /Info 7 0 R"
+WORDS = ["quantum", "mechanics", "physics", "field", "theory", "primer"]
+
+def write_objects(document: bytearray, objects: dict[int, bytes]) -> dict[int, int]:
+    """Append objects to a document, returning the offset of each one."""
+    offsets = {}
+    for number, value in objects.items():
+        offsets[number] = len(document)
+        document += b"%d 0 obj\n%s\nendobj\n" % (number, value)
+    return offsets
+
+def write_xref_table(document: bytearray, offsets: dict[int, int], trailer: bytes) -> int:
+    """Append a classic cross-reference table, one subsection per object, and its trailer, returning its offset."""
+    start = len(document)
+    document += b"xref\n0 1\n0000000000 65535 f \n"
+    for number, offset in sorted(offsets.items()):
+        document += b"%d 1\n%010d 00000 n \n" % (number, offset)
+    document += b"trailer\n<< /Size %d %s >>\n" % (max(offsets) + 1, trailer)
+    return start
+
+def end_document(document: bytearray, xref_offset: int) -> bytes:
+    document += b"startxref\n%d\n%%%%EOF\n" % xref_offset
+    return bytes(document)
+
+def make_classic_pdf(objects: dict[int, bytes] = OBJECTS, trailer: bytes = TRAILER) -> bytes:
+    document = bytearray(b"%PDF-1.4\n")
+    offsets = write_objects(document, objects)
+    return end_document(document, write_xref_table(document, offsets, trailer))
+
+def make_xref_stream_pdf() -> bytes:
+    """Build a PDF 1.5 file whose catalog, page tree and information dictionary are in an object stream, listed
+    by a cross-reference stream compressed with the PNG Up predictor."""
+    packed = [1, 2, 7]
+    values = [OBJECTS[number] for number in packed]
+    positions = [sum(len(value) + 1 for value in values[:i]) for i in range(len(values))]
+    header = b" ".join(b"%d %d" % (number, position) for number, position in zip(packed, positions)) + b"\n"
+    object_stream = zlib.compress(header + b"\n".join(values))
+    document = bytearray(b"%PDF-1.5\n")
+    offsets = write_objects(document, {number: OBJECTS[number] for number in OBJECTS if number not in packed})
+    offsets |= write_objects(document, {8: b"<< /Type /ObjStm /N %d /First %d /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+                                           % (len(packed), len(header), len(object_stream), object_stream)})
+
+    xref_offset = len(document)
+    rows = [bytes([0]) + bytes(6)]
+    for number in range(1, 10):
+        if number in packed:
+            rows.append(bytes([2]) + (8).to_bytes(4, "big") + packed.index(number).to_bytes(2, "big"))
+        else:
+            rows.append(bytes([1]) + (offsets.get(number, xref_offset)).to_bytes(4, "big") + bytes(2))
+    predicted = b"".join(bytes([2]) + bytes((byte - above) & 255 for byte, above in zip(row, previous))
+                         for row, previous in zip(rows, [bytes(7)] + rows))
+    xref_stream = zlib.compress(predicted)
+    write_objects(document, {9: b"<< /Type /XRef /Size 10 /W [1 4 2] %s /DecodeParms << /Predictor 12 /Columns 7 >> "
+                                b"/Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (TRAILER, len(xref_stream), xref_stream)})
+    return end_document(document, xref_offset)
+
+def scan(tmp_path, data: bytes, read_text: bool = True) -> dict:
+    file_path = tmp_path / "book.pdf"
+    file_path.write_bytes(data)
+    return PDFScan.scan_pdf(str(file_path), read_text)
+
+def test_classic_cross_reference_table(tmp_path):
+    assert scan(tmp_path, make_classic_pdf()) == {"Pages": 3, "Title": "Quantum Mechanics", "Subject": "Physics", "Words": WORDS}
+    assert scan(tmp_path, make_classic_pdf(), read_text=False) == {"Pages": 3}
+
+def test_cross_reference_stream_and_object_stream(tmp_path):
+    assert scan(tmp_path, make_xref_stream_pdf()) == {"Pages": 3, "Title": "Quantum Mechanics", "Subject": "Physics", "Words": WORDS}
+
+def test_incremental_update_is_read_as_its_last_revision(tmp_path):
+    document = bytearray(make_classic_pdf())
+    first_xref = int(document.rsplit(b"startxref\n", 1)[1].split()[0])
+    offsets = write_objects(document, {2: b"<< /Type /Pages /Kids [3 0 R 4 0 R 5 0 R 10 0 R] /Count 4 >>",
+                                       10: b"<< /Type /Page /Parent 2 0 R >>"})
+    data = end_document(document, write_xref_table(document, offsets, TRAILER + b" /Prev %d" % first_xref))
+    assert scan(tmp_path, data)["Pages"] == 4
+
+@pytest.mark.parametrize("loop", ["self", "cycle"])
+def test_prev_loop_ends(tmp_path, loop):
+    document = bytearray(b"%PDF-1.4\n")
+    offsets = write_objects(document, OBJECTS)
+    first_xref = len(document)
+    if loop == "self":
+        xref_offset = write_xref_table(document, offsets, TRAILER + b" /Prev %d" % first_xref)
+    else:
+        write_xref_table(document, offsets, TRAILER + b" /Prev 0000000000")
+        xref_offset = write_xref_table(document, offsets, TRAILER + b" /Prev %d" % first_xref)
+        placeholder = document.index(b"/Prev 0000000000")
+        document[placeholder:placeholder + 16] = b"/Prev %010d" % xref_offset
+    assert scan(tmp_path, end_document(document, xref_offset))["Pages"] == 3
+
+def test_damaged_cross_references_fall_back_to_searching_the_file(tmp_path):
+    document = bytearray(b"%PDF-1.4\n")
+    offsets = write_objects(document, OBJECTS)
+    shifted = end_document(document, write_xref_table(document, {number: offset + 5 for number, offset in offsets.items()}, TRAILER))
+    assert scan(tmp_path, shifted) == scan(tmp_path, make_classic_pdf())
+
+    data = make_classic_pdf()
+    xref_offset = data.rindex(b"xref\n0 1")
+    garbled = data[:xref_offset] + b"xref\ngarbage\n" + data[data.index(b"trailer"):]
+    assert scan(tmp_path, garbled) == {"Pages": 3, "Title": "", "Subject": "", "Words": []}
+    assert scan(tmp_path, data.replace(b"startxref\n%d" % xref_offset, b"startxref\n99999999"))["Pages"] == 3
+
+def test_truncated_file_counts_the_pages_left(tmp_path):
+    data = make_classic_pdf()
+    assert scan(tmp_path, data[:data.index(b"4 0 obj")])["Pages"] == 1
+    assert scan(tmp_path, data[:data.index(b"xref\n0 1")])["Title"] == ""
+
+@pytest.mark.parametrize("data", [b"", b"plain text, not a PDF\n" * 10, b"\x89PNG\r\n\x1a\n" + bytes(200)])
+def test_file_that_is_not_a_pdf_has_no_pages(tmp_path, data):
+    assert scan(tmp_path, data) == {"Pages": 0, "Title": "", "Subject": "", "Words": []}
+
+def test_garbage_after_the_header_has_no_pages(tmp_path):
+    generator = random.Random(5)
+    data = b"%PDF-1.7\n" + bytes(generator.randrange(256) for _ in range(20000)) + b"\nstartxref\n12\n%%EOF\n"
+    assert scan(tmp_path, data)["Pages"] == 0
+
+def test_scan_files_reuses_cached_scans(tmp_path, monkeypatch):
+    for name in ["first", "second"]:
+        (tmp_path / f"{name}.pdf").write_bytes(make_classic_pdf())
+    file_stats = [(name, os.stat(tmp_path / f"{name}.pdf")) for name in ["first", "second"]]
+    cache_file = tmp_path / "PDF_content.cache"
+    assert PDFScan.scan_files(str(tmp_path), file_stats, cache_file, read_text=True, processes=1)["first"]["Words"] == WORDS
+
+    scanned = []
+    scan_pdf = PDFScan.scan_pdf
+    monkeypatch.setattr(PDFScan, "scan_pdf", lambda *args: scanned.append(args[0]) or scan_pdf(*args))
+    assert PDFScan.scan_files(str(tmp_path), file_stats, cache_file, read_text=False, processes=1)["second"]["Pages"] == 3
+    (tmp_path / "second.pdf").write_bytes(make_xref_stream_pdf())
+    file_stats[1] = ("second", os.stat(tmp_path / "second.pdf"))
+    PDFScan.scan_files(str(tmp_path), file_stats, cache_file, read_text=True, processes=1)
+    assert scanned == [os.path.join(str(tmp_path), "second.pdf")]
+
+def test_pdf_keywords_change_the_manifest_fingerprint(vault):
+    for name in ["quantum notes", "field guide"]:
+        (path.BOOKS_folder_path / f"{name}.pdf").write_bytes(make_classic_pdf())
+    banned_words = DataProcess.get_banned_words(path.ban_path)
+
+    def update(content_tags: bool) -> tuple[str, dict]:
+        Export.updateData(path.BOOKS_folder_path, banned_words, content_tags=content_tags)
+        manifest = json.loads(path.PDF_manifest_path.read_text())
+        return manifest["Banned Words"], manifest["Files"]["quantum notes"]
+
+    fingerprint, entry = update(False)
+    keyword_fingerprint, keyword_entry = update(True)
+    assert keyword_fingerprint != fingerprint
+    assert "Primer" not in json.dumps(entry) and "primer" in json.dumps(keyword_entry)
+    assert update(False)[0] == fingerprint
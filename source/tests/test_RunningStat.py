@@ -0,0 +1,72 @@
+import random
+from array import array
+
+import pytest
+
+from modules import DataProcess, RunningStat
+
+def get_running_stat(values: list[int], capacity: int = 2048) -> RunningStat.RunningStat:
+    running_stat = RunningStat.RunningStat(capacity)
+    for value in values:
+        running_stat.add(value)
+    return running_stat
+
+def assert_same_characteristics(running_stat: RunningStat.RunningStat, values: list[int]) -> None:
+    """Check the characteristics of the accumulator against those of the column engine over the same values."""
+    expected = DataProcess.analyze_column("Property", array("q", values))
+    assert running_stat.describe("Property") == pytest.approx(expected, abs=1e-3)
+
+@pytest.fixture
+def values() -> list[int]:
+    generator = random.Random(8)
+    return [generator.randrange(0, 500) for _ in range(400)] + [0, 0, 7, 7, 7]
+
+def test_add_matches_column_engine(values):
+    assert_same_characteristics(get_running_stat(values), values)
+
+def test_remove_matches_column_engine(values):
+    running_stat = get_running_stat(values)
+    removed = values[::3]
+    for value in removed:
+        running_stat.remove(value)
+    kept = values[1::3] + values[2::3]
+    assert_same_characteristics(running_stat, kept)
+    assert (running_stat.minimum, running_stat.maximum) == (min(kept), max(kept))
+
+def test_remove_every_value_resets_the_statistics(values):
+    running_stat = get_running_stat(values[:5])
+    for value in values[:5]:
+        running_stat.remove(value)
+    assert running_stat.describe("Property") == get_running_stat([]).describe("Property")
+
+def test_merge_matches_single_accumulator(values):
+    first, second = get_running_stat(values[:150]), get_running_stat(values[150:])
+    first.merge(second)
+    first.merge(RunningStat.RunningStat())
+    assert_same_characteristics(first, values)
+
+def test_buckets_keep_characteristics_within_two_percent():
+    generator = random.Random(2)
+    values = [generator.randrange(1, 1 << 20) for _ in range(5000)]
+    running_stat = get_running_stat(values, capacity=64)
+    assert running_stat.bucketed
+    expected = DataProcess.analyze_column("Property", array("q", values))
+    described = running_stat.describe("Property")
+    for name in ["Minimum", "Maximum", "Total", "Avarage", "Variance"]:
+        assert described[name] == pytest.approx(expected[name], rel=1e-9)
+    for name in ["Median", "25th Percentile", "75th Percentile", "90th Percentile"]:
+        assert described[name] == pytest.approx(expected[name], rel=0.02)
+
+def test_merge_of_bucketed_and_exact_accumulators():
+    exact = get_running_stat(range(1, 50))
+    bucketed = get_running_stat(range(1000, 200000, 100), capacity=64)
+    exact.merge(bucketed)
+    assert exact.bucketed
+    assert exact.count == 49 + len(range(1000, 200000, 100))
+    assert sum(exact.sketch.values()) == exact.count
+
+def test_state_round_trip(values):
+    running_stat = get_running_stat(values)
+    restored = RunningStat.RunningStat.from_dict(running_stat.to_dict())
+    assert restored.describe("Property") == running_stat.describe("Property")
+    assert restored.get_histogram() == running_stat.get_histogram()
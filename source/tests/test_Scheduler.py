@@ -0,0 +1,36 @@
+import random
+from datetime import datetime, timedelta
+
+from modules import Scheduler
+from modules.Record import BookRecord
+
+TODAY = datetime(2024, 6, 1)
+
+def get_task(days_ago: int, title: str, done: bool) -> dict:
+    return {"Date": TODAY - timedelta(days=days_ago), "Title": title, "Done": done}
+
+def test_task_index():
+    task_index = Scheduler.get_task_index([get_task(30, "think Python", True), get_task(10, "think Python", False),
+                                           get_task(20, "deep learning", True)])
+    assert task_index["think Python"] == {"Last Given": TODAY - timedelta(days=10), "Times Given": 2, "Times Done": 1, "Pending": True}
+    assert task_index["deep learning"] == {"Last Given": TODAY - timedelta(days=20), "Times Given": 1, "Times Done": 1, "Pending": False}
+
+def test_book_weight():
+    def weigh(tasks: list[dict]) -> float:
+        entry = Scheduler.get_task_index(tasks).get("book")
+        return Scheduler.get_book_weight(entry, TODAY, cooldown_days=7, stale_days=60, unread_weight=3.0)
+
+    assert weigh([]) == 3.0
+    assert weigh([get_task(3, "book", True)]) == 0.0
+    assert weigh([get_task(90, "book", True)]) == 0.5
+    assert weigh([get_task(120, "book", True), get_task(90, "book", True)]) == 1 / 3
+    assert weigh([get_task(30, "book", False)]) == 0.0
+    assert weigh([get_task(90, "book", False)]) == 1.0
+
+def test_pick_books_leaves_out_pending_and_recent_books():
+    records = [BookRecord(title, [title.split()[0]]) for title in ["alpha one", "beta two", "gamma three", "delta four"]]
+    task_index = Scheduler.get_task_index([get_task(20, "alpha one", False), get_task(2, "beta two", True)])
+    for seed in range(20):
+        picked = Scheduler.pick_books(records, task_index, 2, TODAY, random.Random(seed))
+        assert sorted(picked) == ["delta four", "gamma three"]
+    assert len(Scheduler.pick_books(records, task_index, 4, TODAY, random.Random(0))) == 4
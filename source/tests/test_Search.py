@@ -0,0 +1,70 @@
+import pytest
+
+from modules import DataProcess, Search
+from modules.Record import BookRecord
+
+TITLES = ["machine learning with Python", "learning machine code", "deep learning", "data science from scratch",
+          "database internals", "C++ primer", "think Python"]
+
+@pytest.fixture
+def index(tmp_path) -> dict:
+    records = [BookRecord(title, DataProcess.tokenizer.tokenize(title, frozenset())) for title in sorted(TITLES)]
+    index_file = tmp_path / "PDF_search_index.cache"
+    Search.save_index(index_file, Search.build_index(records))
+    return Search.load_index(index_file)
+
+def test_parse_query():
+    assert Search.parse_query("machine learning OR data*") == [["machine", "learning"], ["data*"]]
+    assert Search.parse_query("machine AND learning OR OR C++") == [["machine", "learning"], ["c_pp"]]
+
+def test_terms_must_all_match(index):
+    assert Search.query_index(index, "machine learning") == ["machine learning with Python", "learning machine code"]
+    assert Search.query_index(index, "machine AND learning") == Search.query_index(index, "machine learning")
+    assert Search.query_index(index, "deep machine") == []
+
+def test_clauses_are_alternatives(index):
+    assert Search.query_index(index, "deep OR think") == ["deep learning", "think Python"]
+    assert Search.query_index(index, "deep learning OR machine") == ["deep learning", "learning machine code",
+                                                                     "machine learning with Python"]
+
+def test_prefix_terms(index):
+    assert Search.query_index(index, "data*") == ["data science from scratch", "database internals"]
+    assert Search.query_index(index, "data* science") == ["data science from scratch"]
+
+def test_terms_are_normalized(index):
+    assert Search.query_index(index, "PYTHON") == ["machine learning with Python", "think Python"]
+    assert Search.query_index(index, "C++") == ["C++ primer"]
+
+def test_stop_words_are_left_out(index):
+    assert Search.query_index(index, "the Python", {"the"}) == ["machine learning with Python", "think Python"]
+    assert Search.query_index(index, "the Python", {"the"}, normalized=True) == Search.query_index(index, "Python")
+
+def test_unmatched_query_falls_back_to_substrings(index):
+    assert Search.query_index(index, "NTERNA") == ["database internals"]
+    assert Search.query_index(index, "nothing like it") == []
+    assert Search.query_index(index, "base NTERN") == ["database internals"]
+    assert Search.query_index(index, "base scratch") == []
+
+def test_fallback_ignores_operators_and_prefixes(index):
+    for query in ["OR", "AND", "*", "OR OR", "ratc*", "the OR ratc", "nterna AND base"]:
+        assert Search.query_index(index, query) == [], query
+    assert Search.query_index(index, "the nterna", {"the"}) == ["database internals"]
+    assert Search.query_index(index, "the", {"the"}) == []
+
+def test_fuzzy_query_tolerates_typos(index):
+    assert Search.fuzzy_query_index(index, "pyhton") == ["machine learning with Python", "think Python"]
+    assert Search.fuzzy_query_index(index, "datbase") == ["database internals"]
+    assert Search.fuzzy_query_index(index, "internls") == ["database internals"]
+
+def test_fuzzy_query_ranks_by_closest_words(index):
+    assert Search.fuzzy_query_index(index, "machin lerning") == ["learning machine code", "machine learning with Python",
+                                                                 "deep learning"]
+    assert Search.fuzzy_query_index(index, "deep lerning")[0] == "deep learning"
+
+def test_fuzzy_query_limits_typos_by_word_length(index):
+    assert Search.fuzzy_query_index(index, "dxxp") == []
+    assert Search.fuzzy_query_index(index, "thnk") == ["think Python"]
+
+def test_fuzzy_query_leaves_out_stop_words(index):
+    assert Search.fuzzy_query_index(index, "The pyhton", {"The"}) == Search.fuzzy_query_index(index, "pyhton")
+    assert Search.fuzzy_query_index(index, "the pyhton", {"the"}, normalized=True) == Search.fuzzy_query_index(index, "pyhton")
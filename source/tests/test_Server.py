@@ -0,0 +1,146 @@
+import asyncio
+import json
+import socket
+import threading
+from datetime import datetime
+
+import pytest
+
+import modules.path as path
+from modules import RunningStat, Server
+
+MTIME = 1700000000
+
+@pytest.fixture
+def titles(library_titles) -> list[str]:
+    return library_titles[:30]
+
+@pytest.fixture
+def library(titles, add_books) -> Server.Library:
+    add_books(*[(title, 100 + i, MTIME + 86400 * i) for i, title in enumerate(titles)])
+    library = Server.Library(path.BOOKS_folder_path)
+    library.refresh()
+    return library
+
+def get_answer(library: Server.Library, target: str, method: str = "GET") -> tuple[str, object]:
+    status, body = library.answer(method, target)
+    return status, json.loads(body)
+
+def test_search_routes(library, titles):
+    status, answer = get_answer(library, "/search?q=Python")
+    assert status == "200 OK"
+    assert set(answer["Results"]) == {title for title in titles if "Python" in title.split()}
+    assert get_answer(library, "/search?q=Pythn")[1]["Results"] == []
+    assert set(get_answer(library, "/fuzzy?q=Pythn")[1]["Results"]) >= {title for title in titles if "Python" in title.split()}
+
+def test_tagged_route(library, titles):
+    tagged = [title for title in reversed(titles) if "Python" in title.split()]
+    assert get_answer(library, "/tagged?tag=%23Python")[1]["Results"] == tagged
+    since = datetime.fromtimestamp(MTIME + 86400 * 10).date().isoformat()
+    assert get_answer(library, f"/tagged?tag=Python&since={since}")[1]["Results"] == \
+        [title for title in tagged if titles.index(title) >= 10]
+
+def test_analytics_routes(library, titles):
+    related = get_answer(library, "/related?tag=Python")[1]["Results"]
+    assert related and all(isinstance(tag, str) and count > 0 for tag, count, _ in related)
+    similar = get_answer(library, "/similar?" + Server.parse.urlencode({"title": titles[7]}))[1]["Results"]
+    assert similar and titles[7] not in [title for title, _ in similar]
+
+def test_stats_and_status_routes(library, titles):
+    stats = get_answer(library, "/stats")[1]["Results"]
+    assert tuple(stats) == RunningStat.PROPERTY_NAMES
+    assert stats["File Size (Kb)"]["Total"] == sum(100 + i for i in range(len(titles)))
+    status = get_answer(library, "/status")[1]["Results"]
+    assert status["Books"] == len(titles)
+
+def test_tasks_route_appends_to_task_list(library, titles):
+    status, answer = get_answer(library, "/tasks?count=2", "POST")
+    assert status == "200 OK"
+    assert len(answer["Results"]) == 2
+    task_list = path.Obsidian_taskList_path.read_text(encoding="utf-8")
+    assert all(f"[[BOOKS/{title}.pdf|{title}]]" in task_list for title in answer["Results"])
+
+@pytest.mark.parametrize("method, target", [("GET", "/search"),
+                                            ("GET", "/search?q=Python&page=2"),
+                                            ("GET", "/tagged?tag=Python&since=yesterday"),
+                                            ("POST", "/tasks?count=many")])
+def test_invalid_parameters_are_bad_requests(library, method, target):
+    status, answer = get_answer(library, target, method)
+    assert status == "400 Bad Request"
+    assert answer["Error"]
+
+def test_unknown_routes_and_methods(library):
+    assert get_answer(library, "/nowhere")[0] == "404 Not Found"
+    assert get_answer(library, "/search?q=Python", "POST")[0] == "405 Method Not Allowed"
+    assert get_answer(library, "/tasks", "GET")[0] == "405 Method Not Allowed"
+
+@pytest.mark.parametrize("headers", [{"host": "localhost:8765", "origin": "https://example.com"},
+                                     {"host": "attacker.example:8765"},
+                                     {"host": "127.0.0.1.attacker.example"},
+                                     {}])
+def test_requests_from_web_pages_are_forbidden(library, headers):
+    status, body = library.answer("POST", "/tasks?count=50", headers)
+    assert status == "403 Forbidden"
+    assert not path.Obsidian_taskList_path.exists()
+
+@pytest.mark.parametrize("host", ["localhost", "127.0.0.1:8765", "[::1]:8765", "LOCALHOST"])
+def test_requests_from_local_clients_are_answered(library, host):
+    assert library.answer("GET", "/status", {"host": host})[0] == "200 OK"
+
+def test_unexpected_errors_are_server_errors(library, monkeypatch):
+    def fail(titles):
+        raise PermissionError(13, "Permission denied")
+    monkeypatch.setattr(Server.Export, "append_reading_tasks", fail)
+    status, answer = get_answer(library, "/tasks?count=2", "POST")
+    assert status == "500 Internal Server Error"
+    assert "Permission denied" in answer["Error"]
+
+@pytest.fixture
+def address(library, tmp_path) -> str:
+    """Serve the library on a Unix socket from an event loop running on a thread of its own."""
+    socket_path = tmp_path / "server.sock"
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_unix_server(library.handle_connection, str(socket_path)))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield f"unix:{socket_path}"
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+def test_request(address, library):
+    assert Server.request(address, "/search", {"q": "Python"}) == library.search("Python")
+    assert Server.request(address, "/status")["Books"] == len(library.snapshot["Records"])
+    with pytest.raises(Server.ServerError, match="missing"):
+        Server.request(address, "/search")
+    with pytest.raises(Server.ServerError, match="expects POST"):
+        Server.request(address, "/tasks")
+
+def test_tasks_are_picked_off_the_event_loop(address, library, monkeypatch):
+    threads = []
+    pick_books = Server.Scheduler.pick_books
+    monkeypatch.setattr(Server.Scheduler, "pick_books", lambda *args: threads.append(threading.current_thread()) or pick_books(*args))
+    assert len(Server.request(address, "/tasks", {"count": 2}, "POST")) == 2
+    assert len(threads) == 1 and threads[0].name.startswith("asyncio")
+
+def test_request_with_origin_is_refused(address):
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    with connection:
+        connection.connect(address.removeprefix("unix:"))
+        connection.sendall(b"GET /status HTTP/1.1\r\nHost: localhost\r\nOrigin: http://example.com\r\nConnection: close\r\n\r\n")
+        response = b"".join(iter(lambda: connection.recv(1 << 16), b""))
+    assert response.startswith(b"HTTP/1.1 403 Forbidden")
+
+def test_request_to_unreachable_server(tmp_path):
+    with pytest.raises(Server.ServerError, match="cannot reach the server"):
+        Server.request(f"unix:{tmp_path / 'missing.sock'}", "/status")
+    with pytest.raises(Server.ServerError, match="invalid server address"):
+        Server.request("localhost:http", "/status")
+
+def test_parse_address():
+    assert Server.parse_address("8765") == ("127.0.0.1", 8765)
+    assert Server.parse_address(":8765") == ("127.0.0.1", 8765)
+    assert Server.parse_address("0.0.0.0:80") == ("0.0.0.0", 80)
+    assert Server.parse_address("unix:/tmp/study.sock") == "/tmp/study.sock"
@@ -0,0 +1,56 @@
+import sys
+
+import pytest
+
+import main
+from modules import Export, Server
+
+@pytest.fixture
+def calls(monkeypatch) -> list[tuple]:
+    """Record the calls to the exporters the query commands run, instead of running them."""
+    calls = []
+    for name in ["query_server", "search_file", "fuzzy_search_file", "query_books_tagged", "related_tags", "similar_books",
+                 "query_largest_unread", "pick_number_random_book_to_read", "AnnounceFinish"]:
+        monkeypatch.setattr(Export, name, lambda *args, name=name: calls.append((name, *args)))
+    return calls
+
+def run(monkeypatch, *arguments: str) -> None:
+    monkeypatch.setattr(sys, "argv", ["main.py", *arguments])
+    main.app()
+
+def test_server_answers_the_queries_it_handles(monkeypatch, calls):
+    run(monkeypatch, "--server", "unix:study.sock", "--searchFile", "data*", "--fuzzySearchFile", "pyhton", "--relatedTags", "Python",
+        "--similarBooks", "think Python", "--booksTagged", "Python", "--modifiedSince", "2024-05-17", "--getTaskList", "--taskCount", "2")
+    assert calls == [("query_server", "unix:study.sock", "/tasks", {"count": 2}),
+                     ("AnnounceFinish",),
+                     ("query_server", "unix:study.sock", "/search", {"q": "data*"}),
+                     ("query_server", "unix:study.sock", "/fuzzy", {"q": "pyhton"}),
+                     ("query_server", "unix:study.sock", "/tagged", {"tag": "Python", "since": "2024-05-17T00:00:00"}),
+                     ("query_server", "unix:study.sock", "/related", {"tag": "Python"}),
+                     ("query_server", "unix:study.sock", "/similar", {"title": "think Python"})]
+
+def test_commands_the_server_does_not_handle_run_locally(monkeypatch, calls):
+    run(monkeypatch, "--server", "unix:study.sock", "search", "data*")
+    run(monkeypatch, "--server", "unix:study.sock", "largest", "3")
+    assert calls == [("query_server", "unix:study.sock", "/search", {"q": "data*"}),
+                     ("query_largest_unread", 3)]
+
+def test_queries_run_locally_without_server(monkeypatch, calls):
+    run(monkeypatch, "--searchFile", "data*", "--largestUnread", "3")
+    assert calls == [("search_file", "data*"), ("query_largest_unread", 3)]
+
+def test_server_errors_are_usage_errors(monkeypatch, capsys):
+    def fail(*args):
+        raise Server.ServerError("cannot reach the server at unix:study.sock: No such file or directory")
+    monkeypatch.setattr(Export, "query_server", fail)
+    with pytest.raises(SystemExit) as exit_info:
+        run(monkeypatch, "--server", "unix:study.sock", "search", "data*")
+    assert exit_info.value.code == 2
+    assert "error: cannot reach the server at unix:study.sock" in capsys.readouterr().err
+
+def test_other_errors_are_not_usage_errors(monkeypatch):
+    def fail(*args):
+        raise ConnectionResetError(104, "Connection reset by peer")
+    monkeypatch.setattr(Export, "search_file", fail)
+    with pytest.raises(ConnectionResetError):
+        run(monkeypatch, "search", "data*")